@@ -1,189 +1,115 @@
 """
 Unified API Server - Handles all calculator endpoints
-Run: python api/index.py
+Run: python api/index.py [--mode thread|prefork|asyncio|single] [--workers N] [--host H] [--port P]
+ASGI: uvicorn api.index:app
 """
 
-from http.server import BaseHTTPRequestHandler, HTTPServer
-import json
-from datetime import date, datetime
-import calendar
+import os
+import sys
 
-# ============ Age Calculator ============
-def calculate_age(dob_str):
-    dob = datetime.fromisoformat(dob_str).date()
-    today = date.today()
-    
-    if dob > today:
-        raise ValueError("Date of birth cannot be in the future")
-    
-    years = today.year - dob.year
-    months = today.month - dob.month
-    days = today.day - dob.day
-    
-    if days < 0:
-        months -= 1
-        prev_month = today.month - 1 or 12
-        prev_year = today.year if today.month != 1 else today.year - 1
-        days_in_prev = calendar.monthrange(prev_year, prev_month)[1]
-        days += days_in_prev
-    
-    if months < 0:
-        years -= 1
-        months += 12
-    
-    total_days = (today - dob).days
-    
-    return {
-        "years": years,
-        "months": months,
-        "days": days,
-        "total_days": total_days,
-    }
+# Make the repo-root `india_tools` package importable when run as a script
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
 
-# ============ CGPA Calculator ============
-def calculate_cgpa(cgpa, university):
-    if not isinstance(cgpa, (int, float)) or not (0 <= cgpa <= 10):
-        raise ValueError("CGPA must be a number between 0 and 10")
-    
-    multipliers = {
-        "default": 9.5, "VTU": 10.0, "Mumbai": 9.5, 
-        "Anna": 10.0, "AKTU": 10.0, "PTU": 9.5
-    }
-    
-    percentage = cgpa * multipliers.get(university, 9.5)
-    return {
-        "cgpa": round(cgpa, 2),
-        "percentage": round(min(percentage, 100.0), 2),
-        "university": university
-    }
+from india_tools import aio, core, limits, logs, metrics, profiling
+from india_tools.app import EndpointNotFound, METRICS, OFFLOAD, RESULT_CACHE, cached_route, execute, handle_get, record, route  # noqa: F401
+from india_tools.handler import APIHandler
 
-# ============ GST Calculator ============
-def calculate_gst(amount, rate):
-    if not isinstance(amount, (int, float)) or amount < 0:
-        raise ValueError("Amount must be a non-negative number")
-    if not isinstance(rate, (int, float)) or not (0 <= rate <= 100):
-        raise ValueError("Rate must be between 0 and 100")
-    
-    gst_amount = amount * (rate / 100)
-    return {
-        "original": round(amount, 2),
-        "gst_amount": round(gst_amount, 2),
-        "gst_rate": rate,
-        "total": round(amount + gst_amount, 2)
-    }
+# Calculators live in india_tools.core; re-exported lazily so importing
+# this module doesn't pull in every tool.
+_REEXPORTS = {
+    'calculate_age': 'age', 'calculate_age_batch': 'age', 'calculate_age_bulk': 'age', 'iter_age_bulk': 'age',
+    'calculate_cgpa': 'cgpa', 'calculate_cgpa_batch': 'cgpa', 'calculate_cgpa_transcripts': 'cgpa',
+    'CGPA_MULTIPLIERS': 'cgpa',
+    'calculate_gst': 'gst', 'calculate_gst_batch': 'gst', 'calculate_gst_invoice': 'gst',
+    'calculate_emi': 'emi', 'calculate_emi_batch': 'emi',
+    'calculate_emi_schedule': 'emi', 'iter_emi_schedule': 'emi',
+    'calculate_emi_tenure': 'emi', 'calculate_emi_rate': 'emi', 'calculate_emi_principal': 'emi',
+    'calculate_emi_grid': 'emi',
+}
+
+def __getattr__(name):
+    if name in _REEXPORTS:
+        return getattr(core.get(_REEXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# ============ EMI Calculator ============
-def calculate_emi(principal, annual_rate, tenure_months):
-    if not isinstance(principal, (int, float)) or principal <= 0:
-        raise ValueError("Principal must be greater than 0")
-    if not isinstance(annual_rate, (int, float)) or annual_rate < 0:
-        raise ValueError("Interest rate cannot be negative")
-    if not isinstance(tenure_months, int) or tenure_months <= 0:
-        raise ValueError("Tenure must be greater than 0 months")
-    
-    if annual_rate == 0:
-        emi = principal / tenure_months
-        total_interest = 0
-    else:
-        monthly_rate = annual_rate / 12 / 100
-        emi = principal * monthly_rate * ((1 + monthly_rate) ** tenure_months) / (((1 + monthly_rate) ** tenure_months) - 1)
-        total_interest = (emi * tenure_months) - principal
-    
-    total_amount = emi * tenure_months
-    
-    return {
-        "principal": round(principal, 2),
-        "annual_rate": round(annual_rate, 2),
-        "tenure_months": tenure_months,
-        "emi": round(emi, 2),
-        "total_interest": round(total_interest, 2),
-        "total_amount": round(total_amount, 2)
-    }
 
-# ============ Main Handler ============
-class APIHandler(BaseHTTPRequestHandler):
-    
-    def do_POST(self):
-        path = self.path
-        
-        try:
-            length = int(self.headers.get('Content-Length', 0))
-            body = json.loads(self.rfile.read(length)) if length > 0 else {}
-            
-            print(f'📨 {path}: {body}')  # Debug log
-            
-            if path == '/api/age':
-                dob = body.get('dob')
-                if not dob:
-                    raise ValueError("dob field required")
-                response = calculate_age(dob)
-            
-            elif path == '/api/cgpa':
-                cgpa = body.get('cgpa')
-                university = body.get('university', 'default')
-                if cgpa is None:
-                    raise ValueError("cgpa field required")
-                print(f'  cgpa={cgpa} (type={type(cgpa).__name__}), uni={university}')
-                response = calculate_cgpa(cgpa, university)
-            
-            elif path == '/api/gst':
-                amount = body.get('amount')
-                rate = body.get('rate')
-                if amount is None or rate is None:
-                    raise ValueError("amount and rate fields required")
-                print(f'  amount={amount} (type={type(amount).__name__}), rate={rate} (type={type(rate).__name__})')
-                response = calculate_gst(amount, rate)
-            
-            elif path == '/api/emi':
-                principal = body.get('principal')
-                annual_rate = body.get('annual_rate')
-                tenure_months = body.get('tenure_months')
-                if any(x is None for x in [principal, annual_rate, tenure_months]):
-                    raise ValueError("principal, annual_rate, tenure_months fields required")
-                print(f'  principal={principal}, rate={annual_rate}, months={tenure_months}')
-                response = calculate_emi(principal, annual_rate, tenure_months)
-            
-            else:
-                response = {"error": "Endpoint not found"}
-                self.send_error(404)
-                return
-            
-            print(f'✅ {path}: Success')
-            self._send_response(200, response)
-        
-        except Exception as e:
-            print(f'❌ {path}: {str(e)}')
-            self._send_response(400, {"error": str(e)})
-    
-    def do_OPTIONS(self):
-        self.send_response(200)
-        self._add_cors_headers()
-        self.end_headers()
-    
-    def _send_response(self, status, data):
-        self.send_response(status)
-        self.send_header('Content-Type', 'application/json')
-        self._add_cors_headers()
-        self.end_headers()
-        self.wfile.write(json.dumps(data).encode())
-    
-    def _add_cors_headers(self):
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-    
-    def log_message(self, format, *args):
-        # Suppress default logging to reduce console clutter
-        pass
+# ASGI entry point, same routing as APIHandler
+app = aio.ASGIApp(execute, get=handle_get, observe=record, threaded=OFFLOAD.candidate)
 
 
 if __name__ == "__main__":
-    server = HTTPServer(('127.0.0.1', 8000), APIHandler)
-    print("✅ API Server started on http://127.0.0.1:8000")
-    print("📝 Endpoints: /api/age, /api/cgpa, /api/gst, /api/emi")
+    import argparse  # the server only: an imported api.index (Vercel, ASGI) never needs these
+
+    from india_tools import server as api_server, wire
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    api_server.add_arguments(parser, extra_modes=('asyncio',))
+    parser.add_argument('--cache-size', type=int, default=None, help='result cache entries (0 disables)')
+    parser.add_argument('--cache-ttl', type=float, default=None, help='result cache TTL, seconds')
+    parser.add_argument('--log-level', choices=list(logs.LEVELS), default=None, help='request log level')
+    parser.add_argument('--log-sample', type=float, default=None,
+                        help='fraction of successful requests logged (errors always are)')
+    parser.add_argument('--offload-workers', type=int, default=None,
+                        help='processes for heavy requests (0 runs everything inline)')
+    parser.add_argument('--offload-threshold', type=int, default=None,
+                        help='request cost (~ batch items) from which it is offloaded')
+    parser.add_argument('--offload-queue', type=int, default=None,
+                        help='offloaded requests allowed to wait beyond one per worker; more get 503')
+    parser.add_argument('--offload-timeout', type=float, default=None,
+                        help='seconds an offloaded request may take before a 503')
+    parser.add_argument('--max-body', type=int, default=None, help='largest request body, bytes (413 above)')
+    parser.add_argument('--read-timeout', type=float, default=None,
+                        help='seconds for a started request to send its headers, then its body (408 after)')
+    parser.add_argument('--rate-ip', type=float, default=None, help='requests/s per client IP (0: unlimited)')
+    parser.add_argument('--rate-route', type=float, default=None,
+                        help='requests/s per client IP and route (0: unlimited)')
+    parser.add_argument('--rate-burst', type=float, default=None, help='seconds of rate a client may burst')
+    parser.add_argument('--debug', action='store_true', help='add a Server-Timing header to every response')
+    parser.add_argument('--profile', choices=profiling.MODES, default=None,
+                        help='cProfile a sample of requests, or sample stacks for flame graphs')
+    parser.add_argument('--profile-out', default=None, help='profile output path ({pid} is the process id)')
+    parser.add_argument('--profile-sample', type=float, default=None,
+                        help='fraction of requests run under cProfile')
+    parser.add_argument('--wire-port', type=int, default=None,
+                        help='also serve the binary protocol (india_tools.wire) on this TCP port')
+    parser.add_argument('--wire-socket', default=None, help='also serve the binary protocol on this Unix socket')
+    args = parser.parse_args()
+    if (args.wire_port is not None or args.wire_socket) and args.mode == 'prefork':
+        parser.error('the binary protocol runs next to --mode thread, asyncio or single, not prefork')
+    RESULT_CACHE.configure(maxsize=args.cache_size, ttl=args.cache_ttl)
+    logs.LOG.configure(level=args.log_level, sample=args.log_sample)
+    OFFLOAD.configure(workers=args.offload_workers, threshold=args.offload_threshold,
+                      max_queue=args.offload_queue, timeout=args.offload_timeout)
+    limits.LIMITS.configure(max_body=args.max_body, read_timeout=args.read_timeout, ip_rate=args.rate_ip,
+                            route_rate=args.rate_route, burst=args.rate_burst)
+    metrics.DEBUG = metrics.DEBUG or args.debug
+    profiling.PROFILER.configure(mode=args.profile, out=args.profile_out, sample=args.profile_sample)
+    core.preload()  # compile every tool's validators before serving (and before forking)
+    print(f"✅ API Server started on http://{args.host}:{args.port} ({args.mode} mode)")
+    print("📝 Endpoints: /api/age, /api/cgpa, /api/gst, /api/emi (+ /batch variants), /api/batch, /api/emi/schedule, /api/emi/grid, /api/emi/prepay, /api/age/bulk, /api/gst/invoice, /api/cgpa/transcript")
+    print("🔁 Cacheable GET: /api/gst?amount=1000&rate=18 (ETag, Cache-Control, 304)")
+    if OFFLOAD.enabled:
+        print(f"🏋️ Offload: {OFFLOAD.workers} worker processes for requests of cost >= {OFFLOAD.threshold}")
+    if limits.LIMITS.ip_rate or limits.LIMITS.route_rate:
+        print(f"🚦 Rate limits: {limits.LIMITS.ip_rate or '∞'}/s per IP, {limits.LIMITS.route_rate or '∞'}/s per IP and route")
+    if profiling.PROFILER.enabled:
+        print(f"🔬 Profiling ({profiling.PROFILER.mode}) -> {profiling.PROFILER.path} at exit")
+    wire_server = None
+    if args.wire_port is not None or args.wire_socket:
+        wire_server = wire.Background(execute, args.host, args.wire_port, args.wire_socket,
+                                      observe=record, threaded=OFFLOAD.candidate)
+        print(f"📦 Binary protocol: {', '.join(map(str, wire_server.addresses))}")
+    print("📈 Metrics: /metrics (Prometheus), request log: JSON lines on stdout")
     print("⏳ Listening for requests...\n")
-    try:
-        server.serve_forever()
-    except KeyboardInterrupt:
-        print("\n⛔ Server stopped")
-        server.server_close()
+    if args.mode == 'asyncio':
+        aio.serve(execute, host=args.host, port=args.port, idle_timeout=args.keepalive,
+                  drain_timeout=args.drain_timeout, get=handle_get, observe=record, threaded=OFFLOAD.candidate)
+    else:
+        api_server.serve(APIHandler, host=args.host, port=args.port, mode=args.mode,
+                         workers=args.workers, threads=args.threads, keepalive=args.keepalive,
+                         drain_timeout=args.drain_timeout)
+    if wire_server is not None:
+        wire_server.stop()
+    print("\n⛔ Server stopped")
@@ -0,0 +1,110 @@
+"""
+Bulk runner scaling: the same CSV file on 1, 2, 4, 8 ... worker processes.
+
+Generates a file per tool (gst, emi, age) of `--rows` rows, runs it
+serially, then sharded on each worker count, and checks every sharded
+output is byte-for-byte the serial one before reporting rows/s, speedup
+and parallel efficiency (speedup / workers). Speedup can't exceed the
+CPUs available (reported with the results).
+
+    python -m benchmarks.bulk --rows 2000000 --workers 1,2,4,8
+    python -m benchmarks.bulk --tool gst --json bulk.json --compare old.json
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import tempfile
+
+from benchmarks import report
+from india_tools import bulk
+
+TOOLS = ('gst', 'emi', 'age')
+
+
+def generate(tool, rows, path, seed=1):
+    """A CSV of `rows` plausible inputs for `tool`, with an id column."""
+    rng = random.Random(seed)
+    with open(path, 'w') as f:
+        if tool == 'gst':
+            f.write('id,amount,rate\n')
+            for i in range(rows):
+                amount = rng.randint(1, 10 ** 6) if i % 2 else round(rng.random() * 1e5, 2)
+                f.write(f'{i},{amount},{rng.choice((0, 5, 12, 18, 28))}\n')
+        elif tool == 'emi':
+            f.write('id,principal,annual_rate,tenure_months\n')
+            for i in range(rows):
+                f.write(f'{i},{rng.randint(1, 500) * 10000},{rng.choice((6.5, 7, 8.5, 9, 10.25, 12))},'
+                        f'{rng.choice((12, 36, 60, 120, 180, 240, 360))}\n')
+        else:
+            f.write('id,dob\n')
+            for i in range(rows):
+                f.write(f'{i},{rng.randint(1930, 2020)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}\n')
+
+
+def _digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def run(tools=TOOLS, rows=500000, workers=(1, 2, 4, 8), chunk_bytes=bulk.CHUNK_BYTES):
+    """{'<tool> x<workers>': {rows_per_s, seconds, speedup, efficiency}}; AssertionError if outputs differ."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for tool in tools:
+            src = os.path.join(tmp, f'{tool}.csv')
+            generate(tool, rows, src)
+            serial = os.path.join(tmp, f'{tool}.serial')
+            base = bulk.run(src, serial, keep=['id'], chunk_bytes=chunk_bytes)
+            expected = _digest(serial)
+            for n in workers:
+                out = os.path.join(tmp, f'{tool}.{n}')
+                total = base if n == 1 else bulk.run(src, out, keep=['id'], chunk_bytes=chunk_bytes, workers=n)
+                if n != 1:
+                    assert _digest(out) == expected, f"{tool}: {n} workers wrote a different output"
+                    os.unlink(out)
+                speedup = base['seconds'] / total['seconds']
+                results[f'{tool} x{n}'] = {
+                    "rows": total['rows'],
+                    "seconds": round(total['seconds'], 3),
+                    "rows_per_s": round(total['rows_per_s'], 1),
+                    "speedup": round(speedup, 2),
+                    "efficiency": round(speedup / n, 2),
+                }
+            os.unlink(serial)
+            os.unlink(src)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tool', action='append', choices=TOOLS, help='limit to these tools (repeatable)')
+    parser.add_argument('--rows', type=int, default=500000, help='rows per generated file')
+    parser.add_argument('--workers', default='1,2,4,8', help='comma-separated worker counts')
+    parser.add_argument('--chunk-mb', type=float, default=bulk.CHUNK_BYTES / (1 << 20), help='chunk size, MiB')
+    parser.add_argument('--json', help='save results to this file')
+    parser.add_argument('--compare', help='compare against a saved run')
+    args = parser.parse_args(argv)
+
+    workers = sorted({1, *(int(n) for n in args.workers.split(','))})
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+    print(f"🚀 Bulk scaling: {args.rows:,} rows per tool, workers {workers}, {cpus} CPUs available")
+    results = run(args.tool or TOOLS, args.rows, workers, int(args.chunk_mb * (1 << 20)))
+    print("✅ sharded outputs identical to the serial run")
+    for name, r in results.items():
+        print(f"  {name:<10} {r['rows_per_s']:>12,.0f} rows/s  {r['seconds']:8.2f}s  "
+              f"speedup x{r['speedup']:<5.2f} efficiency {r['efficiency']:.0%}")
+
+    if args.json:
+        report.write(args.json, 'bulk', {"config": {"rows": args.rows, "workers": workers, "cpus": cpus}, **results})
+    if args.compare:
+        report.compare(args.compare, results, 'rows_per_s')
+    return results
+
+
+if __name__ == '__main__':
+    main()
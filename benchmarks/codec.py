@@ -0,0 +1,79 @@
+"""
+JSON backends compared on the API's real payload shapes.
+
+For every installed backend (msgspec, orjson, stdlib json): decoding
+each endpoint's request body, decoding it straight into its typed input
+(GstInput.from_json, ...), and encoding each endpoint's response,
+plus a 1000-item batch and a 240-month EMI schedule page.
+
+    python -m benchmarks.codec [--repeat 5] [--json out.json] [--compare old.json]
+"""
+
+import argparse
+
+from benchmarks import report
+from benchmarks.load import ENDPOINTS
+from benchmarks.micro import measure
+from india_tools import app, codec, core
+
+INPUTS = {'/api/age': 'AgeInput', '/api/cgpa': 'CgpaInput', '/api/gst': 'GstInput', '/api/emi': 'EmiInput'}
+BATCH_SIZE = 1000
+
+
+def payloads():
+    """name -> (kind, value): 'decode' cases hold JSON bytes, 'encode' cases Python objects."""
+    out = {}
+    for path, body in ENDPOINTS.items():
+        out[f'request {path}'] = ('decode', codec._json_dumps(body))
+        out[f'typed {path}'] = ('typed', (getattr(core.get(path[5:]), INPUTS[path]), codec._json_dumps(body)))
+        out[f'response {path}'] = ('encode', app.route(path, body))
+    items = [ENDPOINTS['/api/gst']] * BATCH_SIZE
+    out[f'request /api/gst/batch x{BATCH_SIZE}'] = ('decode', codec._json_dumps(items))
+    out[f'response /api/gst/batch x{BATCH_SIZE}'] = ('encode', app.route('/api/gst/batch', items))
+    schedule = dict(ENDPOINTS['/api/emi'], page_size=240)
+    out['response /api/emi/schedule 240'] = ('encode', app.route('/api/emi/schedule', schedule))
+    return out
+
+
+def _case(kind, value):
+    if kind == 'decode':
+        return lambda: codec.loads(value)
+    if kind == 'typed':
+        struct, raw = value
+        return lambda: struct.from_json(raw)
+    return lambda: codec.dumps(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', help='save results to this file')
+    parser.add_argument('--compare', help='compare against a saved run')
+    args = parser.parse_args(argv)
+
+    backends = codec.available()
+    previous = codec.BACKEND
+    cases = payloads()
+    results = {}
+    print(f"{'payload':<40}" + ''.join(f'{b + " µs":>14}' for b in backends) + f"{'best vs json':>14}")
+    try:
+        for name, (kind, value) in cases.items():
+            times = {}
+            for backend in backends:
+                codec.use(backend)
+                r = results[f'{name} [{backend}]'] = measure(_case(kind, value), args.repeat)
+                times[backend] = r['us_per_call']
+            speedup = times['json'] / min(times.values())
+            print(f'{name:<40}' + ''.join(f'{times[b]:>14.2f}' for b in backends) + f'{speedup:>13.1f}x')
+    finally:
+        codec.use(previous)
+
+    if args.json:
+        report.write(args.json, 'codec', results)
+    if args.compare:
+        report.compare(args.compare, results, 'calls_per_s')
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,544 @@
+"""
+Differential fuzzing: every path to a calculator against the single-item route.
+
+The same result can come out of several code paths, and each is a
+separate implementation of validation and rounding that can drift:
+
+    batch       /api/<tool>/batch: the column kernels, single path for leftovers
+    stream      the same, streamed in chunks (batch.iter_run)
+    mixed       /api/batch with {"tool", "input"} items (batch.run_mixed)
+    cached      cached_route, answered a second time from the result cache
+    function    calculate_<tool>(**body), the Python API
+    bulk        CSV cells through bulk.Plan, for bodies a CSV row can carry
+    get         GET /api/<tool>?query, for bodies a query string can carry
+    wire        binary frames through wire.WireServer, fixed layouts included
+
+Inputs are random bodies built from each tool's Schema: mostly valid
+values, many on or just past a bound, rounding edges (2.675, 1e15 + 0.5),
+huge and tiny numbers, numeric strings, junk types, missing and extra
+fields, every date form agetable declines. Each goes through JSON first,
+as a request body would. Batches vary in size (the kernels switch paths
+with size) and often share an as_of (NumPy columns for ages).
+
+Every outcome must equal the reference, route('/api/<tool>', body), or
+its error message: same keys, same types, the same sign of zero, floats
+equal to within ULPS units in the last place (JSON-carried ones after a
+JSON round trip). An exception other than ValueError from the reference
+counts as a crash. The first divergence
+per tool and path is shrunk (fields dropped, values simplified, still
+inside its batch) before it is reported. A new fast path is one more
+entry in IMPLEMENTATIONS.
+
+Every run starts with CORPUS, bodies that have diverged before, so a
+fixed bug stays fixed whatever the seed; a shrunk divergence belongs
+there once it is fixed.
+
+The run doubles as a throughput benchmark: cases per second per path,
+and --compare / --fail-under turn it into a regression gate. It exits 1
+on any divergence or crash.
+
+    python -m benchmarks.differential --cases 1000000 --workers 4
+    python -m benchmarks.differential --tool age --seed 7 --json diff.json --compare old.json --fail-under 10
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import struct
+import sys
+import time
+from urllib.parse import quote, urlencode
+
+from benchmarks import report
+from india_tools import app, bulk, cgpatable, codec, core, httpcache, offload, wire
+
+TOOLS = ('age', 'cgpa', 'gst', 'emi')
+MAX_BATCH = 300
+SHOWN = 3  # divergences kept per tool and path
+# Floats may differ by this many units in the last place: NumPy's log1p / expm1 (the
+# batch solvers) aren't libm's. Far below any rounding difference (0.01) under 1e13.
+ULPS = 4
+
+SKIP = object()  # an implementation can't carry this body
+
+# Bodies that once diverged, run first by every check() (as one batch per tool)
+CORPUS = {
+    'age': [
+        {'dob': '2000-02-29', 'as_of': '2001-02-28'},
+        {'dob': '２０００-01-15', 'as_of': '2020-01-15'},
+    ],
+    'cgpa': [
+        {'cgpa': 8, 'university': 5},
+        {'cgpa': 8, 'university': 'Gujarat'},
+        {'cgpa': 8, 'university': 'Uttar Pradesh University'},
+    ],
+    'gst': [
+        {'amount': 5, 'rate': 0.0},
+        {'amount': 5, 'rate': -0.0},
+        {'amount': 5, 'rate': '0.0'},
+        {'amount': -0.0, 'rate': 18},
+        {'amount': 7, 'rate': 5e-324},
+    ],
+    'emi': [
+        {'principal': 1000, 'annual_rate': 5e-324, 'tenure_months': 10},
+        {'principal': 1000, 'annual_rate': -0.0, 'tenure_months': 10},
+        {'annual_rate': 1, 'tenure_months': 382, 'emi': 274877906944, 'solve': 'principal'},
+        {'principal': 1e15, 'annual_rate': 100, 'emi': 1e-9, 'solve': 'tenure'},
+        {'principal': 1e5, 'annual_rate': 0, 'emi': 1e-300, 'solve': 'tenure'},
+    ],
+}
+
+# ============ Inputs ============
+_RANGES = {  # typical magnitudes; bounds come from the schema
+    'amount': (0, 1e7), 'rate': (0, 100), 'cgpa': (0, 10), 'principal': (1, 1e8),
+    'annual_rate': (0, 36), 'tenure_months': (1, 480), 'emi': (1, 1e6),
+}
+_EDGES = (0, -0.0, 1, -1, 0.5, 0.005, 0.015, 1.005, 2.675, 1e-9, 5e-324, 1e15 + 0.5, 2 ** 53, 2 ** 53 + 1,
+          2 ** 63, 10 ** 20, 1e308, -1e308)
+_JUNK = (None, True, False, '', 'abc', '100', '1e3', ' 5', 'NaN', [], {}, [1], {'a': 1})
+_DATE_FORMS = ('2000-01-15T10:30', '20000115', '2000-1-5', '2000-01-15 ', '２０００-01-15', '0000-01-01',
+               '2000-13-01', '2000-02-30', '2023-02-29', '2024-02-29', '1900-02-29', '0001-01-01',
+               '9999-12-31', '2000-01-15Z', '', '2000/01/15')
+
+
+def _number(rng, field):
+    roll = rng.random()
+    if roll < 0.08:
+        return rng.choice(_JUNK)
+    bounds = [b for b in (field.minimum, field.maximum, field.exclusive_minimum) if b is not None]
+    if roll < 0.2 and bounds:
+        bound = rng.choice(bounds)
+        return rng.choice((bound, math.nextafter(bound, -math.inf), math.nextafter(bound, math.inf),
+                           bound - 1, bound + 1, float(bound)))
+    if roll < 0.3:
+        return rng.choice(_EDGES)
+    lo, hi = _RANGES.get(field.name, (-1e6, 1e6))
+    if field.kind == 'integer' or roll < 0.6:
+        return rng.randint(int(lo), int(hi))
+    return round(rng.uniform(lo, hi), rng.choice((1, 2, 3, 6, 15)))
+
+
+def _date(rng):
+    roll = rng.random()
+    if roll < 0.15:
+        return rng.choice(_DATE_FORMS + _JUNK)
+    year = rng.randint(1790, 2100) if roll < 0.9 else rng.randint(1, 9999)
+    return f'{year:04d}-{rng.randint(1, 12):02d}-{rng.randint(1, 31 if roll < 0.3 else 28):02d}'
+
+
+def _university(rng):
+    table = cgpatable.TABLES.current()
+    university = rng.choice(list(table.universities.values()))
+    name = rng.choice((university.key, university.name, university.name.upper(), university.name[:4],
+                       university.name.lower().replace('university', 'univ.')))
+    return name if rng.random() < 0.9 else rng.choice(('', 'x', 'Unknown College') + _JUNK)
+
+
+def _value(rng, field, shared):
+    if field.name == 'as_of' and shared is not None:
+        return shared
+    if field.name in ('dob', 'as_of'):
+        return _date(rng)
+    if field.name == 'university':
+        return _university(rng)
+    if field.kind in ('number', 'integer'):
+        return _number(rng, field)
+    return rng.choice(_JUNK)
+
+
+def _schemas(tool):
+    """[(solve, Schema)] a body for `tool` may follow."""
+    module = core.get(tool)
+    modes = list(getattr(module, 'SOLVE_INPUTS', {}).items())
+    return [(None, module.INPUT)] * 3 + ([('emi', module.INPUT)] + modes if modes else [])
+
+
+def body(rng, tool, shared=None):
+    """A random request body for `tool`, as it arrives after JSON decoding."""
+    solve, schema = rng.choice(_schemas(tool))
+    out = {}
+    for field in schema.fields:
+        if rng.random() < (0.95 if field.required else 0.5):
+            out[field.name] = _value(rng, field, shared)
+    if solve is not None:
+        out['solve'] = solve if rng.random() < 0.97 else rng.choice(('', 'foo', 1, None))
+    if rng.random() < 0.03:
+        out[rng.choice(('extra', 'id', 'solve'))] = rng.choice(_JUNK)
+    return codec.loads(codec.dumps(out))
+
+
+def batch(rng, tool):
+    """A batch of bodies: any size up to MAX_BATCH, often sharing an as_of."""
+    size = rng.choice((1, 2, rng.randint(3, 63), rng.randint(64, MAX_BATCH)))
+    shared = _date(rng) if tool == 'age' and rng.random() < 0.5 else None
+    return [body(rng, tool, shared) for _ in range(size)]
+
+
+# ============ Implementations ============
+def _outcome(fn, *args, **kwargs):
+    try:
+        return fn(*args, **kwargs)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def reference(tool, items):
+    """route('/api/<tool>', body) per body; crashes (not ValueError) marked with a 'crash' key."""
+    out = []
+    for item in items:
+        try:
+            out.append(app.route(f'/api/{tool}', item))
+        except ValueError as e:
+            out.append({"error": str(e)})
+        except Exception as e:
+            out.append({"error": str(e), "crash": f"{type(e).__name__}: {e}"})
+    return out
+
+
+def _batch(tool, items):
+    return app.route(f'/api/{tool}/batch', items)
+
+
+def _stream(tool, items):
+    return list(app.route(f'/api/{tool}/batch', items, stream=True).rows)
+
+
+def _mixed(tool, items):
+    return app.route('/api/batch', [{"tool": tool, "input": item} for item in items])
+
+
+def _cached(tool, items):
+    path = f'/api/{tool}'
+    for item in items:
+        _outcome(app.cached_route, path, item)
+    return [_outcome(app.cached_route, path, item) for item in items]  # hits, where cacheable
+
+
+def _absent(field, value):
+    # what from_body reads as a missing field; a positional call has no such thing
+    return value is None or (field.kind == 'string' and not value)
+
+
+def _function(tool, items):
+    module = core.get(tool)
+    out = []
+    for item in items:
+        solve = item.get('solve', 'emi') if tool == 'emi' else None
+        if solve not in (None, 'emi'):
+            name, schema = f'calculate_emi_{solve}', module.SOLVE_INPUTS.get(solve) if type(solve) is str else None
+        else:
+            name, schema = f'calculate_{tool}', module.INPUT
+        names = {f.name for f in schema.fields} if schema is not None else set()
+        keys = set(item) - {'solve'} if tool == 'emi' else set(item)
+        if (schema is None or not keys <= names
+                or not all(f.name in item and not _absent(f, item[f.name]) for f in schema.fields if f.required)):
+            out.append(SKIP)  # the signature can't take it, or the body counts as missing a field
+            continue
+        out.append(_outcome(getattr(module, name), **{k: item[k] for k in keys}))
+    return out
+
+
+_MISSING = object()
+
+
+def _cell(value, kind):
+    """CSV text that bulk reads back as exactly `value`, or None."""
+    if type(value) is str:
+        text = value
+    elif type(value) is int:
+        text = str(value)
+    elif type(value) is float:
+        text = repr(value)
+    else:
+        return None
+    got = bulk._column([text], kind, _MISSING)[0] if text else _MISSING
+    return text if type(got) is type(value) and got == value else None
+
+
+def _bulk(tool, items):
+    module = core.get(tool)
+    header = [name for name, _ in module.FIELDS]
+    kinds = {f.name: f.kind for f in module.INPUT.fields}
+    plan = bulk.Plan(header, tool)
+    rows, where = [], []
+    for i, item in enumerate(items):
+        cells = [_cell(item[name], kinds.get(name, 'any')) if name in item else '' for name in header]
+        if set(item) <= set(header) and None not in cells:
+            rows.append(cells)
+            where.append(i)
+    out = [SKIP] * len(items)
+    for i, result in zip(where, plan.results(rows)):
+        out[i] = result
+    return out
+
+
+def _get(tool, items):
+    path = f'/api/{tool}'
+    out = []
+    for item in items:
+        if not all(type(v) in (str, int, float) for v in item.values()):
+            out.append(SKIP)
+            continue
+        query = urlencode(sorted((k, v if type(v) is str else codec.dumps(v).decode()) for k, v in item.items()),
+                          quote_via=quote)
+        try:
+            params, _ = httpcache.parse_query(query)
+        except httpcache.QueryError:
+            params = None
+        if params is None or not _same(params, item):
+            out.append(SKIP)  # e.g. the string "100" reads back as a number
+            continue
+        status, _, payload = app.handle_get(path, query)
+        out.append(codec.loads(payload) if status in (200, 400) else {"error": f"HTTP {status}"})
+    return out
+
+
+def _wire(tool, items):
+    server = wire.WireServer(app.route)
+
+    async def answer():
+        frames = [wire.encode_request(i, f'/api/{tool}', item) for i, item in enumerate(items)]
+        return [await server._request('fuzz', i, frame[8], frame[9:]) for i, frame in enumerate(frames)]
+
+    out = []
+    for item, frame in zip(items, asyncio.run(answer())):
+        status, payload = frame[8], frame[9:]
+        if status == wire.STRUCT:
+            out.append(wire._unpack_result(wire.FIXED[wire.OPS[f'/api/{tool}']][2], payload))
+        elif status == wire.JSON:
+            out.append(codec.loads(payload))
+        else:
+            out.append({"error": payload[2:].decode()})
+    return out
+
+
+# name -> fn(tool, bodies) -> [result, {"error": message} or SKIP]; True if it carries results as JSON
+IMPLEMENTATIONS = {
+    'batch': (_batch, False),
+    'stream': (_stream, False),
+    'mixed': (_mixed, False),
+    'cached': (_cached, False),
+    'function': (_function, False),
+    'bulk': (_bulk, False),
+    'get': (_get, True),
+    'wire': (_wire, True),
+}
+
+
+# ============ Comparison ============
+def _ordinal(x):
+    """Floats as integers in the same order, consecutive floats consecutive integers."""
+    n = struct.unpack('<q', struct.pack('<d', x))[0]
+    return n if n >= 0 else -(n & 0x7fffffffffffffff)
+
+
+def _same(a, b):
+    """Equal values of equal types, floats within ULPS (-0.0 is not 0.0, NaN is NaN)."""
+    if type(a) is not type(b):
+        return False
+    if type(a) is float:
+        if a != a or b != b:
+            return a != a and b != b
+        return math.copysign(1, a) == math.copysign(1, b) and abs(_ordinal(a) - _ordinal(b)) <= ULPS
+    if type(a) is dict:
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if type(a) is list:
+        return len(a) == len(b) and all(map(_same, a, b))
+    return a == b
+
+
+def _expected(result, as_json):
+    result = {k: v for k, v in result.items() if k != 'crash'}
+    if not as_json:
+        return result
+    try:
+        return codec.loads(codec.dumps(result))
+    except ValueError as e:  # out of float range: JSON front ends answer 400
+        return {"error": str(e)}
+
+
+def _diverges(tool, fn, as_json, items, i):
+    expected = reference(tool, [items[i]])[0]
+    try:
+        got = fn(tool, items)[i]
+    except Exception as e:
+        got = {"crash": f"{type(e).__name__}: {e}"}
+    return got is not SKIP and not _same(got, _expected(expected, as_json))
+
+
+def _simpler(value):
+    if type(value) is str and value:
+        yield value[:len(value) // 2]
+        yield ''
+    if type(value) is float:
+        yield float(round(value))
+        yield round(value, 2)
+    if type(value) is int and value:
+        yield value // 2
+        yield 1
+    if value not in (0, None) or type(value) is bool:
+        yield 0
+
+
+def shrink(tool, fn, as_json, items, i, budget=200):
+    """A smaller body still diverging in place of items[i] (same batch around it)."""
+    items = list(items)
+    current = items[i]
+    progress = True
+    while progress and budget > 0:
+        progress = False
+        candidates = [{k: v for k, v in current.items() if k != key} for key in current]
+        candidates += [{**current, key: simpler} for key, value in current.items() for simpler in _simpler(value)]
+        for candidate in candidates:
+            budget -= 1
+            if candidate == current or budget < 0:
+                continue
+            items[i] = candidate
+            if _diverges(tool, fn, as_json, items, i):
+                current, progress = candidate, True
+                break
+            items[i] = current
+    return current
+
+
+# ============ Runner ============
+def check(tools=TOOLS, cases=10000, seed=1, implementations=None):
+    """
+    Run CORPUS, then about `cases` random bodies per tool, through every implementation.
+
+    Returns {'cases', 'seconds', 'crashes': [...], 'divergences': [...],
+    'counts': {'<tool> <impl>': divergences}, 'timing': {'<tool> <impl>': [bodies, seconds]}}.
+    """
+    implementations = implementations or IMPLEMENTATIONS
+    rng = random.Random(seed)
+    out = {"cases": 0, "seconds": 0.0, "crashes": [], "divergences": [], "counts": {}, "timing": {}}
+    start = time.perf_counter()
+    for tool in tools:
+        _check(out, tool, list(CORPUS.get(tool, ())), implementations)
+        done = 0
+        while done < cases:
+            items = batch(rng, tool)[:cases - done]
+            done += len(items)
+            _check(out, tool, items, implementations)
+    out["seconds"] = time.perf_counter() - start
+    return out
+
+
+def _check(out, tool, items, implementations):
+    if not items:
+        return
+    out["cases"] += len(items)
+    t = time.perf_counter()
+    expected = reference(tool, items)
+    _time(out, f'{tool} reference', len(items), time.perf_counter() - t)
+    for item, result in zip(items, expected):
+        if 'crash' in result:
+            count = out["counts"][f'{tool} crashes'] = out["counts"].get(f'{tool} crashes', 0) + 1
+            if count <= SHOWN:
+                out["crashes"].append({"tool": tool, "body": item, "error": result['crash']})
+    for name, (fn, as_json) in implementations.items():
+        key = f'{tool} {name}'
+        t = time.perf_counter()
+        try:
+            got = fn(tool, items)
+        except Exception as e:
+            got = [{"crash": f"{type(e).__name__}: {e}"}] * len(items)
+        ran = sum(1 for g in got if g is not SKIP)
+        _time(out, key, ran, time.perf_counter() - t)
+        for i, (result, want) in enumerate(zip(got, expected)):
+            if result is SKIP or _same(result, _expected(want, as_json)):
+                continue
+            count = out["counts"][key] = out["counts"].get(key, 0) + 1
+            if count <= SHOWN:
+                out["divergences"].append({
+                    "tool": tool, "implementation": name, "body": items[i],
+                    "expected": _expected(want, as_json), "got": result,
+                    "shrunk": shrink(tool, fn, as_json, items, i) if count == 1 else None,
+                })
+
+
+def _time(out, key, n, seconds):
+    entry = out["timing"].setdefault(key, [0, 0.0])
+    entry[0] += n
+    entry[1] += seconds
+
+
+def _merge(parts):
+    out = {"cases": 0, "seconds": 0.0, "crashes": [], "divergences": [], "counts": {}, "timing": {}}
+    for part in parts:
+        out["cases"] += part["cases"]
+        out["crashes"] += part["crashes"]
+        out["divergences"] += part["divergences"]
+        for key, count in part["counts"].items():
+            out["counts"][key] = out["counts"].get(key, 0) + count
+        for key, (n, seconds) in part["timing"].items():
+            _time(out, key, n, seconds)
+    return out
+
+
+def run(tools=TOOLS, cases=10000, seed=1, workers=1):
+    """check() over `workers` processes (seeds seed, seed + 1, ...); adds per-path throughput."""
+    start = time.perf_counter()
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        share = -(-cases // workers)
+        with ProcessPoolExecutor(workers, mp_context=offload._context()) as pool:
+            result = _merge(pool.map(check, [tools] * workers, [share] * workers,
+                                     range(seed, seed + workers)))
+    else:
+        result = check(tools, cases, seed)
+    result["seconds"] = time.perf_counter() - start
+    result["throughput"] = {
+        key: {"cases": n, "seconds": round(seconds, 3), "cases_per_s": round(n / seconds, 1) if seconds else None}
+        for key, (n, seconds) in result.pop("timing").items()
+    }
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tool', action='append', choices=TOOLS, help='limit to these tools (repeatable)')
+    parser.add_argument('--cases', type=int, default=100000, help='random bodies per tool')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=1, help='processes to spread the cases over')
+    parser.add_argument('--json', help='save results to this file')
+    parser.add_argument('--compare', help='compare throughput against a saved run')
+    parser.add_argument('--fail-under', type=float, metavar='PCT',
+                        help='with --compare, exit 1 if any path lost more than PCT%% of its cases/s')
+    args = parser.parse_args(argv)
+
+    tools = args.tool or TOOLS
+    print(f"🎲 Differential run: {args.cases:,} bodies per tool, seed {args.seed}, "
+          f"{args.workers} worker(s), {len(IMPLEMENTATIONS)} paths against the single-item route")
+    result = run(tools, args.cases, args.seed, args.workers)
+    print(f"  {result['cases']:,} bodies in {result['seconds']:.1f}s, "
+          f"{result['cases'] / result['seconds']:,.0f} bodies/s through every path")
+    for key, r in result["throughput"].items():
+        diverged = result["counts"].get(key, 0)
+        print(f"  {key:<16} {r['cases']:>10,} bodies {r['cases_per_s'] or 0:>12,.0f}/s  "
+              f"{'✅' if not diverged else f'❌ {diverged:,} divergences'}")
+    for crash in result["crashes"]:
+        print(f"💥 {crash['tool']}: {crash['error']} for {crash['body']!r}")
+    for d in result["divergences"]:
+        print(f"❌ {d['tool']} {d['implementation']}: {d['body']!r}\n     expected {d['expected']!r}\n"
+              f"     got      {d['got']!r}" + (f"\n     shrunk   {d['shrunk']!r}" if d['shrunk'] is not None else ''))
+
+    if args.json:
+        report.write(args.json, 'differential', {**result["throughput"],
+                                                 "summary": {k: result[k] for k in ('cases', 'seconds', 'counts')}})
+    status = 1 if result["divergences"] or result["crashes"] else 0
+    if args.compare:
+        changes = report.compare(args.compare, result["throughput"], 'cases_per_s')
+        slower = {name: change for name, change in changes.items() if change < -(args.fail_under or math.inf)}
+        if slower:
+            print(f"⚠️  slower than {args.fail_under}% allows: {', '.join(slower)}")
+            status = 1
+    if not status:
+        print("✅ every path agrees with the single-item route")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+/api/gst/invoice on large invoices.
+
+Times the invoice engine on a generated invoice (default 10,000 lines
+over 5 slabs and 100 HSN codes, amounts with two decimals, some
+fractional quantities) for each supply type and pricing, the full
+route including JSON decode/encode, and two per-line baselines:
+
+    per-line batch     the same lines through /api/gst/batch (float
+                       math, rounded per line, no aggregation)
+    per-line Decimal   a straightforward Decimal implementation that
+                       quantizes every line and sums into groups
+
+    python -m benchmarks.invoice [--lines 10000] [--repeat 5] [--json out.json] [--compare old.json]
+"""
+
+import argparse
+import random
+from decimal import ROUND_HALF_UP, Decimal
+
+from benchmarks import report
+from benchmarks.micro import measure
+from india_tools import app, codec, invoice
+
+RATES = (0, 5, 12, 18, 28)
+PAISA = Decimal('0.01')
+
+
+def make_lines(n, seed=7):
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(n):
+        line = {
+            'hsn': str(8400 + rng.randrange(100)),
+            'amount': round(rng.uniform(1, 50000), 2),
+            'rate': rng.choice(RATES),
+        }
+        if rng.random() < 0.5:
+            line['quantity'] = rng.randint(1, 20) if rng.random() < 0.8 else round(rng.uniform(0.1, 10), 3)
+        lines.append(line)
+    return lines
+
+
+def decimal_invoice(lines):
+    """Reference: Decimal per line, quantized, summed per (hsn, rate), taxed per group."""
+    groups = {}
+    for line in lines:
+        value = (Decimal(repr(line['amount'])) * Decimal(repr(line.get('quantity', 1)))).quantize(PAISA, ROUND_HALF_UP)
+        key = (line.get('hsn', ''), line['rate'])
+        groups[key] = groups.get(key, 0) + value
+    total = Decimal(0)
+    for (hsn, rate), taxable in groups.items():
+        half = (taxable * Decimal(repr(rate)) / 200).quantize(PAISA, ROUND_HALF_UP)
+        total += taxable + 2 * half
+    return total
+
+
+def cases(lines):
+    body = {'lines': lines}
+    raw = codec.dumps(body)
+    batch = [{'amount': line['amount'] * line.get('quantity', 1), 'rate': line['rate']} for line in lines]
+    return {
+        'engine intra-state': lambda: invoice.invoice(lines),
+        'engine inter-state': lambda: invoice.invoice(lines, inter_state=True),
+        'engine inclusive': lambda: invoice.invoice(lines, inclusive=True),
+        'route json in/out': lambda: codec.dumps(app.route('/api/gst/invoice', codec.loads(raw))),
+        'per-line batch': lambda: app.route('/api/gst/batch', batch),
+        'per-line Decimal': lambda: decimal_invoice(lines),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', help='save results to this file')
+    parser.add_argument('--compare', help='compare against a saved run')
+    args = parser.parse_args(argv)
+
+    lines = make_lines(args.lines)
+    expected = decimal_invoice(lines)
+    got = invoice.invoice(lines)['total']
+    if Decimal(repr(got)) != expected:
+        raise SystemExit(f"❌ engine total {got} != Decimal reference {expected}")
+
+    results = {}
+    print(f"🧾 {args.lines} lines, total ₹{got:,.2f} (matches the Decimal reference)")
+    for name, fn in cases(lines).items():
+        r = measure(fn, args.repeat, min_time=0.5)
+        r['us_per_line'] = round(r['us_per_call'] / args.lines, 3)
+        results[f'{name} x{args.lines}'] = r
+        print(f"  {name:<22} {r['us_per_call'] / 1000:>9.2f} ms/invoice {r['us_per_line']:>8.3f} µs/line")
+
+    if args.json:
+        report.write(args.json, 'invoice', results)
+    if args.compare:
+        report.compare(args.compare, results, 'calls_per_s')
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""
+Load test for the calculator endpoints, localhost only.
+
+Starts api/index.py as a subprocess (or in-process, or targets a running
+server), opens `--concurrency` keep-alive connections per endpoint from
+one asyncio client and reports requests/second and p50/p95/p99 latency.
+
+    python -m benchmarks.load --mode thread --concurrency 32 --duration 10
+    python -m benchmarks.load --mode prefork --workers 4 --json run.json
+    python -m benchmarks.load --url http://127.0.0.1:8000 --compare run.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from benchmarks import report
+
+ENDPOINTS = {
+    '/api/age': {'dob': '2000-01-15'},
+    '/api/cgpa': {'cgpa': 8.5, 'university': 'default'},
+    '/api/gst': {'amount': 1000, 'rate': 18},
+    '/api/emi': {'principal': 1000000, 'annual_rate': 7, 'tenure_months': 240},
+}
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_port(host, port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"server did not come up on {host}:{port}")
+
+
+@contextlib.contextmanager
+def subprocess_server(mode, workers=None, cache_size=None):
+    port = _free_port()
+    cmd = [sys.executable, os.path.join(report.ROOT, 'api', 'index.py'),
+           '--mode', mode, '--port', str(port)]
+    if workers:
+        cmd += ['--workers', str(workers)]
+    if cache_size is not None:
+        cmd += ['--cache-size', str(cache_size)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_for_port('127.0.0.1', port)
+        yield '127.0.0.1', port
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+@contextlib.contextmanager
+def inprocess_server(threads=8):
+    # Shares the GIL with the client: handy for profiling, pessimistic for throughput.
+    from api.index import APIHandler
+    from india_tools.server import PooledHTTPServer
+
+    server = PooledHTTPServer(('127.0.0.1', 0), APIHandler, threads=threads)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        thread.start()
+        try:
+            yield server.server_address
+        finally:
+            server.shutdown()
+            server.drain(5)
+            server.server_close()
+
+
+# ============ Client ============
+def _request_bytes(host, port, path, body):
+    payload = json.dumps(body).encode()
+    return (f'POST {path} HTTP/1.1\r\nHost: {host}:{port}\r\nContent-Type: application/json\r\n'
+            f'Content-Length: {len(payload)}\r\n\r\n').encode() + payload
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ', 2)[1])
+    length, close = None, lines[0].startswith('HTTP/1.0')
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        name = name.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'connection':
+            close = value.strip().lower() == 'close'
+    if length is None:
+        await reader.read()  # body runs to EOF
+        close = True
+    else:
+        await reader.readexactly(length)
+    return status, close
+
+
+async def _worker(host, port, request, deadline, latencies, errors):
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            start = time.perf_counter()
+            writer.write(request)
+            status, close = await _read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors[0] += 1
+            if close:
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError):
+            errors[0] += 1
+            if writer is not None:
+                writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def _drive(host, port, endpoints, concurrency, duration, warmup):
+    results = {}
+    for path, body in endpoints.items():
+        request = _request_bytes(host, port, path, body)
+        if warmup:
+            await asyncio.gather(*(_worker(host, port, request, time.perf_counter() + warmup, [], [0])
+                                   for _ in range(concurrency)))
+        latencies, errors = [], [0]
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(_worker(host, port, request, deadline, latencies, errors)
+                               for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        results[path] = {
+            "requests": len(latencies),
+            "errors": errors[0],
+            "rps": round(len(latencies) / elapsed, 1),
+            **report.percentiles(latencies),
+        }
+    return results
+
+
+def run(host, port, endpoints=ENDPOINTS, concurrency=16, duration=5.0, warmup=1.0):
+    """Drive each endpoint in turn; returns {path: {rps, p50, p95, p99, ...}}."""
+    return asyncio.run(_drive(host, port, endpoints, concurrency, duration, warmup))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    where = parser.add_mutually_exclusive_group()
+    where.add_argument('--mode', default='thread', choices=('single', 'thread', 'prefork', 'asyncio'),
+                       help='serving mode for the api/index.py subprocess')
+    where.add_argument('--in-process', action='store_true', help='run a threaded server in this process')
+    where.add_argument('--url', help='target an already running server, e.g. http://127.0.0.1:8000')
+    parser.add_argument('--workers', type=int, help='server processes (prefork) or threads (thread)')
+    parser.add_argument('--cache-size', type=int, help='server result cache size (0 disables)')
+    parser.add_argument('--concurrency', type=int, default=16, help='connections per endpoint')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per endpoint')
+    parser.add_argument('--warmup', type=float, default=1.0, help='seconds of warm-up per endpoint')
+    parser.add_argument('--endpoint', action='append', choices=sorted(ENDPOINTS),
+                        help='limit to these endpoints (repeatable)')
+    parser.add_argument('--json', help='save results to this file')
+    parser.add_argument('--compare', help='compare against a saved run')
+    args = parser.parse_args(argv)
+
+    endpoints = {p: ENDPOINTS[p] for p in args.endpoint} if args.endpoint else ENDPOINTS
+    if args.url:
+        url = urlsplit(args.url)
+        server = contextlib.nullcontext((url.hostname, url.port or 80))
+        label = args.url
+    elif args.in_process:
+        server = inprocess_server(args.workers or 8)
+        label = 'in-process thread'
+    else:
+        server = subprocess_server(args.mode, args.workers, args.cache_size)
+        label = f'{args.mode} mode' + (f', {args.workers} workers' if args.workers else '')
+
+    print(f"🚀 Load test: {label}, {args.concurrency} connections, {args.duration:g}s per endpoint")
+    with server as (host, port):
+        results = run(host, port, endpoints, args.concurrency, args.duration, args.warmup)
+    for path, r in results.items():
+        print(f"  {path:<12} {r['rps']:>10.1f} req/s   p50 {r['p50']:>7.2f} ms   "
+              f"p95 {r['p95']:>7.2f} ms   p99 {r['p99']:>7.2f} ms   errors {r['errors']}")
+
+    config = {k: getattr(args, k) for k in ('mode', 'in_process', 'url', 'workers', 'cache_size',
+                                            'concurrency', 'duration')}
+    if args.json:
+        report.write(args.json, 'load', {"config": config, **results})
+    if args.compare:
+        report.compare(args.compare, results, 'rps')
+    return results
+
+
+if __name__ == '__main__':
+    main()
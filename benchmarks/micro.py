@@ -0,0 +1,83 @@
+"""
+Micro-benchmarks of the calculators themselves, no HTTP involved.
+
+Times each calculate_* function, the dispatch path (app.route, with and
+without the result cache) and the batch kernels, and reports the best
+per-call time over several timeit repeats.
+
+    python -m benchmarks.micro [--repeat 5] [--json out.json] [--compare old.json]
+"""
+
+import argparse
+import timeit
+
+from benchmarks import report
+from benchmarks.load import ENDPOINTS
+from india_tools import app, core
+
+BATCH_SIZE = 1000
+
+
+def cases():
+    """name -> zero-argument callable."""
+    age, cgpa, gst, emi = (core.get(name) for name in ('age', 'cgpa', 'gst', 'emi'))
+    out = {
+        'calculate_age': lambda: age.calculate_age('2000-01-15'),
+        'calculate_cgpa': lambda: cgpa.calculate_cgpa(8.5, 'default'),
+        'calculate_gst': lambda: gst.calculate_gst(1000, 18),
+        'calculate_emi': lambda: emi.calculate_emi(1000000, 7, 240),
+        'calculate_emi_schedule': lambda: emi.calculate_emi_schedule(1000000, 7, 240, page_size=240),
+        'calculate_emi_rate': lambda: emi.calculate_emi_rate(1000000, 240, 7752.99),
+        'calculate_emi_tenure': lambda: emi.calculate_emi_tenure(1000000, 7, 7752.99),
+    }
+    for path, body in ENDPOINTS.items():
+        out[f'route {path}'] = lambda path=path, body=body: app.route(path, body)
+        out[f'cached_route {path}'] = lambda path=path, body=body: app.cached_route(path, body)
+    for path, body in ENDPOINTS.items():
+        items = [body] * BATCH_SIZE
+        out[f'batch {path} x{BATCH_SIZE}'] = lambda path=path, items=items: app.route(path + '/batch', items)
+    grid = {'principal': {'start': 500000, 'stop': 5000000, 'step': 250000},
+            'annual_rate': {'start': 6, 'stop': 12, 'step': 0.25}, 'tenure_months': {'start': 60, 'stop': 360, 'step': 12}}
+    out['grid /api/emi/grid 19x25x26'] = lambda: app.route('/api/emi/grid', grid)
+    token = app.route('/api/emi/prepay', dict(ENDPOINTS['/api/emi'], month=12, amount=100000))['state']
+    out['prepay /api/emi/prepay from state'] = lambda: app.route('/api/emi/prepay', {'state': token, 'month': 24, 'amount': 50000})
+    solves = [{'solve': 'rate', 'principal': 1000000 + i, 'tenure_months': 240, 'emi': 7752.99} for i in range(BATCH_SIZE)]
+    out[f'batch /api/emi solve=rate x{BATCH_SIZE}'] = lambda: app.route('/api/emi/batch', solves)
+    dobs = {'dobs': [ENDPOINTS['/api/age']['dob']] * BATCH_SIZE, 'as_of': '2024-03-31'}
+    out[f'bulk /api/age/bulk x{BATCH_SIZE}'] = lambda: app.route('/api/age/bulk', dobs)
+    return out
+
+
+def measure(fn, repeat=5, min_time=0.2):
+    """Best seconds per call over `repeat` runs of about `min_time` each."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return {"us_per_call": round(best * 1e6, 3), "calls_per_s": round(1 / best, 1)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', help='only run cases whose name contains this')
+    parser.add_argument('--json', help='save results to this file')
+    parser.add_argument('--compare', help='compare against a saved run')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, fn in cases().items():
+        if args.filter and args.filter not in name:
+            continue
+        results[name] = r = measure(fn, args.repeat)
+        print(f"  {name:<32} {r['us_per_call']:>12.2f} µs/call {r['calls_per_s']:>14.1f} calls/s")
+
+    if args.json:
+        report.write(args.json, 'micro', results)
+    if args.compare:
+        report.compare(args.compare, results, 'calls_per_s')
+    return results
+
+
+if __name__ == '__main__':
+    main()
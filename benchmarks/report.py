@@ -0,0 +1,66 @@
+"""
+Shared helpers for benchmark results: run metadata, percentiles, JSON
+files and run-to-run comparison.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """Nearest-rank percentiles of `samples` (seconds) in milliseconds."""
+    if not samples:
+        return {f"p{p}": None for p in points}
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {f"p{p}": round(ordered[min(last, int(p / 100 * len(ordered)))] * 1000, 3) for p in points}
+
+
+def write(path, kind, results):
+    data = {"kind": kind, "meta": metadata(), "results": results}
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+    print(f"\n💾 Saved {path}")
+    return data
+
+
+def compare(path, results, metric, higher_is_better=True):
+    """
+    Print metric deltas between a saved run at `path` and `results`
+    ({name: {metric: value}}); returns {name: change in percent}.
+    """
+    with open(path) as f:
+        old = json.load(f)
+    print(f"\n📊 vs {path} (commit {old['meta'].get('commit')}):")
+    changes = {}
+    for name, new in results.items():
+        before = old['results'].get(name, {}).get(metric)
+        after = new.get(metric)
+        if not before or after is None:
+            continue
+        change = changes[name] = (after - before) / before * 100
+        better = change > 0 if higher_is_better else change < 0
+        print(f"  {name:<24} {metric} {before:>12.2f} -> {after:>12.2f}  "
+              f"{change:+6.1f}% {'✅' if better else '⚠️ '}")
+    return changes
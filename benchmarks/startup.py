@@ -0,0 +1,138 @@
+"""
+Cold-start cost per API entry point.
+
+Each sample spawns a fresh interpreter that imports one entry point
+(api/age.py, ..., api/index.py), the way a new Vercel instance does,
+and then answers one request through it. Reports median wall time over
+a bare `python -c pass` baseline for the import and for import plus
+first request, and which india_tools modules and how many modules in
+total got imported. Runs once without the static-table snapshot
+(india_tools.snapshot) and once with a freshly built one.
+
+--profile N prints each entry point's N slowest imports (cumulative and
+self time, the best of --runs `python -X importtime` runs): where a
+cold start goes.
+
+    python -m benchmarks.startup [--runs 20] [--profile 15] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from india_tools import snapshot
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# entry point -> the request its first invocation answers
+ENTRY_POINTS = {
+    'api.age': ('/api/age', {'dob': '1990-05-15'}),
+    'api.cgpa': ('/api/cgpa', {'cgpa': 8.2, 'university': 'VTU'}),
+    'api.gst': ('/api/gst', {'amount': 1000, 'rate': 18}),
+    'api.emi': ('/api/emi', {'principal': 1000000, 'annual_rate': 8.5, 'tenure_months': 240}),
+    'api.index': ('/api/age', {'dob': '1990-05-15'}),
+}
+
+_PROBE = (
+    "import json, sys; import {module}; "
+    "print(json.dumps([len(sys.modules), sorted(m for m in sys.modules if m.startswith('india_tools'))]))"
+)
+_REQUEST = "import {module}; from india_tools.app import route; route({path!r}, {body!r})"
+
+
+def _time_once(code, env=None):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True, env=env,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def measure(module, runs, env=None):
+    path, body = ENTRY_POINTS[module]
+    samples = [_time_once(f'import {module}', env) for _ in range(runs)]
+    first = [_time_once(_REQUEST.format(module=module, path=path, body=body), env) for _ in range(runs)]
+    probe = subprocess.run([sys.executable, '-c', _PROBE.format(module=module)], cwd=ROOT, env=env,
+                           check=True, capture_output=True, text=True)
+    total_modules, ours = json.loads(probe.stdout)
+    return {
+        "median_ms": round(statistics.median(samples), 2),
+        "min_ms": round(min(samples), 2),
+        "first_request_ms": round(statistics.median(first), 2),
+        "modules": total_modules,
+        "india_tools_modules": ours,
+    }
+
+
+def profile(module, runs, top=15, env=None):
+    """[(module, cumulative_ms, self_ms)] of the `top` slowest imports, best of `runs`."""
+    best = {}
+    for _ in range(runs):
+        err = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=ROOT, env=env,
+                             check=True, capture_output=True, text=True).stderr
+        for line in err.splitlines():
+            if not line.startswith('import time:') or line.endswith('| imported package'):
+                continue
+            own, cumulative, name = line.removeprefix('import time:').split('|')
+            name = name.strip()
+            times = (int(cumulative) / 1000, int(own) / 1000)
+            if name not in best or times < best[name]:
+                best[name] = times
+    ranked = sorted(best.items(), key=lambda item: -item[1][0])[:top]
+    return [(name, round(cumulative, 2), round(own, 2)) for name, (cumulative, own) in ranked]
+
+
+def run(runs=20, top=0):
+    """{'baseline_ms', 'entry_points': {'<module> <snapshot|no snapshot>': {...}}, 'profiles'}."""
+    baseline = statistics.median(_time_once('pass') for _ in range(runs))
+    results = {"python": sys.version.split()[0], "baseline_ms": round(baseline, 2), "entry_points": {},
+               "profiles": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        saved = os.path.join(tmp, 'snapshot.bin')
+        snapshot.write(saved)
+        for label, file in (('no snapshot', '0'), ('snapshot', saved)):
+            env = {**os.environ, 'API_SNAPSHOT': file}
+            for module in ENTRY_POINTS:
+                r = measure(module, runs, env)
+                r["import_ms"] = round(r["median_ms"] - baseline, 2)
+                r["first_request_import_ms"] = round(r["first_request_ms"] - baseline, 2)
+                results["entry_points"][f'{module} {label}'] = r
+        if top:
+            env = {**os.environ, 'API_SNAPSHOT': '0'}
+            for module in ENTRY_POINTS:
+                results["profiles"][module] = profile(module, runs, top, env)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--profile', type=int, default=0, metavar='N', help='show the N slowest imports')
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args(argv)
+
+    results = run(args.runs, args.profile)
+    print(f"interpreter baseline: {results['baseline_ms']:.1f} ms (median of {args.runs})\n")
+    print(f"{'entry point':<24} {'median':>9} {'+import':>9} {'+request':>9} {'modules':>8}  india_tools modules")
+    for name, r in results["entry_points"].items():
+        ours = ', '.join(m.removeprefix('india_tools.') for m in r["india_tools_modules"])
+        print(f"{name:<24} {r['median_ms']:>7.1f}ms {r['import_ms']:>7.1f}ms {r['first_request_import_ms']:>7.1f}ms "
+              f"{r['modules']:>8}  {ours}")
+    for module, imports in results["profiles"].items():
+        print(f"\n{module}: slowest imports (cumulative / self ms)")
+        for name, cumulative, own in imports:
+            print(f"  {cumulative:>8.1f} {own:>7.1f}  {name}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved {args.json}")
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Binary protocol (india_tools.wire) against JSON over HTTP, localhost only.
+
+Starts api/index.py with --wire-port (or serves both in-process) and,
+per endpoint, first checks the two return identical results, then
+drives each from one client for `--duration` seconds:
+
+    http        POST with a JSON body on a keep-alive connection, one at a time
+    wire        the same request as a binary frame, one at a time
+    pipelined   binary frames, `--window` in flight
+
+    python -m benchmarks.wire --duration 3
+    python -m benchmarks.wire --mode asyncio --json wire.json --compare old.json
+"""
+
+import argparse
+import contextlib
+import http.client
+import io
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks import load, report
+from india_tools import codec, wire
+
+WAYS = ('http', 'wire', 'pipelined')
+
+
+@contextlib.contextmanager
+def subprocess_servers(mode='thread'):
+    port, wire_port = load._free_port(), load._free_port()
+    cmd = [sys.executable, os.path.join(report.ROOT, 'api', 'index.py'), '--mode', mode,
+           '--port', str(port), '--wire-port', str(wire_port)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        load._wait_for_port('127.0.0.1', port)
+        load._wait_for_port('127.0.0.1', wire_port)
+        yield '127.0.0.1', port, wire_port
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+@contextlib.contextmanager
+def inprocess_servers(threads=4):
+    from api.index import execute
+    from india_tools import logs
+
+    with load.inprocess_server(threads) as (host, port), contextlib.redirect_stdout(io.StringIO()):
+        level = logs.LOG.level
+        logs.LOG.configure(level='ERROR')
+        background = wire.Background(execute, host, 0)
+        try:
+            yield host, port, background.addresses[0][1]
+        finally:
+            background.stop()
+            logs.LOG.configure(level=level)
+
+
+def _http(conn, path, body):
+    conn.request('POST', path, codec.dumps(body), {'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    return response.status, codec.loads(response.read())
+
+
+def check(host, port, wire_port, endpoints):
+    """The same request over both: identical results (AssertionError otherwise)."""
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    with wire.Client(host, wire_port) as client:
+        for path, body in endpoints.items():
+            status, expected = _http(conn, path, body)
+            got = client.call(path, body)
+            same = got == expected and [type(v) for v in got.values()] == [type(v) for v in expected.values()]
+            assert status == 200 and same, (path, got, expected)
+    conn.close()
+
+
+def _drive(call, duration, per_call=1):
+    latencies = []
+    start = time.perf_counter()
+    deadline = start + duration
+    while time.perf_counter() < deadline:
+        began = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - began)
+    elapsed = time.perf_counter() - start
+    return {"requests": len(latencies) * per_call, "rps": round(len(latencies) * per_call / elapsed, 1),
+            **report.percentiles(latencies)}
+
+
+def run(host, port, wire_port, endpoints=load.ENDPOINTS, duration=3.0, window=100, warmup=0.5):
+    """{'<way> <path>': {rps, p50, ...}} for each way of sending each endpoint's request."""
+    check(host, port, wire_port, endpoints)
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    results = {}
+    with wire.Client(host, wire_port) as client:
+        for path, body in endpoints.items():
+            batch = [(path, body)] * window
+            ways = {
+                'http': (lambda: _http(conn, path, body), 1),
+                'wire': (lambda: client.call(path, body), 1),
+                'pipelined': (lambda: client.pipeline(batch, window), window),
+            }
+            for way, (call, per_call) in ways.items():
+                if warmup:
+                    _drive(call, warmup, per_call)
+                results[f'{way} {path}'] = _drive(call, duration, per_call)
+    conn.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    where = parser.add_mutually_exclusive_group()
+    where.add_argument('--mode', default='thread', choices=('single', 'thread', 'asyncio'),
+                       help='serving mode for the api/index.py subprocess')
+    where.add_argument('--in-process', action='store_true', help='serve both protocols in this process')
+    parser.add_argument('--duration', type=float, default=3.0, help='seconds per endpoint and way')
+    parser.add_argument('--window', type=int, default=100, help='requests in flight when pipelining')
+    parser.add_argument('--endpoint', action='append', choices=sorted(load.ENDPOINTS),
+                        help='limit to these endpoints (repeatable)')
+    parser.add_argument('--json', help='save results to this file')
+    parser.add_argument('--compare', help='compare against a saved run')
+    args = parser.parse_args(argv)
+
+    endpoints = {p: load.ENDPOINTS[p] for p in args.endpoint} if args.endpoint else load.ENDPOINTS
+    servers = inprocess_servers() if args.in_process else subprocess_servers(args.mode)
+    label = 'in-process' if args.in_process else f'{args.mode} mode'
+    print(f"🚀 Binary protocol vs JSON/HTTP: {label}, {args.duration:g}s per endpoint and way")
+    with servers as (host, port, wire_port):
+        results = run(host, port, wire_port, endpoints, args.duration, args.window)
+    print("✅ identical results over both protocols")
+    for path in endpoints:
+        base = results[f'http {path}']['rps']
+        for way in WAYS:
+            r = results[f'{way} {path}']
+            print(f"  {path:<10} {way:<10} {r['rps']:>10.1f} req/s  x{r['rps'] / base:5.1f}   "
+                  f"p50 {r['p50']:>7.3f} ms   p99 {r['p99']:>7.3f} ms")
+
+    if args.json:
+        config = {k: getattr(args, k) for k in ('mode', 'in_process', 'duration', 'window')}
+        report.write(args.json, 'wire', {"config": config, **results})
+    if args.compare:
+        report.compare(args.compare, results, 'rps')
+    return results
+
+
+if __name__ == '__main__':
+    main()
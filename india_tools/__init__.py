@@ -0,0 +1,6 @@
+"""
+india-tools server-side package.
+
+Kept import-free on purpose: each Vercel function only pays for the
+submodules it actually uses.
+"""
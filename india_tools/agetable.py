@@ -0,0 +1,181 @@
+"""
+Ages against one reference date, from a per-day lookup table.
+
+for_date(as_of) builds (once per reference date) everything that does
+not depend on the date of birth: the reference ordinal, the length of
+the month before it, and for each month of the SPAN years up to it the
+ordinal of the day before its 1st plus its length. An ISO date
+'YYYY-MM-DD' then costs a fixed-width parse, one table lookup and a few
+integer operations. With NumPy installed, columns() parses and
+evaluates a whole column as arrays. The month rows come out of the
+snapshot (india_tools.snapshot) when it has them, so a cold start pays
+a list slice per reference date instead of SPAN x 12 date computations.
+
+Only the canonical 'YYYY-MM-DD' form within the table is handled here;
+anything else (other ISO forms, older or future dates, non-strings)
+comes back as None so callers can run it through the single-item path
+and report exactly the same errors.
+"""
+
+from datetime import date
+from functools import lru_cache
+
+from india_tools import snapshot
+
+np = None  # NumPy, looked up by the first columns() call big enough to use it
+_numpy_checked = False
+
+SPAN = 200  # years of birth dates covered, back from the reference year
+
+_DASH, _ZERO = ord('-'), ord('0')
+_DAYS = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def month_length(year, month):
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return 29
+    return _DAYS[month - 1]
+
+
+def months(first, last):
+    """(offsets, lengths) for every month of the years first..last - 1, January first."""
+    offsets, lengths = [], []
+    for year in range(first, last):
+        start = date(year, 1, 1).toordinal() - 1
+        for month in range(1, 13):
+            length = month_length(year, month)
+            offsets.append(start)
+            lengths.append(length)
+            start += length
+    return offsets, lengths
+
+
+class AgeTable:
+    __slots__ = ('as_of', 'ordinal', 'year', 'month', 'day', 'days_in_prev', 'base', 'offsets', 'lengths')
+
+    def __init__(self, as_of):
+        self.as_of = as_of
+        self.ordinal = as_of.toordinal()
+        self.year, self.month, self.day = as_of.year, as_of.month, as_of.day
+        prev_month = as_of.month - 1 or 12
+        prev_year = as_of.year if as_of.month != 1 else as_of.year - 1
+        self.days_in_prev = month_length(prev_year, prev_month)
+
+        # index (year - base) * 12 + month - 1 -> ordinal of the day before the 1st / month length
+        self.base = max(1, as_of.year - SPAN + 1)
+        self.offsets, self.lengths = (snapshot.months(self.base, as_of.year + 1)
+                                     or months(self.base, as_of.year + 1))
+
+    def age(self, dob):
+        """(years, months, days, total_days) for a 'YYYY-MM-DD' string, or None."""
+        if (type(dob) is not str or len(dob) != 10 or dob[4] != '-' or dob[7] != '-'
+                or not dob.isascii() or not (dob[:4] + dob[5:7] + dob[8:]).isdigit()):
+            return None
+        year, month, day = int(dob[:4]), int(dob[5:7]), int(dob[8:])
+        i = (year - self.base) * 12 + month - 1
+        if not (1 <= month <= 12 and 0 <= i < len(self.offsets) and 1 <= day <= self.lengths[i]):
+            return None
+        total_days = self.ordinal - self.offsets[i] - day
+        if total_days < 0:
+            return None  # in the future
+
+        years = self.year - year
+        months = self.month - month
+        days = self.day - day
+        if days < 0:
+            months -= 1
+            days += self.days_in_prev
+        if months < 0:
+            years -= 1
+            months += 12
+        return years, months, days, total_days
+
+    def columns(self, dobs):
+        """
+        Ages for a column of dates -> (years, months, days, total_days)
+        lists, with None in every column where age() would return None.
+        """
+        if len(dobs) >= 64 and _numpy() is not None:
+            try:
+                return self._columns_np(dobs)
+            except (ValueError, TypeError):
+                pass  # ragged or odd input: the scalar path copes with anything
+        years, months, days, total = [], [], [], []
+        age = self.age
+        for dob in dobs:
+            r = age(dob)
+            if r is None:
+                years.append(None)
+                months.append(None)
+                days.append(None)
+                total.append(None)
+            else:
+                years.append(r[0])
+                months.append(r[1])
+                days.append(r[2])
+                total.append(r[3])
+        return years, months, days, total
+
+    def _columns_np(self, dobs):
+        is_str = np.fromiter((type(d) is str for d in dobs), dtype=bool, count=len(dobs))
+        text = np.array(dobs, dtype=str)
+        if text.ndim != 1 or text.dtype.itemsize < 40:  # '<U10' or wider
+            raise ValueError("not a column of date strings")
+        width = text.dtype.itemsize // 4
+        codes = text.view(np.uint32).reshape(len(dobs), width)
+        digits = codes[:, [0, 1, 2, 3, 5, 6, 8, 9]].astype(np.int64) - _ZERO
+        ok = (is_str & (codes[:, 4] == _DASH) & (codes[:, 7] == _DASH)
+              & ((digits >= 0) & (digits <= 9)).all(axis=1))
+        if width > 10:
+            ok &= (codes[:, 10:] == 0).all(axis=1)  # exactly ten characters
+        year = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + digits[:, 3]
+        month = digits[:, 4] * 10 + digits[:, 5]
+        day = digits[:, 6] * 10 + digits[:, 7]
+
+        offsets = np.asarray(self.offsets, dtype=np.int64)
+        lengths = np.asarray(self.lengths, dtype=np.int64)
+        i = (year - self.base) * 12 + month - 1
+        ok &= (month >= 1) & (month <= 12) & (i >= 0) & (i < len(offsets))
+        i = np.where(ok, i, 0)
+        ok &= (day >= 1) & (day <= lengths[i])
+        total = self.ordinal - offsets[i] - day
+        ok &= total >= 0
+
+        years = self.year - year
+        months = self.month - month
+        days = self.day - day
+        borrow = days < 0
+        months -= borrow
+        days += borrow * self.days_in_prev
+        borrow = months < 0
+        years -= borrow
+        months += borrow * 12
+
+        declined = np.flatnonzero(~ok).tolist()
+        out = tuple(column.tolist() for column in (years, months, days, total))
+        for column in out:
+            for j in declined:
+                column[j] = None
+        return out
+
+
+def _numpy():
+    # Imported lazily: single ages (and Vercel cold starts) never need it
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy as np
+        except ImportError:  # pragma: no cover - exercised on minimal installs
+            np = None
+    return np
+
+
+@lru_cache(maxsize=64)
+def _table(ordinal):
+    return AgeTable(date.fromordinal(ordinal))
+
+
+def for_date(as_of=None):
+    """The (cached) table for `as_of`, a date; default today."""
+    return _table((as_of or date.today()).toordinal())
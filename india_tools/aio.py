@@ -0,0 +1,386 @@
+"""
+asyncio front end for the calculator endpoints.
+
+One event loop holds every connection, so thousands of idle keep-alive
+clients cost a coroutine each instead of a thread each. Routing is
+delegated to a `dispatch(path, body) -> dict` callable (api/index.py's
+`route`), which raises LookupError for unknown paths and any other
+exception for bad input, exactly like APIHandler. limits.LIMITS
+(body size, rate, body read timeout) is checked before a body is read.
+
+A request the optional `threaded(path)` predicate picks (api/index.py
+passes offload's: the paths that may wait on the process pool) is
+handled in a worker thread, so waiting on it doesn't stall the loop.
+
+Two ways in:
+    serve(dispatch, host, port)   built-in HTTP/1.1 server
+    ASGIApp(dispatch)             for any ASGI server, e.g.
+                                  `uvicorn api.index:app`
+"""
+
+import asyncio
+import signal
+from http import HTTPStatus
+
+from india_tools import codec, limits, metrics, offload, profiling, streaming
+
+CORS_HEADERS = (
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Methods', 'GET, POST, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type'),
+)
+
+MAX_HEAD = 64 * 1024
+
+
+def handle(dispatch, method, target, body, headers=None, get=None, observe=None):
+    """
+    Transport-independent request handling -> (status, headers, payload).
+
+    headers: request headers with lower-case names.
+    get: optional get(path, query, if_none_match) -> (status, headers, payload)
+    answering GET requests. payload is bytes, or an iterator of byte
+    chunks for streamed (NDJSON / CSV) responses.
+    observe: optional observe(method, path, status, timer, error) called
+    once the response is produced (for streams: once fully iterated).
+    """
+    timer = metrics.Timer()
+    path = target.partition('?')[0]
+    if profiling.PROFILER.enabled and method == 'POST':
+        with profiling.PROFILER.request():
+            status, out_headers, payload, error = _handle(dispatch, method, target, body, headers or {}, get, timer)
+    else:
+        status, out_headers, payload, error = _handle(dispatch, method, target, body, headers or {}, get, timer)
+    if metrics.DEBUG:
+        out_headers = [*out_headers, ('Server-Timing', metrics.server_timing(timer))]
+    if observe is not None:
+        if isinstance(payload, bytes):
+            observe(method, path, status, timer, error)
+        else:
+            payload = metrics.timed_chunks(
+                payload, timer, lambda error: observe(method, path, status, timer, error))
+    return status, out_headers, payload
+
+
+def _handle(dispatch, method, target, body, headers, get, timer):
+    path, _, query = target.partition('?')
+    if method == 'OPTIONS':
+        return 200, list(CORS_HEADERS), b'', None
+    if method == 'GET' and get is not None:
+        status, out_headers, payload = get(path, query, headers.get('if-none-match'))
+        timer.lap('calc')
+        return status, [*out_headers, *CORS_HEADERS], payload, None
+    if method != 'POST':
+        return (*_json(501, {"error": f"Unsupported method ({method})"}), None)
+    try:
+        data = codec.loads(body) if body else {}
+        media_type = streaming.negotiate(headers.get('accept'))
+        timer.lap('parse')
+        if media_type == streaming.JSON:
+            result = dispatch(path, data)
+            timer.lap('calc')
+            response = _json(200, result)
+            timer.lap('serialize')
+            return (*response, None)
+        result = dispatch(path, data, stream=True)
+        timer.lap('calc')
+        headers = [('Content-Type', streaming.content_type(media_type)), *CORS_HEADERS]
+        return 200, headers, streaming.encode(result, media_type), None
+    except LookupError:
+        timer.fail()
+        return (*_json(404, {"error": "Endpoint not found"}), None)
+    except offload.Busy as e:
+        timer.fail()
+        status, out_headers, payload = _json(503, {"error": str(e)})
+        return status, [*out_headers, ('Retry-After', str(e.retry_after))], payload, str(e)
+    except Exception as e:
+        timer.fail()
+        return (*_json(400, {"error": str(e)}), str(e))
+
+
+def _json(status, data):
+    payload = codec.dumps(data)
+    return status, [('Content-Type', 'application/json'), *CORS_HEADERS], payload
+
+
+# ============ Built-in HTTP/1.1 server ============
+class _BadRequest(Exception):
+    pass
+
+
+def _encode_head(status, headers, keep_alive, length=None, chunked=False):
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = ''
+    lines = [f'HTTP/1.1 {status} {reason}']
+    lines += [f'{k}: {v}' for k, v in headers]
+    if length is not None:
+        lines.append(f'Content-Length: {length}')
+    elif chunked:
+        lines.append('Transfer-Encoding: chunked')
+    lines.append('Connection: keep-alive' if keep_alive else 'Connection: close')
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+def _encode_response(status, headers, payload, keep_alive):
+    if status == 304:
+        return _encode_head(status, headers, keep_alive)
+    return _encode_head(status, headers, keep_alive, len(payload)) + payload
+
+
+def _parse_head(raw):
+    try:
+        text = raw.decode('latin-1')
+        request_line, *header_lines = text.split('\r\n')
+        method, target, version = request_line.split(' ')
+    except ValueError:
+        raise _BadRequest("Bad request line")
+    if not version.startswith('HTTP/1.'):
+        raise _BadRequest("Unsupported HTTP version")
+    headers = {}
+    for line in header_lines:
+        if not line:
+            continue
+        name, sep, value = line.partition(':')
+        if not sep:
+            raise _BadRequest("Bad header line")
+        headers[name.strip().lower()] = value.strip()
+    return method, target, version, headers
+
+
+class AsyncServer:
+    """Keep-alive HTTP/1.1 server on asyncio streams."""
+
+    def __init__(self, dispatch, idle_timeout=5.0, get=None, observe=None, threaded=None):
+        self.dispatch = dispatch
+        self.get = get
+        self.observe = observe
+        self.threaded = threaded
+        self.idle_timeout = idle_timeout
+        self.draining = False
+        self._server = None
+        self._idle = set()
+        self._busy = set()
+
+    async def start(self, host='127.0.0.1', port=8000, **kwargs):
+        self._server = await asyncio.start_server(self._client, host, port,
+                                                  limit=MAX_HEAD, **kwargs)
+        return self._server
+
+    @property
+    def sockets(self):
+        return self._server.sockets if self._server else ()
+
+    async def _client(self, reader, writer):
+        try:
+            while not self.draining:
+                self._idle.add(writer)
+                try:
+                    head = await self._read_head(reader)
+                finally:
+                    self._idle.discard(writer)
+                self._busy.add(writer)
+                try:
+                    keep_alive = await self._one_request(head, reader, writer)
+                finally:
+                    self._busy.discard(writer)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            pass
+        except asyncio.LimitOverrunError:
+            writer.write(_encode_response(*_json(431, {"error": "Request header too large"}), False))
+        finally:
+            writer.close()
+
+    async def _read_head(self, reader):
+        # Idle until a request starts; then its whole head gets read_timeout, however it trickles in
+        started = False
+        try:
+            async with asyncio.timeout(self.idle_timeout) as deadline:
+                first = await reader.readexactly(1)
+                started = True
+                deadline.reschedule(asyncio.get_running_loop().time() + limits.LIMITS.read_timeout)
+                return first + await reader.readuntil(b'\r\n\r\n')
+        except TimeoutError:
+            if started:
+                limits.LIMITS.count('timeout')
+            raise
+
+    async def _one_request(self, head, reader, writer):
+        try:
+            method, target, version, headers = _parse_head(head[:-4])
+            if 'transfer-encoding' in headers:
+                raise _BadRequest("Chunked request bodies are not supported")
+            length = 0
+            if method != 'OPTIONS':
+                length = limits.LIMITS.admit(_client(writer), target.partition('?')[0], headers.get('content-length'))
+        except (_BadRequest, ValueError) as e:
+            return await self._refuse(writer, 400, str(e))
+        except limits.Rejected as e:
+            return await self._refuse(writer, e.status, str(e), e.headers)
+
+        try:
+            body = await asyncio.wait_for(reader.readexactly(length), limits.LIMITS.read_timeout) if length else b''
+        except asyncio.TimeoutError:
+            limits.LIMITS.count('timeout')
+            return await self._refuse(writer, 408, "Request body not received in time")
+        connection = headers.get('connection', '').lower()
+        if version == 'HTTP/1.0':
+            keep_alive = connection == 'keep-alive'
+        else:
+            keep_alive = connection != 'close'
+        keep_alive = keep_alive and not self.draining
+
+        status, out_headers, payload = await _call(self.threaded, self.dispatch, method, target, body, headers,
+                                                   self.get, self.observe)
+        if isinstance(payload, bytes):
+            writer.write(_encode_response(status, out_headers, payload, keep_alive))
+            await writer.drain()
+            return keep_alive
+        return await self._stream(writer, status, out_headers, payload, keep_alive, version)
+
+    async def _refuse(self, writer, status, error, headers=()):
+        # Answered from the head alone, the body (if any) unread: close the connection
+        status, out_headers, payload = _json(status, {"error": error})
+        writer.write(_encode_response(status, [*out_headers, *headers], payload, False))
+        await writer.drain()
+        return False
+
+    async def _stream(self, writer, status, headers, chunks, keep_alive, version):
+        chunked = version == 'HTTP/1.1'
+        keep_alive = keep_alive and chunked  # HTTP/1.0: the body ends when the connection does
+        writer.write(_encode_head(status, headers, keep_alive, chunked=chunked))
+        try:
+            for chunk in chunks:
+                if chunk:
+                    writer.write(b'%x\r\n%s\r\n' % (len(chunk), chunk) if chunked else chunk)
+                    await writer.drain()  # backpressure: one chunk in flight
+            if chunked:
+                writer.write(b'0\r\n\r\n')
+            await writer.drain()
+        except Exception:
+            return False  # headers already sent: cutting the connection marks truncation
+        return keep_alive
+
+    async def drain(self, timeout=30.0):
+        """Stop accepting, cut idle keep-alive connections, wait for in-flight ones."""
+        self.draining = True
+        self._server.close()
+        for writer in list(self._idle):
+            writer.close()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self._busy and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+        await self._server.wait_closed()
+        return not self._busy
+
+
+def _client(writer):
+    peer = writer.get_extra_info('peername')
+    return peer[0] if isinstance(peer, tuple) else peer
+
+
+async def _call(threaded, dispatch, method, target, body, headers, get, observe):
+    if threaded is not None and method == 'POST' and threaded(target.partition('?')[0]):
+        return await asyncio.to_thread(handle, dispatch, method, target, body, headers, get, observe)
+    return handle(dispatch, method, target, body, headers, get, observe)
+
+
+async def _serve(dispatch, host, port, idle_timeout, drain_timeout, get, observe, threaded):
+    server = AsyncServer(dispatch, idle_timeout, get, observe, threaded)
+    await server.start(host, port, backlog=1024)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # not on this platform / not the main thread
+    await stop.wait()
+    await server.drain(drain_timeout)
+
+
+def serve(dispatch, host='127.0.0.1', port=8000, idle_timeout=5.0, drain_timeout=30.0, get=None,
+          observe=None, threaded=None):
+    """Run the asyncio server until SIGTERM/Ctrl-C, then drain."""
+    try:
+        asyncio.run(_serve(dispatch, host, port, idle_timeout, drain_timeout, get, observe, threaded))
+    except KeyboardInterrupt:
+        pass
+
+
+# ============ ASGI ============
+class ASGIApp:
+    """ASGI 3 application wrapping the same dispatch."""
+
+    def __init__(self, dispatch, get=None, observe=None, threaded=None):
+        self.dispatch = dispatch
+        self.get = get
+        self.observe = observe
+        self.threaded = threaded
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        if scope['type'] != 'http':
+            return
+
+        request_headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope.get('headers', ())}
+        if scope['method'] != 'OPTIONS':
+            client = scope.get('client')
+            try:
+                limits.LIMITS.admit(client[0] if client else None, scope['path'], request_headers.get('content-length'))
+            except limits.Rejected as e:
+                return await self._refuse(send, e.status, str(e), e.headers)
+
+        chunks = []
+        size = 0
+        more = True
+        while more:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > limits.LIMITS.max_body:  # no (or a lying) Content-Length
+                limits.LIMITS.count('body')
+                return await self._refuse(send, 413, f"Request body too large (max {limits.LIMITS.max_body} bytes)")
+            chunks.append(chunk)
+            more = message.get('more_body', False)
+
+        target = scope['path']
+        if scope.get('query_string'):
+            target += '?' + scope['query_string'].decode('latin-1')
+        status, headers, payload = await _call(self.threaded, self.dispatch, scope['method'], target,
+                                               b''.join(chunks), request_headers, self.get, self.observe)
+        headers = [(k.lower().encode(), v.encode()) for k, v in headers]
+        if isinstance(payload, bytes):
+            if status != 304:
+                headers.append((b'content-length', str(len(payload)).encode()))
+            await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+            await send({'type': 'http.response.body', 'body': payload})
+            return
+
+        # Streamed: the server picks the framing (chunked on HTTP/1.1)
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        for chunk in payload:
+            if chunk:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    @staticmethod
+    async def _refuse(send, status, error, headers=()):
+        status, out_headers, payload = _json(status, {"error": error})
+        headers = [(k.lower().encode(), v.encode()) for k, v in [*out_headers, *headers]]
+        headers.append((b'content-length', str(len(payload)).encode()))
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': payload})
@@ -0,0 +1,143 @@
+"""
+Vectorized EMI and amortization schedules.
+
+Balances use the closed form
+
+    B(k) = P(1+r)^k - EMI((1+r)^k - 1) / r        (B(k) = P - k*EMI when r = 0)
+
+so any window of months is computed directly, without walking the loan
+from month 1. That is what makes paging through a 30-year schedule cheap.
+
+NumPy is optional (`pip install india-tools[fast]`). Without it the same
+functions work on plain lists; results agree to floating-point noise.
+"""
+
+import math
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised on minimal installs
+    np = None
+
+COLUMNS = ('month', 'opening_balance', 'interest', 'principal', 'closing_balance')
+
+
+def emi(principal, annual_rate, tenure_months):
+    """
+    EMI for one loan or for arrays of loans in one pass.
+
+    Arguments broadcast against each other (NumPy) or are equal-length
+    sequences / scalars (fallback). Inputs are assumed validated.
+    """
+    if np is not None:
+        p = np.asarray(principal, dtype=float)
+        n = np.asarray(tenure_months, dtype=float)
+        r = np.asarray(annual_rate, dtype=float) / 12 / 100
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            growth = (1 + r) ** n
+            out = np.where(growth == 1, p / n, p * r * growth / (growth - 1))  # 0% or a negligible rate
+        return out if out.ndim else float(out)
+
+    if not hasattr(principal, '__len__'):
+        return _emi_scalar(principal, annual_rate, tenure_months)
+    size = max(len(x) for x in (principal, annual_rate, tenure_months) if hasattr(x, '__len__'))
+    p, a, n = (x if hasattr(x, '__len__') else [x] * size for x in (principal, annual_rate, tenure_months))
+    return [_emi_scalar(*loan) for loan in zip(p, a, n)]
+
+
+def _emi_scalar(principal, annual_rate, tenure_months):
+    monthly_rate = annual_rate / 12 / 100
+    growth = (1 + monthly_rate) ** tenure_months
+    if growth == 1:
+        return principal / tenure_months
+    return principal * monthly_rate * growth / (growth - 1)
+
+
+def schedule(principal, annual_rate, tenure_months, start=1, stop=None):
+    """
+    Month-by-month amortization for months start..stop (1-based, inclusive).
+
+    Returns {column: array} for COLUMNS; arrays are NumPy arrays when
+    NumPy is installed, lists otherwise. Values are unrounded.
+    """
+    stop = tenure_months if stop is None else min(stop, tenure_months)
+    start = max(start, 1)
+    payment = _emi_scalar(principal, annual_rate, tenure_months)
+    monthly_rate = annual_rate / 12 / 100
+
+    if np is not None:
+        months = np.arange(start, stop + 1)
+        k = np.arange(start - 1, stop + 1, dtype=float)  # balances after months start-1 .. stop
+        if monthly_rate == 0:
+            balances = principal - payment * k
+        else:
+            growth = (1 + monthly_rate) ** k
+            balances = principal * growth - payment * (growth - 1) / monthly_rate
+        if not np.isfinite(balances).all():
+            raise OverflowError("Schedule values out of range")
+        opening = balances[:-1]
+        closing = balances[1:]
+        interest = opening * monthly_rate
+        return {
+            'month': months,
+            'opening_balance': opening,
+            'interest': interest,
+            'principal': payment - interest,
+            'closing_balance': closing,
+        }
+
+    if monthly_rate == 0:
+        balances = [principal - payment * k for k in range(start - 1, stop + 1)]
+    else:
+        balances = []
+        for k in range(start - 1, stop + 1):
+            growth = (1 + monthly_rate) ** k
+            balances.append(principal * growth - payment * (growth - 1) / monthly_rate)
+    opening = balances[:-1]
+    interest = [b * monthly_rate for b in opening]
+    return {
+        'month': list(range(start, stop + 1)),
+        'opening_balance': opening,
+        'interest': interest,
+        'principal': [payment - i for i in interest],
+        'closing_balance': balances[1:],
+    }
+
+
+def rounded(columns, digits=2):
+    """Schedule columns as JSON-ready lists rounded like the calculators (no -0.0)."""
+    out = {}
+    for name, values in columns.items():
+        if name == 'month':
+            values = values.tolist() if hasattr(values, 'tolist') else values
+            out[name] = [int(m) for m in values]
+        else:
+            out[name] = round_values(values, digits)
+    return out
+
+
+def round_values(values, digits=2):
+    """
+    [round(v, digits) + 0.0 for v in values], vectorized for NumPy arrays.
+
+    rint(v * 10**digits) / 10**digits is what round() gives unless
+    v * 10**digits lands next to a .5 tie, where the float error of the
+    scaling can matter; those few values go through round() itself.
+    Non-finite values become None.
+    """
+    if np is None or not hasattr(values, 'dtype'):
+        return [round(v, digits) + 0.0 if math.isfinite(v) else None for v in values]
+    values = np.asarray(values, dtype=float).ravel()
+    scale = 10.0 ** digits
+    with np.errstate(invalid='ignore', over='ignore'):
+        scaled = values * scale
+        out = np.rint(scaled) / scale + 0.0
+        near_tie = np.abs(scaled - np.floor(scaled) - 0.5) <= 1e-13 * np.maximum(1.0, np.abs(scaled))
+    finite = np.isfinite(scaled)
+    out = out.tolist()
+    for i in np.flatnonzero(near_tie & finite).tolist():
+        out[i] = round(float(values[i]), digits) + 0.0
+    if not finite.all():
+        for i in np.flatnonzero(~finite).tolist():
+            out[i] = round(float(values[i]), digits) + 0.0 if math.isfinite(values[i]) else None
+    return out
@@ -0,0 +1,193 @@
+"""
+Request routing shared by every front end: the threaded/prefork
+HTTPServer, the asyncio server, the ASGI app and the Vercel functions.
+
+    /api/<tool>              single calculation (cacheable, GET or POST)
+    /api/<tool>/batch        array of inputs for one tool
+    /api/<tool>/<extra>      tool-specific routes, e.g. /api/emi/schedule
+    /api/batch               mixed array of {"tool", "input"} items
+
+Paths are looked up in core.ROUTES, built from the tool registry at
+import; tools themselves are imported on first request.
+Front ends answer POSTs through execute(), which runs heavy requests in
+the OFFLOAD process pool when one is configured, and report each
+finished request through record(), which feeds the request log and the
+Prometheus counters behind GET /metrics.
+"""
+
+import os
+from collections.abc import Mapping
+
+from india_tools import batch, cache, codec, core, httpcache, limits, logs, metrics, offload, streaming
+
+
+class EndpointNotFound(LookupError):
+    pass
+
+
+def resolve(path):
+    """'/api/emi/schedule' -> ('emi', 'schedule'); '/api/gst' -> ('gst', None); else None."""
+    target = core.ROUTES.get(path)
+    if target is None and path.endswith('/'):
+        target = core.ROUTES.get(path.rstrip('/'))
+    return target
+
+
+class _Kernels(Mapping):
+    """tool name -> (batch_kernel, FIELDS), importing tools only when a batch uses them."""
+
+    def __getitem__(self, name):
+        tool = core.get(name)
+        return tool.batch_kernel, tool.FIELDS
+
+    def __contains__(self, name):
+        return name in core.TOOLS
+
+    def __iter__(self):
+        return iter(core.TOOLS)
+
+    def __len__(self):
+        return len(core.TOOLS)
+
+
+KERNELS = _Kernels()
+
+
+def _single(name, item):
+    return core.get(name).from_body(item)
+
+
+def route(path, body, stream=False):
+    """
+    Dispatch a parsed JSON body to the calculator behind `path`.
+
+    With stream=True, endpoints with large outputs return a streaming.Rows
+    generator instead of a materialized result.
+    """
+    if path == '/api/batch':
+        if stream:
+            fields = list(dict.fromkeys(f for name in core.TOOLS for f in core.get(name).RESULT_FIELDS))
+            return streaming.Rows(batch.iter_run_mixed(body, KERNELS, _single), fields + ['error'])
+        return batch.run_mixed(body, KERNELS, _single)
+
+    target = resolve(path)
+    if target is None:
+        raise EndpointNotFound(path)
+    name, sub = target
+    tool = core.get(name)
+
+    if sub is None:
+        return tool.from_body(body)
+
+    if sub == 'batch':
+        if stream:
+            rows = batch.iter_run(tool.batch_kernel, tool.FIELDS, body, tool.from_body)
+            return streaming.Rows(rows, list(tool.RESULT_FIELDS) + ['error'])
+        return batch.run(tool.batch_kernel, tool.FIELDS, body, tool.from_body)
+
+    return tool.EXTRA_ROUTES[sub](body, stream)
+
+
+# ============ Result Cache ============
+RESULT_CACHE = cache.ResultCache(
+    maxsize=int(os.environ.get('API_CACHE_SIZE', 4096)),
+    ttl=float(os.environ.get('API_CACHE_TTL', 3600)),
+)
+
+
+def _cacheable(path):
+    """Single-item calculator paths -> tool module, else None."""
+    target = resolve(path)
+    if target is None or target[1] is not None:
+        return None
+    return core.get(target[0])
+
+
+def _version(tool):
+    version = getattr(tool, 'version', None)
+    return None if version is None else version()
+
+
+def cached_route(path, body, stream=False):
+    """route() with single-item calculator results memoized in RESULT_CACHE."""
+    tool = None if stream else _cacheable(path)
+    if tool is None:
+        return route(path, body, stream)
+    return cache.memoize(RESULT_CACHE, route, path, body, dated=tool.DATED, version=_version(tool))
+
+
+# ============ Offload ============
+OFFLOAD = offload.Offloader(
+    workers=int(os.environ.get('API_OFFLOAD_WORKERS', 0)),
+    threshold=int(os.environ.get('API_OFFLOAD_THRESHOLD', offload.THRESHOLD)),
+    max_queue=int(os.environ.get('API_OFFLOAD_QUEUE', offload.MAX_QUEUE)),
+    timeout=float(os.environ.get('API_OFFLOAD_TIMEOUT', offload.TIMEOUT)),
+)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=OFFLOAD._after_fork)
+
+
+def execute(path, body, stream=False):
+    """cached_route(), with requests above OFFLOAD's cost threshold run in its process pool."""
+    return OFFLOAD.call(cached_route, path, body, stream)
+
+
+def handle_get(path, query, if_none_match=None):
+    """
+    GET requests -> (status, headers, payload): cacheable variants of the
+    calculators (e.g. /api/gst?amount=1000&rate=18) and cache stats.
+    """
+    if path == '/api/cache/stats':
+        payload = codec.dumps(RESULT_CACHE.stats())
+        return 200, [('Content-Type', 'application/json'), ('Cache-Control', 'no-store')], payload
+    if path == '/metrics':
+        payload = metrics_text().encode()
+        return 200, [('Content-Type', metrics.CONTENT_TYPE), ('Cache-Control', 'no-store')], payload
+    tool = _cacheable(path)
+    if tool is None:
+        return 404, [('Content-Type', 'application/json')], codec.dumps({"error": "Endpoint not found"})
+    return httpcache.handle_get(cached_route, path, query, if_none_match, dated=tool.DATED, version=_version(tool))
+
+
+# ============ Observability ============
+METRICS = metrics.Registry()
+
+_METHODS = frozenset({'GET', 'POST', 'OPTIONS', 'HEAD', 'PUT', 'PATCH', 'DELETE', 'WIRE'})
+_FIXED_ROUTES = frozenset({'/api/batch', '/api/cache/stats', '/metrics'})
+
+
+def route_label(path):
+    """Metrics label for `path`: the route it names, or 'other' for anything unknown."""
+    if path in _FIXED_ROUTES:
+        return path
+    target = resolve(path)
+    if target is None:
+        return 'other'
+    name, sub = target
+    return f'/api/{name}' if sub is None else f'/api/{name}/{sub}'
+
+
+def record(method, path, status, timer, error=None):
+    """Account one finished request (path without query) in METRICS and the request log."""
+    seconds = METRICS.observe(method if method in _METHODS else 'OTHER', route_label(path), status, timer)
+    logs.LOG.request(method, path, status, seconds, timer.stages, error)
+
+
+def metrics_text():
+    stats = RESULT_CACHE.stats()
+    pool = OFFLOAD.stats()
+    return METRICS.render(extra=(
+        ('india_tools_cache_hits_total', 'counter', 'Result cache hits.', stats['hits']),
+        ('india_tools_cache_misses_total', 'counter', 'Result cache misses.', stats['misses']),
+        ('india_tools_cache_evictions_total', 'counter', 'Result cache LRU evictions.', stats['evictions']),
+        ('india_tools_cache_entries', 'gauge', 'Results currently cached.', stats['size']),
+        ('india_tools_log_dropped_total', 'counter', 'Log records dropped on a full queue.', logs.LOG.dropped),
+        ('india_tools_offload_total', 'counter', 'Requests run in the offload process pool.', pool['offloaded']),
+        ('india_tools_offload_rejected_total', 'counter', 'Requests refused with 503: pool saturated.',
+         pool['rejected']),
+        ('india_tools_offload_timeouts_total', 'counter', 'Offloaded requests that timed out (503).',
+         pool['timeouts']),
+        ('india_tools_offload_inflight', 'gauge', 'Offloaded requests running or queued.', pool['inflight']),
+        ('india_tools_rejected_total', 'counter', 'Requests refused by limits (413, 429, 408), by reason.',
+         {f'reason="{reason}"': n for reason, n in limits.LIMITS.stats().items()}),
+    ))
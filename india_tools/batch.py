@@ -0,0 +1,88 @@
+"""
+Batch evaluation: many calculator inputs in one request.
+
+Items are split into columns and handed to a column-at-a-time kernel
+(e.g. `calculate_gst_batch` in api/index.py), which hoists everything that
+does not vary per item and returns None for any item it does not handle.
+Only those leftovers go through the single-item path, so per-item errors
+read exactly like the normal endpoints.
+"""
+
+NOT_AN_OBJECT = "Each item must be a JSON object"
+
+# Items per kernel call when results are streamed back
+CHUNK_SIZE = 4096
+
+
+def _require_list(items):
+    if not isinstance(items, list):
+        raise ValueError("Batch body must be a JSON array")
+
+
+def _single(single, item):
+    if type(item) is not dict:
+        return {"error": NOT_AN_OBJECT}
+    try:
+        return single(item)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def run(kernel, fields, items, single):
+    """
+    Evaluate `items` (list of dicts) in bulk.
+
+    fields: ((name, default), ...) in the kernel's argument order.
+    single: item -> result, used for items the kernel declined.
+    Returns one result per item; failures are {"error": "..."}.
+    """
+    _require_list(items)
+    objs = [item if type(item) is dict else {} for item in items]
+    columns = [[obj.get(name, default) for obj in objs] for name, default in fields]
+    results = kernel(*columns)
+    for i, result in enumerate(results):
+        if result is None:
+            results[i] = _single(single, items[i])
+    return results
+
+
+def run_mixed(items, tools, single):
+    """
+    Evaluate a mixed batch of {"tool": name, "input": {...}} items.
+
+    tools: name -> (kernel, fields); single: (name, item) -> result.
+    Items are grouped per tool, run in bulk and scattered back in order.
+    """
+    _require_list(items)
+    results = [None] * len(items)
+    groups = {}
+    for i, item in enumerate(items):
+        tool = item.get('tool') if type(item) is dict else None
+        if type(tool) is not str or tool not in tools:
+            results[i] = {"error": NOT_AN_OBJECT} if type(item) is not dict else {"error": f"Unknown tool: {tool}"}
+            continue
+        groups.setdefault(tool, []).append(i)
+
+    for tool, indices in groups.items():
+        kernel, fields = tools[tool]
+        inputs = [items[i].get('input', {}) for i in indices]
+        for i, result in zip(indices, run(kernel, fields, inputs, lambda item: single(tool, item))):
+            results[i] = result
+    return results
+
+
+def iter_run(kernel, fields, items, single, chunk_size=CHUNK_SIZE):
+    """Like run(), but yields results chunk by chunk for streaming responses."""
+    _require_list(items)
+    return _chunked(items, chunk_size, lambda part: run(kernel, fields, part, single))
+
+
+def iter_run_mixed(items, tools, single, chunk_size=CHUNK_SIZE):
+    """Like run_mixed(), but yields results chunk by chunk for streaming responses."""
+    _require_list(items)
+    return _chunked(items, chunk_size, lambda part: run_mixed(part, tools, single))
+
+
+def _chunked(items, size, evaluate):
+    for start in range(0, len(items), size):
+        yield from evaluate(items[start:start + size])
@@ -0,0 +1,345 @@
+"""
+Offline bulk runs: a CSV of inputs in, one result row per input out.
+
+The input file is memory-mapped and cut into chunks of about
+`chunk_bytes` at line ends, so memory stays bounded by a chunk whatever
+the file size. Each chunk is split into columns, cells typed the way a
+JSON body would carry them ("1000" an int, "7.5" a float, "" missing,
+string fields left as text), and handed to the tool's batch kernel,
+the same column-at-a-time code behind /api/<tool>/batch. Rows the
+kernel declines go through the single-item path, so errors read
+exactly like the API's. Results are written (CSV or NDJSON) before the
+next chunk is read.
+
+The tool is picked from the header (the one whose required inputs are
+all columns) unless given; `columns` maps inputs to other column names
+and `keep` carries input columns (an id, say) through to the output.
+One record per line: quoted cells may hold commas but not line breaks.
+
+With workers > 1 the chunks are sharded over a process pool, each
+worker mapping the file itself, and written back in input order, so the
+output doesn't depend on the worker count.
+
+    python main.py bulk loans.csv results.csv --workers 8
+    python main.py bulk people.csv - --tool age --keep id --format ndjson
+"""
+
+import collections
+import csv
+import itertools
+import mmap
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from operator import itemgetter
+
+from india_tools import codec, core, offload
+
+CHUNK_BYTES = 8 << 20
+FORMATS = ('csv', 'ndjson')
+
+_NUMBER = re.compile(r'-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][+-]?[0-9]+)?')
+# Whole columns of JSON numbers, one per line: checked in one regex pass
+_INTS = re.compile(r'(?:-?(?:0|[1-9][0-9]*)\n)*')
+_NUMBERS = re.compile(r'(?:-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?\n)*')
+
+
+def detect(header):
+    """The tool whose required inputs are all in `header`, preferring the most matched columns."""
+    names = set(header)
+    best, best_score = None, -1
+    for name in core.TOOLS:
+        fields = core.get(name).INPUT.fields
+        if not all(f.name in names for f in fields if f.required):
+            continue
+        score = sum(f.name in names for f in fields)
+        if score > best_score:
+            best, best_score = name, score
+    if best is None:
+        raise ValueError(f"no tool takes the columns {', '.join(header)}: pass the tool name")
+    return best
+
+
+def _cell(text):
+    """A CSV cell as the JSON value it stands for: an int, a float, else the text."""
+    match = _NUMBER.fullmatch(text)
+    if match is None:
+        return text
+    return int(text) if match.lastindex is None else float(text)
+
+
+def _column(cells, kind, default):
+    """Typed column: string fields stay text, others are numbers where they look like one."""
+    if kind == 'string':
+        return [cell if cell else default for cell in cells]
+    if '' not in cells:
+        joined = '\n'.join(cells) + '\n'
+        if _INTS.fullmatch(joined):
+            return list(map(int, cells))
+        if _NUMBERS.fullmatch(joined):
+            return [float(c) if '.' in c or 'e' in c or 'E' in c else int(c) for c in cells]
+    return [_cell(cell) if cell else default for cell in cells]
+
+
+class Plan:
+    """How one header maps onto a tool: which column feeds each input, what is written out."""
+
+    def __init__(self, header, tool=None, columns=None, keep=()):
+        header = [name.strip() for name in header]
+        renamed = {column: field for field, column in (columns or {}).items()}
+        names = [renamed.get(name, name) for name in header]
+        self.tool = tool or detect(names)
+        module = core.get(self.tool)
+        self.kernel = module.batch_kernel
+        self.single = module.from_body
+        kinds = {f.name: f.kind for f in module.INPUT.fields}
+        self.inputs = [(name, default, kinds.get(name, 'any'), names.index(name) if name in names else None)
+                       for name, default in module.FIELDS]
+        missing = [f.name for f in module.INPUT.fields if f.required and f.name not in names]
+        if missing:
+            raise ValueError(f"{self.tool} needs the columns {', '.join(missing)}")
+        unknown = [name for name in keep if name not in header]
+        if unknown:
+            raise ValueError(f"no column named {', '.join(unknown)} to keep")
+        self.keep = [(name, header.index(name)) for name in keep]
+        self.fields = [name for name, _ in self.keep] + list(module.RESULT_FIELDS) + ['error']
+        self.width = len(header)
+
+    def results(self, rows):
+        """Result dicts for rows of cells ({"error": ...} for rows that fail)."""
+        if not rows:
+            return []
+        if all(len(row) == self.width for row in rows):
+            cells = list(zip(*rows))
+        else:
+            cells = [[row[j] if j < len(row) else '' for row in rows] for j in range(self.width)]
+        columns = [_column(cells[j], kind, default) if j is not None else [default] * len(rows)
+                   for _, default, kind, j in self.inputs]
+        results = self.kernel(*columns)
+        for i, result in enumerate(results):
+            if result is None:
+                item = {name: column[i] for (name, _, _, j), column in zip(self.inputs, columns)
+                        if j is not None and cells[j][i]}
+                try:
+                    results[i] = self.single(item)
+                except Exception as e:
+                    results[i] = {"error": str(e)}
+        return results
+
+    def head(self, fmt):
+        return (','.join(self.fields) + '\n').encode() if fmt == 'csv' else b''
+
+    def encode(self, rows, results, fmt):
+        """Output bytes for a chunk's results, with the kept input columns in front."""
+        keep = self.keep
+        if fmt == 'ndjson':
+            dumps = codec.dumps
+            if keep:
+                results = [{**{name: row[j] if j < len(row) else '' for name, j in keep}, **result}
+                           for row, result in zip(rows, results)]
+            return b''.join(_line(dumps, result, len(keep)) for result in results)
+        out = _Buffer()
+        fields = self.fields[len(keep):-1]
+        values = itemgetter(*fields)
+        failed = ('',) * len(fields)
+        rows = ((*[row[j] if j < len(row) else '' for _, j in keep],
+                 *(values(result) + ('',) if 'error' not in result else failed + (result['error'],)))
+                for row, result in zip(rows, results))
+        csv.writer(out, lineterminator='\n').writerows(rows)
+        return ''.join(out.parts).encode()
+
+    def run(self, data, fmt='csv'):
+        """(output bytes, rows, errors) for a chunk of input lines."""
+        rows = parse(data)
+        results = self.results(rows)
+        errors = sum(1 for result in results if 'error' in result)
+        return self.encode(rows, results, fmt), len(rows), errors
+
+
+class _Buffer:
+    __slots__ = ('parts',)
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, text):
+        self.parts.append(text)
+
+
+def parse(data):
+    """Rows of cells from CSV lines (bytes); blank lines are skipped."""
+    text = data.decode() if not isinstance(data, str) else data
+    # '\n' only, as boundaries() cuts chunks: splitlines() would also split at \x1c-\x1e, \x85, \u2028...
+    lines = text.split('\n')
+    if '\r' in text:
+        lines = [line.removesuffix('\r') for line in lines]
+    lines = [line for line in lines if line]
+    if '"' in text:
+        return list(csv.reader(lines))
+    return [line.split(',') for line in lines]
+
+
+def boundaries(buf, start, chunk_bytes=CHUNK_BYTES):
+    """(start, end) byte ranges of about chunk_bytes each, ending at line ends."""
+    size = len(buf)
+    while start < size:
+        end = buf.find(b'\n', min(start + chunk_bytes, size) - 1)
+        end = size if end < 0 else end + 1
+        yield start, end
+        start = end
+
+
+def _line(dumps, result, kept):
+    try:
+        return dumps(result) + b'\n'
+    except ValueError as e:  # a result out of float range: that row's error, after its kept columns
+        return dumps({**dict(list(result.items())[:kept]), "error": str(e)}) + b'\n'
+
+
+def open_input(path):
+    """(mmap of the file, its header cells, offset of the first data line)."""
+    with open(path, 'rb') as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ValueError(f"{path} is empty") from None
+    end = buf.find(b'\n')
+    end = len(buf) if end < 0 else end + 1
+    header = parse(buf[:end].decode('utf-8-sig'))
+    if not header:
+        buf.close()
+        raise ValueError(f"{path} has no header line")
+    return buf, header[0], end
+
+
+def run(src, dst, tool=None, fmt='csv', chunk_bytes=CHUNK_BYTES, columns=None, keep=(), progress=None,
+        workers=1, cancel=None):
+    """
+    Calculate every row of the CSV file `src` into `dst` (a path, '-'
+    for stdout). progress(stats) is called after each chunk with its
+    rows, errors, seconds (computing it) and rows_per_s; returns the
+    totals.
+
+    workers > 1 shards the chunks over that many processes (see below);
+    the output is the same, byte for byte. Setting `cancel` (a
+    threading.Event) stops the run between chunks with Cancelled.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    buf, header, start = open_input(src)
+    out = sys.stdout.buffer if dst == '-' else open(dst, 'wb')
+    began = time.perf_counter()
+    total = {"tool": None, "workers": max(1, workers), "chunks": 0, "rows": 0, "errors": 0,
+             "bytes": len(buf) - start}
+    chunks = None
+    try:
+        plan = Plan(header, tool, columns, keep)
+        total["tool"] = plan.tool
+        out.write(plan.head(fmt))
+        if workers > 1:
+            # Enough shards to keep every worker busy on small files too
+            chunk_bytes = min(chunk_bytes, max(MIN_SHARD, (len(buf) - start) // (workers * 4)))
+            chunks = _sharded(src, (header, tool, columns, keep), fmt, boundaries(buf, start, chunk_bytes), workers)
+        else:
+            chunks = _serial(plan, fmt, buf, boundaries(buf, start, chunk_bytes))
+        for payload, rows, errors, size, seconds in chunks:
+            if cancel is not None and cancel.is_set():
+                raise Cancelled(f"cancelled after {total['rows']} rows")
+            out.write(payload)
+            total["chunks"] += 1
+            total["rows"] += rows
+            total["errors"] += errors
+            if progress is not None:
+                progress({"chunk": total["chunks"], "rows": rows, "errors": errors, "bytes": size,
+                          "seconds": seconds, "rows_per_s": rows / seconds if seconds else 0.0})
+    finally:
+        if chunks is not None:
+            chunks.close()  # a sharded run: stop the pool, free unwritten shards
+        buf.close()
+        if out is not sys.stdout.buffer:
+            out.close()
+        else:
+            out.flush()
+    total["seconds"] = time.perf_counter() - began
+    total["rows_per_s"] = total["rows"] / total["seconds"] if total["seconds"] else 0.0
+    return total
+
+
+def _serial(plan, fmt, buf, ranges):
+    for lo, hi in ranges:
+        t = time.perf_counter()
+        payload, rows, errors = plan.run(buf[lo:hi], fmt)
+        yield payload, rows, errors, hi - lo, time.perf_counter() - t
+
+
+# ============ Sharded ============
+# A worker process maps the input file itself and is sent only byte
+# ranges; it returns each shard's encoded output in a shared-memory block
+# named in its (tiny, pickled) reply. The parent keeps 2 x workers shards
+# in flight and writes them strictly in input order, so the output is
+# identical to a serial run whatever order shards finish in.
+
+MIN_SHARD = 256 << 10
+_shard = None  # worker side: (input mmap, Plan, format)
+
+
+class Cancelled(Exception):
+    """run() was cancelled; the output holds the rows of the chunks written so far."""
+
+
+def _start_shard_worker(path, spec, fmt):
+    global _shard
+    buf, _, _ = open_input(path)
+    header, tool, columns, keep = spec
+    _shard = (buf, Plan(header, tool, columns, keep), fmt)
+
+
+def _run_shard(lo, hi):
+    t = time.perf_counter()
+    buf, plan, fmt = _shard
+    payload, rows, errors = plan.run(buf[lo:hi], fmt)
+    block = shared_memory.SharedMemory(create=True, size=max(1, len(payload)))
+    block.buf[:len(payload)] = payload
+    block.close()
+    return block.name, len(payload), rows, errors, time.perf_counter() - t
+
+
+def _release(future):
+    """Free the shared memory of a finished shard that won't be written."""
+    if future.done() and not future.cancelled() and future.exception() is None:
+        _unlink(future.result()[0])
+
+
+def _unlink(name):
+    block = shared_memory.SharedMemory(name)
+    block.close()
+    block.unlink()
+
+
+def _sharded(path, spec, fmt, ranges, workers):
+    """(payload, rows, errors, bytes, seconds) per chunk, in input order, computed by `workers` processes."""
+    pool = ProcessPoolExecutor(workers, mp_context=offload._context(), initializer=_start_shard_worker,
+                               initargs=(path, spec, fmt))
+    pending = collections.deque()
+    try:
+        for lo, hi in itertools.islice(ranges, workers * 2):
+            pending.append((pool.submit(_run_shard, lo, hi), hi - lo))
+        while pending:
+            future, size = pending.popleft()
+            name, length, rows, errors, seconds = future.result()
+            for lo, hi in itertools.islice(ranges, 1):
+                pending.append((pool.submit(_run_shard, lo, hi), hi - lo))
+            block = shared_memory.SharedMemory(name)
+            payload = block.buf[:length]
+            try:
+                yield payload, rows, errors, size, seconds
+            finally:
+                payload.release()
+                block.close()
+                block.unlink()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        for future, _ in pending:
+            _release(future)
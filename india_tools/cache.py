@@ -0,0 +1,128 @@
+"""
+Bounded memoization for calculator results.
+
+The calculators are pure functions of their JSON input (age also of
+today's date), and traffic repeats the same GST slabs, loan presets and
+CGPAs, so a small LRU in front of dispatch absorbs a lot of it.
+
+Keys are canonicalized from the parsed body: key order does not matter,
+but value types do (1, 1.0 and true render differently in the response),
+and so does the sign of a zero (-0.0 == 0.0, but not in the response).
+Only flat bodies of JSON scalars are cached. Cached results are shared
+between requests and must not be mutated by callers.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+MISS = object()
+
+_SCALARS = frozenset((str, int, float, bool, type(None)))
+
+
+def canonical_key(path, body, dated=False, version=None):
+    """Hashable key for (path, body), or None if the body isn't cacheable."""
+    if type(body) is not dict:
+        return None
+    items = []
+    for name, value in body.items():
+        kind = type(value)
+        if kind not in _SCALARS:
+            return None
+        if value == 0 and kind is float:
+            value = (0.0, math.copysign(1.0, value))  # the zero and its sign; no scalar is a tuple
+        items.append((name, kind, value))
+    items.sort(key=lambda item: item[0])
+    if version is not None:
+        path = (path, version)  # results computed from other data
+    if dated:
+        # results that depend on today's date stop matching at midnight
+        return path, date.today().toordinal(), tuple(items)
+    return path, tuple(items)
+
+
+class ResultCache:
+    """Thread-safe LRU with per-entry TTL and hit/miss/eviction counters."""
+
+    def __init__(self, maxsize=4096, ttl=3600.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def configure(self, maxsize=None, ttl=None):
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+            if ttl is not None:
+                self.ttl = ttl
+            self._shrink()
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key, MISS)
+            if entry is MISS:
+                self.misses += 1
+                return MISS
+            expires, value = entry
+            if expires is not None and expires <= self._clock():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISS
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if not self.enabled:
+            return
+        expires = self._clock() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            self._shrink()
+
+    def _shrink(self):
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def memoize(cache, fn, path, body, dated=False, version=None):
+    """fn(path, body) through `cache`; uncacheable bodies go straight to fn."""
+    key = canonical_key(path, body, dated, version) if cache.enabled else None
+    if key is None:
+        return fn(path, body)
+    value = cache.get(key)
+    if value is MISS:
+        value = fn(path, body)
+        cache.put(key, value)
+    return value
@@ -0,0 +1,318 @@
+"""
+University CGPA-to-percentage conversion, from a versioned data table.
+
+The table (india_tools/data/cgpa.json, or API_CGPA_TABLE) lists each
+university's display name, aliases and formula:
+
+    linear      {"factor": 9.5, "offset": 0}: factor x CGPA + offset
+    piecewise   {"segments": [{"from": 0, "factor": .., "offset": ..}, ..]}:
+                the linear formula of the last segment starting at or
+                below the CGPA, for published conversion charts
+    scale       {"maximum": 4}: CGPA / maximum x 100, for grade scales
+                other than 10 points
+
+Every formula has a `maximum` CGPA (default 10) and results are clamped
+to 0..100. Loading compiles each formula to (segment starts, factors,
+offsets) and builds the lookup index: names and aliases normalized to
+their lower-case words minus "university", "of" and the like ("Anna
+University" and "anna" are the same key), plus a sorted list of them for
+unambiguous prefix matches. A prefix match goes by whole words, only the
+last of which may be cut short ("Visvesvaraya Tech." or "Gujarat" for
+Gujarat Technological University), and a name that had filler words
+dropped must have as many words as the alias it matches: "Gujarat
+University" is another institution, and gets the default formula.
+Resolved names are memoized per table.
+
+The file is checked for changes at most every API_CGPA_RELOAD seconds
+(default 2, 0 disables) and reloaded when it changed; a file that fails
+to load leaves the previous table in place and is logged. A snapshot
+(india_tools.snapshot) of the compiled table, index included, stands in
+for parsing the file as long as the file still has the snapshot's digest.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+from india_tools import codec, logs, snapshot
+
+PATH = os.environ.get('API_CGPA_TABLE') or os.path.join(os.path.dirname(__file__), 'data', 'cgpa.json')
+RELOAD_INTERVAL = float(os.environ.get('API_CGPA_RELOAD', 2.0))
+
+MIN_PREFIX = 3       # shortest query (its words run together) matched as a prefix
+MAX_MEMO = 10000     # resolved names remembered per table
+
+_NUMBER = (int, float)
+_WORD = re.compile(r'[^\W_]+')
+_FILLER = frozenset(('university', 'univ', 'of', 'the', 'and'))
+
+
+def normalize(name):
+    """Index key for a university name: its words, lower-cased, without filler words."""
+    return ''.join(_words(name)[0])
+
+
+def _words(name):
+    """(words of `name` lower-cased without filler words, whether any filler word was dropped)."""
+    found = _WORD.findall(name.casefold())
+    words = tuple(word for word in found if word not in _FILLER)
+    return words, len(words) < len(found)
+
+
+def _abbreviates(words, alias, complete):
+    """Whether `words` are the first words of `alias`, the last maybe cut short (all of them if `complete`)."""
+    if len(words) > len(alias) or complete and len(words) < len(alias):
+        return False
+    return words[:-1] == alias[:len(words) - 1] and alias[len(words) - 1].startswith(words[-1])
+
+
+def _clamp(percentage):
+    return 0.0 if percentage < 0 else 100.0 if percentage > 100 else percentage
+
+
+class Formula:
+    """
+    A compiled formula. percentage(cgpa) is the unrounded percentage for
+    a CGPA already checked against maximum: a plain function, specialised
+    for the one-segment case.
+    """
+
+    __slots__ = ('maximum', 'starts', 'factors', 'offsets', 'percentage')
+
+    def __init__(self, maximum, starts, factors, offsets):
+        self.maximum = maximum
+        self.starts = starts
+        self.factors = factors
+        self.offsets = offsets
+        if len(starts) == 1:
+            def percentage(cgpa, factor=factors[0], offset=offsets[0]):
+                value = cgpa * factor + offset
+                return 0.0 if value < 0 else 100.0 if value > 100 else value
+        else:
+            def percentage(cgpa):
+                i = max(bisect_right(starts, cgpa) - 1, 0)
+                return _clamp(cgpa * factors[i] + offsets[i])
+        self.percentage = percentage
+
+
+class University:
+    __slots__ = ('key', 'name', 'formula')
+
+    def __init__(self, key, name, formula):
+        self.key = key
+        self.name = name
+        self.formula = formula
+
+
+class Table:
+    """One loaded table: universities by key and the alias / prefix index."""
+
+    def __init__(self, version, digest, universities, default, aliases):
+        self.version = version
+        self.digest = digest
+        self.universities = universities
+        self.default = universities[default]
+        self._aliases = {}
+        prefixes = set()
+        for university in universities.values():
+            for alias in (university.key, university.name, *aliases.get(university.key, ())):
+                words = _words(alias)[0]
+                key = ''.join(words)
+                other = self._aliases.setdefault(key, university)
+                if other is not university:
+                    raise ValueError(f"alias {alias!r} names both {other.key} and {university.key}")
+                prefixes.add((key, words))
+        self._sorted = sorted(prefixes)
+        self._memo = {}
+
+    def state(self):
+        """The compiled table as plain data (for the snapshot); restore() rebuilds it."""
+        return {
+            "version": self.version,
+            "digest": self.digest,
+            "default": self.default.key,
+            "universities": [(u.key, u.name, u.formula.maximum, u.formula.starts, u.formula.factors,
+                              u.formula.offsets) for u in self.universities.values()],
+            "aliases": {alias: u.key for alias, u in self._aliases.items()},
+            "prefixes": self._sorted,
+        }
+
+    @classmethod
+    def restore(cls, state):
+        table = cls.__new__(cls)
+        table.version = state['version']
+        table.digest = state['digest']
+        table.universities = {key: University(key, name, Formula(maximum, starts, factors, offsets))
+                              for key, name, maximum, starts, factors, offsets in state['universities']}
+        table.default = table.universities[state['default']]
+        table._aliases = {alias: table.universities[key] for alias, key in state['aliases'].items()}
+        table._sorted = [(key, tuple(words)) for key, words in state['prefixes']]
+        table._memo = {}
+        return table
+
+    def lookup(self, name):
+        """The University `name` refers to, or None if it matches none (or several)."""
+        university, matched = self.resolve(name)
+        return university if matched else None
+
+    def _search(self, name):
+        words, complete = _words(name)
+        key = ''.join(words)
+        university = self._aliases.get(key)
+        if university is not None or len(key) < MIN_PREFIX:
+            return university
+        # aliases whose key starts with this one; then by whole words
+        start = bisect_left(self._sorted, (key,))
+        end = bisect_left(self._sorted, (key + '\U0010ffff',), start)
+        matches = {self._aliases[k] for k, alias in self._sorted[start:end] if _abbreviates(words, alias, complete)}
+        return matches.pop() if len(matches) == 1 else None
+
+    def resolve(self, name):
+        """(University, matched): unknown names get the default formula, matched False."""
+        resolved = self._memo.get(name)
+        if resolved is None:
+            university = self._search(name)
+            resolved = (self.default, False) if university is None else (university, True)
+            if len(self._memo) >= MAX_MEMO:
+                self._memo.clear()
+            self._memo[name] = resolved
+        return resolved
+
+    def info(self):
+        """JSON-ready description of the table."""
+        return {
+            "version": self.version,
+            "default": self.default.key,
+            "universities": [{"key": u.key, "name": u.name, "maximum": u.formula.maximum}
+                             for u in self.universities.values()],
+        }
+
+
+# ============ Loading ============
+def _number(spec, field, where, default=None, positive=False):
+    value = spec.get(field, default)
+    if type(value) not in _NUMBER or (positive and not value > 0):
+        raise ValueError(f"{where}: {field} must be a {'positive ' if positive else ''}number")
+    return float(value)
+
+
+def _formula(spec, where):
+    if type(spec) is not dict:
+        raise ValueError(f"{where} must be an object")
+    kind = spec.get('type')
+    maximum = _number(spec, 'maximum', where, 10.0, positive=True)
+    if kind == 'linear':
+        segments = [{'from': 0, **spec}]
+    elif kind == 'scale':
+        segments = [{'from': 0, 'factor': 100 / maximum}]
+    elif kind == 'piecewise':
+        segments = spec.get('segments')
+        if type(segments) is not list or not segments:
+            raise ValueError(f"{where}: segments must be a non-empty list")
+    else:
+        raise ValueError(f"{where}: type must be one of linear, piecewise, scale")
+
+    starts, factors, offsets = [], [], []
+    for i, segment in enumerate(segments):
+        at = f"{where}.segments[{i}]" if kind == 'piecewise' else where
+        if type(segment) is not dict:
+            raise ValueError(f"{at} must be an object")
+        start = _number(segment, 'from', at)
+        if starts and start <= starts[-1]:
+            raise ValueError(f"{at}: segments must start at increasing CGPAs")
+        starts.append(start)
+        factors.append(_number(segment, 'factor', at))
+        offsets.append(_number(segment, 'offset', at, 0))
+    return Formula(maximum, tuple(starts), tuple(factors), tuple(offsets))
+
+
+def parse(raw):
+    """Table from the JSON text of a table file; ValueError naming the bad entry."""
+    data = codec.loads(raw)
+    if type(data) is not dict or type(data.get('universities')) is not dict or not data['universities']:
+        raise ValueError("table must be an object with a non-empty universities object")
+    version = data.get('version')
+    if type(version) is not str:
+        raise ValueError("version must be a string")
+
+    universities, aliases = {}, {}
+    for key, spec in data['universities'].items():
+        where = f"universities.{key}"
+        if type(spec) is not dict:
+            raise ValueError(f"{where} must be an object")
+        name = spec.get('name', key)
+        names = spec.get('aliases', [])
+        if type(name) is not str or type(names) is not list or not all(type(a) is str for a in names):
+            raise ValueError(f"{where}: name must be a string and aliases a list of strings")
+        universities[key] = University(key, name, _formula(spec.get('formula'), f"{where}.formula"))
+        aliases[key] = names
+
+    default = data.get('default', 'default')
+    if default not in universities:
+        raise ValueError(f"default {default!r} is not one of the universities")
+    return Table(version, _digest(raw), universities, default, aliases)
+
+
+def _digest(raw):
+    return hashlib.blake2b(raw if type(raw) is bytes else raw.encode(), digest_size=8).hexdigest()
+
+
+def load(path=PATH):
+    with open(path, 'rb') as f:
+        raw = f.read()
+    saved = snapshot.get('cgpa')
+    if saved is not None and saved['digest'] == _digest(raw):
+        return Table.restore(saved)
+    return parse(raw)
+
+
+class Source:
+    """The table loaded from `path`, reloaded when the file changes."""
+
+    def __init__(self, path=PATH, interval=RELOAD_INTERVAL, clock=time.monotonic):
+        self.path = path
+        self.interval = interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stamp = self._stat()
+        self.table = load(path)
+        self._next_check = clock() + interval
+        self.reloads = self.failures = 0
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def current(self):
+        """The table, reloaded first if the interval has passed and the file changed."""
+        if self.interval and self._clock() >= self._next_check:
+            self.check()
+        return self.table
+
+    def check(self):
+        """Reload if the file changed; True if a new table was loaded."""
+        with self._lock:
+            self._next_check = self._clock() + self.interval
+            stamp = self._stat()
+            if stamp == self._stamp or stamp is None:
+                return False
+            self._stamp = stamp
+            try:
+                table = load(self.path)
+            except (OSError, ValueError) as e:
+                self.failures += 1
+                logs.LOG.emit('WARNING', 'cgpa table reload failed', path=self.path, error=str(e))
+                return False
+            self.table = table
+            self.reloads += 1
+            logs.LOG.emit('INFO', 'cgpa table reloaded', path=self.path, version=table.version)
+            return True
+
+
+TABLES = Source()
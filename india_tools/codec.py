@@ -0,0 +1,116 @@
+"""
+JSON codec for request and response bodies: bytes in, bytes out.
+
+Uses the fastest backend installed, msgspec then orjson, else the
+stdlib json module (`pip install india-tools[fast]` brings orjson).
+API_JSON=msgspec|orjson|json forces one; use() switches at runtime.
+
+Callers go through the module (codec.loads, codec.dumps) so a switch
+takes effect everywhere. The backends disagree only at the edges, and
+those fall back to the stdlib so results stay the same:
+
+    bodies a native decoder rejects (NaN / Infinity literals, which
+    json.loads accepts) are decoded again by json, so the error, if
+    any, is json's own message;
+    values a native encoder refuses (ints beyond 64 bits, unusual
+    types) are encoded by json instead;
+    NaN and infinities, which the native encoders write as null and
+    json as the invalid NaN / Infinity, raise ValueError(NON_FINITE) on
+    every backend (the floats of a native output containing null are
+    checked), so front ends answer 400 instead of sending either.
+
+Output is compact JSON (no spaces after separators) on every backend.
+"""
+
+import json
+import math
+import os
+
+BACKENDS = ('msgspec', 'orjson', 'json')
+NON_FINITE = "Result is out of range (not a finite number)"
+
+_stdlib_encode = json.JSONEncoder(separators=(',', ':'), allow_nan=False).encode
+
+
+def _json_dumps(obj):
+    try:
+        return _stdlib_encode(obj).encode()
+    except ValueError as e:
+        if str(e).startswith('Out of range float values'):
+            raise ValueError(NON_FINITE) from None
+        raise
+
+
+def _finite(obj):
+    """False if a NaN or an infinity is anywhere in `obj` (through dicts, lists and tuples)."""
+    if type(obj) is dict:
+        values = obj.values()
+    elif isinstance(obj, (list, tuple)):
+        values = obj
+    else:
+        return not isinstance(obj, float) or math.isfinite(obj)
+    for value in values:
+        kind = type(value)
+        if kind is float:
+            if value - value:  # NaN for NaN and the infinities, 0.0 otherwise
+                return False
+        elif kind is not str and kind is not int and value is not None and not _finite(value):
+            return False
+    return True
+
+
+def _load(name):
+    """(loads, dumps) for a backend; ImportError if it isn't installed."""
+    if name == 'json':
+        return json.loads, _json_dumps
+    if name == 'orjson':
+        import orjson
+        return orjson.loads, orjson.dumps
+    if name == 'msgspec':
+        import msgspec
+        return msgspec.json.Decoder().decode, msgspec.json.Encoder().encode
+    raise ValueError(f"JSON backend must be one of {', '.join(BACKENDS)}")
+
+
+def available():
+    """Installed backends, fastest first."""
+    out = []
+    for name in BACKENDS:
+        try:
+            _load(name)
+        except ImportError:
+            continue
+        out.append(name)
+    return out
+
+
+def use(name='auto'):
+    """Switch backend ('auto': the fastest installed). Returns the backend name."""
+    global BACKEND, loads, dumps
+    if name == 'auto':
+        name = available()[0]
+    fast_loads, fast_dumps = _load(name)
+    BACKEND = name
+    if name == 'json':
+        loads, dumps = json.loads, _json_dumps
+        return name
+
+    def loads(raw):
+        try:
+            return fast_loads(raw)
+        except Exception:
+            return json.loads(raw)
+
+    def dumps(obj):
+        try:
+            out = fast_dumps(obj)
+        except Exception:
+            return _json_dumps(obj)
+        if b'null' in out and not _finite(obj):  # a NaN or an infinity, written as null
+            raise ValueError(NON_FINITE)
+        return out
+
+    return name
+
+
+use(os.environ.get('API_JSON', 'auto'))
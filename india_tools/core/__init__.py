@@ -0,0 +1,78 @@
+"""
+Calculator core: the one implementation of every tool.
+
+Tools are registered by name and imported on first use, so a function
+that only serves /api/gst never imports datetime or the amortization
+engine. Registration is all the server needs at startup:
+the route table below is built from it without importing anything.
+
+Each tool module defines:
+
+    NAME, DATED         tool name; whether results depend on date.today()
+    INPUT               india_tools.schema.Schema of the request body
+    compute(...)        the calculation on already validated inputs
+    calculate_<name>    INPUT.function(compute): validated positional call
+    from_body(body)     INPUT.from_body(compute): parsed JSON body -> result
+    FIELDS              ((name, default), ...) inputs of the batch kernel
+    batch_kernel        column-at-a-time kernel, None for declined items
+    RESULT_FIELDS       output columns (CSV header)
+    EXTRA_ROUTES        {sub-path: fn(body, stream)}, e.g. emi's 'schedule'
+    version()           optional: version of the data results depend on
+                        (part of result cache keys and ETags), e.g. cgpa's table
+"""
+
+import importlib
+
+NUMBER = (int, float)
+
+TOOLS = {}        # name -> module path
+ROUTES = {}       # '/api/emi/schedule' -> ('emi', 'schedule'); '/api/emi' -> ('emi', None)
+_extra = {}       # name -> declared sub-paths besides 'batch'
+_loaded = {}
+
+
+def register(name, module_path, routes=()):
+    """
+    Register a tool module by import path; it is imported on first use.
+
+    It answers /api/<name>, /api/<name>/batch and /api/<name>/<route>
+    for each of `routes` (which must match the module's EXTRA_ROUTES).
+    """
+    if name in TOOLS:  # re-registering: drop the old sub-paths
+        for sub in _extra[name]:
+            ROUTES.pop(f'/api/{name}/{sub}', None)
+    TOOLS[name] = module_path
+    _extra[name] = tuple(routes)
+    _loaded.pop(name, None)
+    ROUTES[f'/api/{name}'] = (name, None)
+    for sub in ('batch', *routes):
+        ROUTES[f'/api/{name}/{sub}'] = (name, sub)
+
+
+def get(name):
+    """The tool module for `name` (KeyError if unknown)."""
+    tool = _loaded.get(name)
+    if tool is None:
+        tool = importlib.import_module(TOOLS[name])
+        if set(tool.EXTRA_ROUTES) != set(_extra[name]):
+            raise RuntimeError(f"{TOOLS[name]}: EXTRA_ROUTES {sorted(tool.EXTRA_ROUTES)} "
+                               f"don't match the registered routes {sorted(_extra[name])}")
+        _loaded[name] = tool
+    return tool
+
+
+def preload():
+    """Import every registered tool, e.g. before forking workers that will share them."""
+    for name in TOOLS:
+        get(name)
+
+
+def loaded():
+    """Names of the tools imported so far."""
+    return tuple(_loaded)
+
+
+register('age', 'india_tools.core.age', routes=('bulk',))
+register('cgpa', 'india_tools.core.cgpa', routes=('transcript',))
+register('gst', 'india_tools.core.gst', routes=('invoice',))
+register('emi', 'india_tools.core.emi', routes=('schedule', 'grid', 'prepay'))
@@ -0,0 +1,171 @@
+"""Age from a date of birth, as of today or a given reference date."""
+
+from datetime import date, datetime
+
+from india_tools import agetable, batch, streaming
+from india_tools.schema import Field, Schema
+
+NAME = 'age'
+DATED = True
+INPUT = Schema(
+    Field('dob', 'string', message="dob must be a date string (YYYY-MM-DD)"),
+    Field('as_of', 'string', default=None, message="as_of must be a date string (YYYY-MM-DD)"),
+)
+FIELDS = INPUT.batch_fields
+RESULT_FIELDS = ('years', 'months', 'days', 'total_days')
+
+BULK_COLUMNS = ('dob', 'years', 'months', 'days', 'total_days', 'error')
+
+
+def reference_date(as_of=None):
+    """date for an `as_of` string; None means today."""
+    if as_of is None:
+        return date.today()
+    try:
+        return datetime.fromisoformat(as_of).date()
+    except (TypeError, ValueError):
+        raise ValueError("as_of must be a date string (YYYY-MM-DD)") from None
+
+
+def _age(dob, table):
+    """(years, months, days, total_days); raises ValueError like calculate_age."""
+    age = table.age(dob)
+    if age is not None:
+        return age
+    # Not plain YYYY-MM-DD (or outside the table): parse it the general way
+    dob = datetime.fromisoformat(dob).date()
+    if dob > table.as_of:
+        raise ValueError("Date of birth cannot be in the future")
+
+    years = table.year - dob.year
+    months = table.month - dob.month
+    days = table.day - dob.day
+    if days < 0:
+        months -= 1
+        days += table.days_in_prev
+    if months < 0:
+        years -= 1
+        months += 12
+    return years, months, days, table.ordinal - dob.toordinal()
+
+
+def compute(dob, as_of=None):
+    years, months, days, total_days = _age(dob, agetable.for_date(reference_date(as_of)))
+    return {
+        "years": years,
+        "months": months,
+        "days": days,
+        "total_days": total_days,
+    }
+
+
+calculate_age = INPUT.function(compute, 'calculate_age')
+from_body = INPUT.from_body(compute)
+AgeInput = INPUT.struct('AgeInput', __name__)
+
+
+def calculate_age_batch(dobs, as_ofs):
+    """calculate_age over a column; one table lookup per item, or one columns() call for a shared as_of."""
+    if as_ofs and type(as_ofs[0]) in (str, type(None)) and as_ofs.count(as_ofs[0]) == len(as_ofs):
+        try:
+            table = agetable.for_date(reference_date(as_ofs[0]))
+        except ValueError:
+            return [None] * len(dobs)
+        return [None if years is None else {"years": years, "months": months, "days": days, "total_days": total}
+                for years, months, days, total in zip(*table.columns(dobs))]
+    tables = {}
+    out = []
+    for dob, as_of in zip(dobs, as_ofs):
+        table = tables.get(as_of, False) if type(as_of) in (str, type(None)) else None
+        if table is False:
+            try:
+                table = tables[as_of] = agetable.for_date(reference_date(as_of))
+            except ValueError:
+                table = tables[as_of] = None
+        age = table.age(dob) if table is not None else None
+        if age is None:
+            out.append(None)
+            continue
+        out.append({
+            "years": age[0],
+            "months": age[1],
+            "days": age[2],
+            "total_days": age[3],
+        })
+    return out
+
+
+batch_kernel = calculate_age_batch
+
+
+# ============ Bulk ============
+def calculate_age_bulk(dobs, as_of=None):
+    """
+    Ages for a column of dates of birth against one reference date.
+
+    Returns columns (years, months, days, total_days) with null where
+    an item failed, and errors as [{"index", "error"}] with the messages
+    /api/age would give.
+    """
+    if not isinstance(dobs, list):
+        raise ValueError("dobs must be a JSON array of dates")
+    table = agetable.for_date(reference_date(as_of))
+    columns = table.columns(dobs)
+    errors = _fill_declined(dobs, table, columns)
+    return {
+        "as_of": table.as_of.isoformat(),
+        "count": len(dobs),
+        **dict(zip(RESULT_FIELDS, columns)),
+        "errors": errors,
+    }
+
+
+def _fill_declined(dobs, table, columns):
+    """Run items the table declined through the single-item path, in place."""
+    errors = []
+    years = columns[0]
+    for i, dob in enumerate(dobs):
+        if years[i] is not None:
+            continue
+        try:
+            if not isinstance(dob, str) or not dob:
+                from_body({'dob': dob})  # always raises: "dob field required" etc.
+            age = _age(dob, table)
+        except Exception as e:
+            errors.append({"index": i, "error": str(e)})
+            continue
+        for column, value in zip(columns, age):
+            column[i] = value
+    return errors
+
+
+def iter_age_bulk(dobs, as_of=None, chunk_size=batch.CHUNK_SIZE):
+    """Row per date of birth, computed a chunk at a time."""
+    if not isinstance(dobs, list):
+        raise ValueError("dobs must be a JSON array of dates")
+    table = agetable.for_date(reference_date(as_of))
+
+    def rows():
+        for start in range(0, len(dobs), chunk_size):
+            chunk = dobs[start:start + chunk_size]
+            columns = table.columns(chunk)
+            errors = {e["index"]: e["error"] for e in _fill_declined(chunk, table, columns)}
+            for i, values in enumerate(zip(*columns)):
+                row = {"dob": chunk[i], **dict(zip(RESULT_FIELDS, values))}
+                if i in errors:
+                    row["error"] = errors[i]
+                yield row
+    return rows()
+
+
+def bulk_from_body(body, stream=False):
+    dobs = body.get('dobs')
+    if dobs is None:
+        raise ValueError("dobs field required")
+    as_of = body.get('as_of')
+    if stream:
+        return streaming.Rows(iter_age_bulk(dobs, as_of), BULK_COLUMNS)
+    return calculate_age_bulk(dobs, as_of)
+
+
+EXTRA_ROUTES = {'bulk': bulk_from_body}
@@ -0,0 +1,169 @@
+"""
+CGPA to percentage with the university's formula (india_tools.cgpatable),
+and whole transcripts at once (/api/cgpa/transcript).
+
+University names are matched through the table's alias index ("vtu",
+"Visvesvaraya Technological University"); a name matching none gets the
+default formula and "matched": null instead of a silent guess.
+"""
+
+from india_tools import cgpatable, streaming
+from india_tools.core import NUMBER
+from india_tools.schema import Field, Schema
+
+NAME = 'cgpa'
+DATED = False
+INPUT = Schema(
+    Field('cgpa', 'number', minimum=0, maximum=10, message="CGPA must be a number between 0 and 10"),
+    Field('university', default='default'),
+)
+FIELDS = INPUT.batch_fields
+RESULT_FIELDS = ('cgpa', 'percentage', 'university', 'matched')
+TRANSCRIPT_COLUMNS = ('university', 'matched', 'semesters', 'credits', 'computed_cgpa', 'cgpa', 'percentage')
+
+# Single-factor universities of the table loaded at import, for existing callers
+CGPA_MULTIPLIERS = {
+    key: university.formula.factors[0]
+    for key, university in cgpatable.TABLES.table.universities.items()
+    if len(university.formula.starts) == 1 and university.formula.offsets[0] == 0
+}
+
+
+def version():
+    """Digest of the conversion table in use: results (and their cache keys) change with it."""
+    return cgpatable.TABLES.current().digest
+
+
+def _out_of_range(university):
+    return ValueError(f"CGPA must be a number between 0 and {university.formula.maximum:g} for {university.name}")
+
+
+def compute(cgpa, university):
+    table = cgpatable.TABLES.current()
+    # null (or any other non-name) means the default formula, as it always has
+    entry, matched = table.resolve(university) if type(university) is str else (table.default, False)
+    if cgpa > entry.formula.maximum:
+        raise _out_of_range(entry)
+    return {
+        "cgpa": round(cgpa, 2),
+        "percentage": round(entry.formula.percentage(cgpa), 2),
+        "university": university,
+        "matched": entry.key if matched else None,
+    }
+
+
+calculate_cgpa = INPUT.function(compute, 'calculate_cgpa')
+from_body = INPUT.from_body(compute)
+CgpaInput = INPUT.struct('CgpaInput', __name__)
+
+
+def calculate_cgpa_batch(cgpas, universities):
+    table = cgpatable.TABLES.current()
+    formulas = {}  # one table lookup per distinct university name
+    out = []
+    for cgpa, university in zip(cgpas, universities):
+        if type(cgpa) not in NUMBER or type(university) is not str or not (0 <= cgpa <= 10):
+            out.append(None)
+            continue
+        formula = formulas.get(university)
+        if formula is None:
+            entry, matched = table.resolve(university)
+            formula = formulas[university] = (entry.formula.maximum, entry.formula.percentage,
+                                              entry.key if matched else None)
+        maximum, percentage, matched = formula
+        if cgpa > maximum:
+            out.append(None)  # the single-item path words the error
+            continue
+        out.append({
+            "cgpa": round(cgpa, 2),
+            "percentage": round(percentage(cgpa), 2),
+            "university": university,
+            "matched": matched,
+        })
+    return out
+
+
+batch_kernel = calculate_cgpa_batch
+
+
+# ============ Transcripts ============
+def _grade(value, formula):
+    return type(value) in NUMBER and 0 <= value <= formula.maximum
+
+
+def _transcript(item, table, default_university):
+    if type(item) is not dict:
+        raise ValueError("must be an object")
+    name = item.get('university', default_university)
+    if type(name) is not str:
+        raise ValueError("university must be a string")
+    entry, matched = table.resolve(name)
+    formula = entry.formula
+
+    sgpas = item.get('sgpa', [])
+    if type(sgpas) is not list or not all(_grade(s, formula) for s in sgpas):
+        raise ValueError(f"sgpa must be a list of numbers between 0 and {formula.maximum:g}")
+    credits = item.get('credits')
+    if credits is not None and (type(credits) is not list or len(credits) != len(sgpas)
+                                or not all(type(c) in NUMBER and c > 0 for c in credits)):
+        raise ValueError("credits must list one positive number per semester")
+    cgpa = item.get('cgpa')
+    if cgpa is not None and not _grade(cgpa, formula):
+        raise _out_of_range(entry)
+    if cgpa is None and not sgpas:
+        raise ValueError("sgpa or cgpa required")
+
+    computed = None
+    if sgpas:
+        if credits is None:
+            computed = round(sum(sgpas) / len(sgpas), 2)
+        else:
+            computed = round(sum(s * c for s, c in zip(sgpas, credits)) / sum(credits), 2)
+    if cgpa is None:
+        cgpa = computed
+    percentage = formula.percentage
+    return {
+        "university": name,
+        "matched": entry.key if matched else None,
+        "semesters": len(sgpas),
+        "credits": sum(credits) if credits is not None else None,
+        "computed_cgpa": computed,
+        "cgpa": round(cgpa, 2),
+        "percentage": round(percentage(cgpa), 2),
+        "semester_percentages": [round(percentage(s), 2) for s in sgpas],
+    }
+
+
+def calculate_cgpa_transcripts(transcripts, university='default'):
+    """
+    Convert whole transcripts: each {"sgpa": [per semester], "credits":
+    [per semester] (optional, else equal weights), "cgpa" (optional,
+    else the credit-weighted SGPA mean, to 2 decimals), "university"
+    (optional, else `university`)}. A bad transcript raises ValueError
+    naming its index.
+    """
+    if type(transcripts) is not list or not transcripts:
+        raise ValueError("transcripts must be a non-empty JSON array")
+    if type(university) is not str:
+        raise ValueError("university must be a string")
+    table = cgpatable.TABLES.current()
+    results = []
+    for i, item in enumerate(transcripts):
+        try:
+            results.append(_transcript(item, table, university))
+        except ValueError as e:
+            raise ValueError(f"transcripts[{i}]: {e}") from None
+    return {"version": table.version, "count": len(results), "transcripts": results}
+
+
+def transcript_from_body(body, stream=False):
+    transcripts = body.get('transcripts')
+    if transcripts is None:
+        raise ValueError("transcripts field required")
+    result = calculate_cgpa_transcripts(transcripts, body.get('university', 'default'))
+    if stream:
+        return streaming.Rows(iter(result['transcripts']), TRANSCRIPT_COLUMNS)
+    return result
+
+
+EXTRA_ROUTES = {'transcript': transcript_from_body}
@@ -0,0 +1,442 @@
+"""
+EMI for a loan, the inverse queries ("solve": tenure, rate or principal
+for a given EMI), the amortization schedule (/api/emi/schedule), what-if
+grids (/api/emi/grid) and part-prepayments (/api/emi/prepay).
+"""
+
+import math
+
+from india_tools import streaming
+from india_tools.core import NUMBER
+from india_tools.schema import Field, Schema
+
+NAME = 'emi'
+DATED = False
+PRINCIPAL = Field('principal', 'number', exclusive_minimum=0, message="Principal must be greater than 0")
+ANNUAL_RATE = Field('annual_rate', 'number', minimum=0, message="Interest rate cannot be negative")
+TENURE = Field('tenure_months', 'integer', exclusive_minimum=0, message="Tenure must be greater than 0 months")
+EMI = Field('emi', 'number', exclusive_minimum=0, message="EMI must be greater than 0")
+
+INPUT = Schema(PRINCIPAL, ANNUAL_RATE, TENURE)
+# "solve" modes: the unknown -> inputs
+SOLVE_INPUTS = {
+    'tenure': Schema(PRINCIPAL, ANNUAL_RATE, EMI),
+    'rate': Schema(PRINCIPAL, TENURE, EMI),
+    'principal': Schema(ANNUAL_RATE, TENURE, EMI),
+}
+SOLVE_MODES = ('emi', *SOLVE_INPUTS)
+FIELDS = INPUT.batch_fields + (('solve', None), ('emi', None))
+RESULT_FIELDS = ('principal', 'annual_rate', 'tenure_months', 'emi', 'total_interest', 'total_amount')
+
+SCHEDULE_MAX_PAGE_SIZE = 600
+GRID_MAX_AXIS = 1000
+GRID_MAX_CELLS = 100000
+
+
+OUT_OF_RANGE = "Loan values are too large to compute"
+
+
+def compute(principal, annual_rate, tenure_months):
+    monthly_rate = annual_rate / 12 / 100
+    try:
+        growth = (1 + monthly_rate) ** tenure_months
+    except OverflowError:
+        raise ValueError(OUT_OF_RANGE) from None
+    if growth == 1:  # 0%, or a rate too small to show in floating point
+        emi = principal / tenure_months
+        total_interest = 0
+    else:
+        emi = principal * monthly_rate * growth / (growth - 1)
+        total_interest = (emi * tenure_months) - principal
+
+    total_amount = emi * tenure_months
+
+    return {
+        "principal": round(principal, 2),
+        "annual_rate": round(annual_rate, 2),
+        "tenure_months": tenure_months,
+        "emi": round(emi, 2),
+        "total_interest": round(total_interest, 2),
+        "total_amount": round(total_amount, 2)
+    }
+
+
+calculate_emi = INPUT.function(compute, 'calculate_emi')
+_emi_from_body = INPUT.from_body(compute)
+EmiInput = INPUT.struct('EmiInput', __name__)
+
+
+# ============ Solve ============
+def _tenure_result(principal, annual_rate, months):
+    """Loan at the whole number of months that `months` rounds up to, or None if infeasible."""
+    if months != months:
+        return None
+    if months > 2 ** 53:  # past whole months a float can count
+        raise ValueError(OUT_OF_RANGE)
+    result = compute(principal, annual_rate, max(1, math.ceil(months - 1e-9)))
+    if result["emi"] == 0:  # an EMI under half a paisa
+        raise ValueError(OUT_OF_RANGE)
+    result["solve"] = "tenure"
+    return result
+
+
+def _rate_result(principal, tenure_months, emi, annual_rate):
+    if annual_rate != annual_rate:
+        return None
+    return {
+        "principal": round(principal, 2),
+        "annual_rate": round(annual_rate, 4),
+        "tenure_months": tenure_months,
+        "emi": round(emi, 2),
+        "total_interest": round(emi * tenure_months - principal, 2),
+        "total_amount": round(emi * tenure_months, 2),
+        "solve": "rate",
+    }
+
+
+def _principal_result(annual_rate, tenure_months, principal):
+    # Rounded down to the paisa, so the EMI never exceeds the one asked for
+    result = compute(math.floor(principal * 100) / 100, annual_rate, tenure_months)
+    result["solve"] = "principal"
+    return result
+
+
+def solve_tenure(principal, annual_rate, emi):
+    """
+    Shortest whole-month tenure that repays `principal` at no more than
+    `emi` per month; the result shows the EMI at that tenure.
+    """
+    from india_tools import emisolver
+
+    try:
+        result = _tenure_result(principal, annual_rate, emisolver.tenure(principal, annual_rate, emi))
+    except OverflowError:
+        raise ValueError(OUT_OF_RANGE) from None
+    if result is None:
+        raise ValueError("EMI must be more than the first month's interest")
+    return result
+
+
+def solve_rate(principal, tenure_months, emi):
+    """Annual interest rate (%) implied by an EMI: the loan's IRR."""
+    from india_tools import emisolver
+
+    try:
+        result = _rate_result(principal, tenure_months, emi, emisolver.rate(principal, tenure_months, emi))
+    except OverflowError:
+        raise ValueError(OUT_OF_RANGE) from None
+    if result is None:
+        raise ValueError("EMI x tenure must be at least the principal")
+    return result
+
+
+def solve_principal(annual_rate, tenure_months, emi):
+    """Largest principal an EMI can repay at `annual_rate` over `tenure_months`."""
+    from india_tools import emisolver
+
+    try:
+        return _principal_result(annual_rate, tenure_months, emisolver.principal(annual_rate, tenure_months, emi))
+    except OverflowError:
+        raise ValueError(OUT_OF_RANGE) from None
+
+
+calculate_emi_tenure = SOLVE_INPUTS['tenure'].function(solve_tenure, 'calculate_emi_tenure')
+calculate_emi_rate = SOLVE_INPUTS['rate'].function(solve_rate, 'calculate_emi_rate')
+calculate_emi_principal = SOLVE_INPUTS['principal'].function(solve_principal, 'calculate_emi_principal')
+_SOLVERS = {
+    'tenure': SOLVE_INPUTS['tenure'].from_body(solve_tenure),
+    'rate': SOLVE_INPUTS['rate'].from_body(solve_rate),
+    'principal': SOLVE_INPUTS['principal'].from_body(solve_principal),
+}
+
+
+def from_body(body):
+    solve = body.get('solve')
+    if solve is None or solve == 'emi':
+        return _emi_from_body(body)
+    solver = _SOLVERS.get(solve) if type(solve) is str else None
+    if solver is None:
+        raise ValueError(f"solve must be one of {', '.join(SOLVE_MODES)}")
+    return solver(body)
+
+
+def _loan(body):
+    principal = body.get('principal')
+    annual_rate = body.get('annual_rate')
+    tenure_months = body.get('tenure_months')
+    if any(x is None for x in [principal, annual_rate, tenure_months]):
+        raise ValueError(INPUT.missing_message())
+    return principal, annual_rate, tenure_months
+
+
+# ============ Schedule ============
+def calculate_emi_schedule(principal, annual_rate, tenure_months, page=1, page_size=120):
+    """Headline EMI plus one page of the month-by-month schedule (columnar)."""
+    from india_tools import amortization  # NumPy, when installed: only schedules pay for it
+
+    result = calculate_emi(principal, annual_rate, tenure_months)
+    if type(page) is not int or page < 1:
+        raise ValueError("page must be a positive integer")
+    if type(page_size) is not int or not (1 <= page_size <= SCHEDULE_MAX_PAGE_SIZE):
+        raise ValueError(f"page_size must be between 1 and {SCHEDULE_MAX_PAGE_SIZE}")
+
+    pages = -(-tenure_months // page_size)
+    start = (page - 1) * page_size + 1
+    columns = amortization.schedule(principal, annual_rate, tenure_months, start, start + page_size - 1)
+    result.update({
+        "page": page,
+        "page_size": page_size,
+        "pages": pages,
+        "schedule": amortization.rounded(columns),
+    })
+    return result
+
+
+def iter_emi_schedule(principal, annual_rate, tenure_months, start=1, stop=None):
+    """Schedule rows for months start..stop, computed one block at a time."""
+    from india_tools import amortization
+
+    calculate_emi(principal, annual_rate, tenure_months)  # validate before streaming
+    stop = tenure_months if stop is None else min(stop, tenure_months)
+
+    def rows():
+        for block in range(start, stop + 1, SCHEDULE_MAX_PAGE_SIZE):
+            columns = amortization.schedule(principal, annual_rate, tenure_months,
+                                            block, min(block + SCHEDULE_MAX_PAGE_SIZE - 1, stop))
+            columns = amortization.rounded(columns)
+            for values in zip(*columns.values()):
+                yield dict(zip(columns, values))
+    return rows()
+
+
+def schedule_from_body(body, stream=False):
+    from india_tools.amortization import COLUMNS
+
+    principal, annual_rate, tenure_months = _loan(body)
+    if stream and 'page' not in body:
+        return streaming.Rows(iter_emi_schedule(principal, annual_rate, tenure_months), COLUMNS)
+    result = calculate_emi_schedule(principal, annual_rate, tenure_months,
+                                    body.get('page', 1), body.get('page_size', 120))
+    if stream:
+        columns = result['schedule']
+        return streaming.Rows((dict(zip(columns, v)) for v in zip(*columns.values())), COLUMNS)
+    return result
+
+
+# ============ Grid ============
+_check = {f.name: Schema(f).function(lambda value: value, f'check_{f.name}') for f in (PRINCIPAL, ANNUAL_RATE, TENURE)}
+
+
+def _axis(field, spec):
+    """Grid axis values from a number, a list, or {"start", "stop", "step"} (stop included)."""
+    if isinstance(spec, dict):
+        start, stop, step = spec.get('start'), spec.get('stop'), spec.get('step')
+        if any(type(x) not in NUMBER for x in (start, stop, step)) or not step > 0 or not stop >= start:
+            raise ValueError(f"{field} range needs numbers start <= stop and step > 0")
+        count = (stop - start) / step + 1
+        if not count <= GRID_MAX_AXIS + 1e-9:
+            raise ValueError(f"{field} axis can have 1 to {GRID_MAX_AXIS} values")
+        count = math.floor(count + 1e-9)
+        # round() keeps 0.1-steps from drifting (7.199999999999999)
+        spec = [start + i * step if type(step) is int and type(start) is int else round(start + i * step, 10)
+                for i in range(count)]
+    elif not isinstance(spec, list):
+        spec = [spec]
+    if not spec or len(spec) > GRID_MAX_AXIS:
+        raise ValueError(f"{field} axis can have 1 to {GRID_MAX_AXIS} values")
+    check = _check[field]
+    return [check(value) for value in spec]
+
+
+def _nested(values, shape):
+    """Flat list -> nested lists of `shape`."""
+    for size in reversed(shape[1:]):
+        values = [values[i:i + size] for i in range(0, len(values), size)]
+    return values
+
+
+def calculate_emi_grid(principal, annual_rate, tenure_months):
+    """
+    EMI and total interest for every combination of the three axes, as
+    [principal][annual_rate][tenure_months] matrices, in one vectorized pass.
+    """
+    from india_tools import amortization
+
+    axes = [_axis('principal', principal), _axis('annual_rate', annual_rate),
+            _axis('tenure_months', tenure_months)]
+    shape = [len(a) for a in axes]
+    if shape[0] * shape[1] * shape[2] > GRID_MAX_CELLS:
+        raise ValueError(f"Grid can have at most {GRID_MAX_CELLS} cells")
+
+    p, a, n = axes
+    if amortization.np is not None:
+        np = amortization.np
+        p, a, n = np.array(p, dtype=float)[:, None, None], np.array(a, dtype=float)[None, :, None], \
+            np.array(n, dtype=float)[None, None, :]
+        emi = amortization.emi(p, a, n)
+        with np.errstate(invalid='ignore', over='ignore'):
+            interest = np.where(a == 0, 0.0, emi * n - p)
+        emis, interests = emi.ravel(), interest.ravel()
+    else:
+        emis, interests = [], []
+        for principal in p:
+            for rate in a:
+                for months in n:
+                    try:
+                        emi = amortization._emi_scalar(principal, rate, months)
+                    except OverflowError:
+                        emi = math.inf
+                    emis.append(emi)
+                    interests.append(0.0 if rate == 0 else emi * months - principal)
+
+    # Rounded like calculate_emi; cells the float range can't hold are null
+    return {
+        "principal": axes[0],
+        "annual_rate": axes[1],
+        "tenure_months": axes[2],
+        "cells": len(emis),
+        "emi": _nested(amortization.round_values(emis), shape),
+        "total_interest": _nested(amortization.round_values(interests), shape),
+    }
+
+
+def grid_from_body(body, stream=False):
+    if any(body.get(name) is None for name in INPUT.names):
+        raise ValueError(INPUT.missing_message())
+    return calculate_emi_grid(body['principal'], body['annual_rate'], body['tenure_months'])
+
+
+# ============ Prepayment ============
+def prepay_from_body(body, stream=False):
+    """
+    A part-prepayment of `amount` after EMI number `month`, on the loan
+    given either as principal/annual_rate/tenure_months or as the
+    "state" token of an earlier prepayment.
+    """
+    from india_tools import prepayment
+
+    token = body.get('state')
+    if token is not None:
+        state = prepayment.decode(token)
+    else:
+        loan = _loan(body)
+        calculate_emi(*loan)  # validate
+        state = prepayment.start(*loan)
+    try:
+        state = prepayment.apply(state, body.get('month'), body.get('amount'), body.get('mode', 'reduce_tenure'))
+        result = prepayment.summary(state)
+    except OverflowError:
+        raise ValueError(OUT_OF_RANGE) from None
+    result["state"] = prepayment.encode(state)
+    return result
+
+
+EXTRA_ROUTES = {'schedule': schedule_from_body, 'grid': grid_from_body, 'prepay': prepay_from_body}
+
+
+# ============ Batch ============
+def calculate_emi_batch(principals, annual_rates, tenures):
+    # (1 + r) ** n is shared by every loan with the same rate and tenure
+    terms = {}
+    out = []
+    for principal, annual_rate, tenure_months in zip(principals, annual_rates, tenures):
+        if (type(principal) not in NUMBER or type(annual_rate) not in NUMBER or type(tenure_months) is not int
+                or not principal > 0 or not annual_rate >= 0 or tenure_months <= 0):
+            out.append(None)
+            continue
+
+        key = (annual_rate, tenure_months)
+        term = terms.get(key)
+        if term is None:
+            monthly_rate = annual_rate / 12 / 100
+            try:
+                growth = (1 + monthly_rate) ** tenure_months
+            except OverflowError:
+                out.append(None)
+                continue
+            term = terms[key] = (monthly_rate, growth, growth - 1)
+        monthly_rate, growth, denominator = term
+        if denominator == 0:  # as compute(): 0%, or too small a rate
+            emi = principal / tenure_months
+            total_interest = 0
+        else:
+            emi = principal * monthly_rate * growth / denominator
+            total_interest = (emi * tenure_months) - principal
+
+        total_amount = emi * tenure_months
+        out.append({
+            "principal": round(principal, 2),
+            "annual_rate": round(annual_rate, 2),
+            "tenure_months": tenure_months,
+            "emi": round(emi, 2),
+            "total_interest": round(total_interest, 2),
+            "total_amount": round(total_amount, 2)
+        })
+    return out
+
+
+def _floats(column):
+    return column.tolist() if hasattr(column, 'tolist') else column
+
+
+def _solve_batch(mode, principals, annual_rates, tenures, emis):
+    """Results for one solve mode's items, None for any it declines."""
+    from india_tools import emisolver
+
+    valid = []
+    for i, (principal, annual_rate, tenure_months, emi) in enumerate(zip(principals, annual_rates, tenures, emis)):
+        if type(emi) not in NUMBER or not emi > 0:
+            continue
+        if mode != 'principal' and (type(principal) not in NUMBER or not principal > 0):
+            continue
+        if mode != 'rate' and (type(annual_rate) not in NUMBER or not annual_rate >= 0):
+            continue
+        if mode != 'tenure' and (type(tenure_months) is not int or tenure_months <= 0):
+            continue
+        valid.append(i)
+
+    out = [None] * len(emis)
+    if not valid:
+        return out
+    p, a, n, e = ([column[i] for i in valid] for column in (principals, annual_rates, tenures, emis))
+    try:
+        if mode == 'tenure':
+            results = map(_tenure_result, p, a, _floats(emisolver.tenure(p, a, e)))
+        elif mode == 'rate':
+            results = map(_rate_result, p, n, e, _floats(emisolver.rate(p, n, e)))
+        else:
+            # One closed form per row: NumPy's expm1/log1p can differ from libm by
+            # an ULP, which the round-down to the paisa turns into a visible one
+            results = map(_principal_result, a, n, map(emisolver.principal, a, n, e))
+        for i, result in zip(valid, results):
+            out[i] = result
+    except (OverflowError, ValueError):
+        return [None] * len(emis)  # e.g. huge inputs: leave them to the single-item path
+    return out
+
+
+def emi_batch_kernel(principals, annual_rates, tenures, solves, emis):
+    """calculate_emi_batch, with items that set "solve" solved a column per mode."""
+    if solves.count(None) == len(solves):
+        return calculate_emi_batch(principals, annual_rates, tenures)
+
+    out = [None] * len(solves)
+    modes = {}
+    for i, solve in enumerate(solves):
+        if solve is None or solve == 'emi':
+            solve = 'emi'
+        elif type(solve) is not str or solve not in SOLVE_INPUTS:
+            continue  # declined: from_body reports the bad mode
+        modes.setdefault(solve, []).append(i)
+    for mode, indices in modes.items():
+        columns = [[column[i] for i in indices] for column in (principals, annual_rates, tenures, emis)]
+        if mode == 'emi':
+            results = calculate_emi_batch(*columns[:3])
+        else:
+            results = _solve_batch(mode, *columns)
+        for i, result in zip(indices, results):
+            out[i] = result
+    return out
+
+
+batch_kernel = emi_batch_kernel
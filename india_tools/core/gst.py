@@ -0,0 +1,74 @@
+"""GST on a single amount at one rate, and on whole invoices (/api/gst/invoice)."""
+
+from india_tools import streaming
+from india_tools.core import NUMBER
+from india_tools.schema import Field, Schema
+
+NAME = 'gst'
+DATED = False
+INPUT = Schema(
+    Field('amount', 'number', minimum=0, message="Amount must be a non-negative number"),
+    Field('rate', 'number', minimum=0, maximum=100, message="Rate must be between 0 and 100"),
+)
+FIELDS = INPUT.batch_fields
+RESULT_FIELDS = ('original', 'gst_amount', 'gst_rate', 'total')
+
+
+def compute(amount, rate):
+    gst_amount = amount * (rate / 100)
+    return {
+        "original": round(amount, 2),
+        "gst_amount": round(gst_amount, 2),
+        "gst_rate": rate,
+        "total": round(amount + gst_amount, 2)
+    }
+
+
+calculate_gst = INPUT.function(compute, 'calculate_gst')
+from_body = INPUT.from_body(compute)
+GstInput = INPUT.struct('GstInput', __name__)
+
+
+# ============ Invoice ============
+def calculate_gst_invoice(lines, inter_state=False, inclusive=False):
+    """Totals and HSN-wise summary for a multi-line invoice (see india_tools.invoice)."""
+    from india_tools import invoice  # Decimal: only invoices pay for it
+
+    return invoice.invoice(lines, inter_state, inclusive)
+
+
+def invoice_from_body(body, stream=False):
+    from india_tools.invoice import SUMMARY_COLUMNS
+
+    lines = body.get('lines')
+    if lines is None:
+        raise ValueError("lines field required")
+    result = calculate_gst_invoice(lines, body.get('inter_state', False), body.get('inclusive', False))
+    if stream:
+        return streaming.Rows(iter(result['hsn_summary']), SUMMARY_COLUMNS)
+    return result
+
+
+EXTRA_ROUTES = {'invoice': invoice_from_body}
+
+
+def calculate_gst_batch(amounts, rates):
+    # one division per distinct slab instead of one per line item
+    factors = {r: r / 100 for r in rates if type(r) in NUMBER and 0 <= r <= 100}
+    out = []
+    for amount, rate in zip(amounts, rates):
+        factor = factors.get(rate) if type(rate) in NUMBER and type(amount) in NUMBER and amount >= 0 else None
+        if factor is None:
+            out.append(None)
+            continue
+        gst_amount = amount * factor if factor else amount * (rate / 100)  # 0 and -0.0 share a key, not a sign
+        out.append({
+            "original": round(amount, 2),
+            "gst_amount": round(gst_amount, 2),
+            "gst_rate": rate,
+            "total": round(amount + gst_amount, 2)
+        })
+    return out
+
+
+batch_kernel = calculate_gst_batch
@@ -0,0 +1,151 @@
+"""
+Inverse EMI queries: the tenure, rate or principal behind a given EMI.
+
+With r the monthly rate, n the tenure in months and v = (1+r)^-n,
+
+    EMI = P r / (1 - v)
+
+inverts in closed form for two of the three unknowns:
+
+    tenure      n = -ln(1 - P r / EMI) / ln(1 + r)     (P / EMI when r = 0)
+    principal   P = EMI (1 - v) / r                     (EMI n when r = 0)
+
+The rate has no closed form (it is the loan's IRR). g(r) = P r / (1 - v)
+- EMI increases with r, is negative as r -> 0 when EMI n > P and
+positive at r = EMI / P, so the root is bracketed. Newton steps start
+from the small-rate approximation r = 2 (n EMI - P) / (P (n + 1)), and
+any step that leaves the bracket is replaced by bisection. With NumPy
+a whole column is solved at once, iterating until every item converged.
+
+Like amortization, every function takes scalars or columns and returns
+a float or a column (a NumPy array when installed, else a list).
+Inputs are assumed validated; infeasible items (an EMI that never pays
+off the loan) come back as NaN.
+"""
+
+import math
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised on minimal installs
+    np = None
+
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-11  # relative, on the monthly rate
+ZERO_RATE = 1e-12  # EMI x tenure within this (relative) of the principal: an interest-free loan
+
+_NAN = float('nan')
+
+
+def _columns(*args):
+    """Broadcast scalars and equal-length sequences to lists (fallback path)."""
+    size = max(len(x) for x in args if hasattr(x, '__len__'))
+    return [x if hasattr(x, '__len__') else [x] * size for x in args]
+
+
+def _vectorize(scalar, np_fn, *args):
+    if not any(hasattr(x, '__len__') for x in args):
+        return scalar(*args)  # one loan: plain floats beat 0-d arrays
+    if np is not None:
+        arrays = [np.asarray(x, dtype=float) for x in args]
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            return np_fn(*arrays)
+    return [scalar(*item) for item in zip(*_columns(*args))]
+
+
+# ============ Tenure ============
+def _tenure_scalar(principal, annual_rate, emi):
+    r = annual_rate / 1200
+    if r == 0:
+        return principal / emi
+    x = principal * r / emi
+    if x >= 1:
+        return _NAN
+    return -math.log1p(-x) / math.log1p(r)
+
+
+def _tenure_np(p, a, e):
+    r = a / 1200
+    x = p * r / e
+    n = -np.log1p(-x) / np.log1p(r)
+    return np.where(r == 0, p / e, np.where(x < 1, n, np.nan))
+
+
+def tenure(principal, annual_rate, emi):
+    """Exact (fractional) months to repay `principal` at `emi`; NaN if emi doesn't cover the interest."""
+    return _vectorize(_tenure_scalar, _tenure_np, principal, annual_rate, emi)
+
+
+# ============ Principal ============
+def _principal_scalar(annual_rate, tenure_months, emi):
+    r = annual_rate / 1200
+    if r == 0:
+        return emi * tenure_months
+    return emi * -math.expm1(-tenure_months * math.log1p(r)) / r
+
+
+def _principal_np(a, n, e):
+    r = a / 1200
+    return np.where(r == 0, e * n, e * -np.expm1(-n * np.log1p(r)) / r)
+
+
+def principal(annual_rate, tenure_months, emi):
+    """Largest principal that `emi` repays over `tenure_months` at `annual_rate`."""
+    return _vectorize(_principal_scalar, _principal_np, annual_rate, tenure_months, emi)
+
+
+# ============ Rate ============
+def _rate_scalar(principal, tenure_months, emi):
+    p, n, e = principal, tenure_months, emi
+    if e * n <= p * (1 + ZERO_RATE):
+        return 0.0 if e * n >= p * (1 - ZERO_RATE) else _NAN
+    lo, hi = 0.0, e / p
+    r = min(max(2 * (n * e - p) / (p * (n + 1)), hi * 1e-9), hi / 2)
+    for _ in range(MAX_ITERATIONS):
+        one_minus_v = -math.expm1(-n * math.log1p(r))
+        g = p * r / one_minus_v - e
+        if g < 0:
+            lo = r
+        else:
+            hi = r
+        v = 1 - one_minus_v
+        slope = p * (one_minus_v - r * n * v / (1 + r)) / one_minus_v ** 2
+        new = r - g / slope if slope > 0 else _NAN
+        if not lo <= new <= hi:
+            new = (lo + hi) / 2
+        if abs(new - r) <= TOLERANCE * new or hi - lo <= TOLERANCE * hi:
+            return new * 1200
+        r = new
+    return r * 1200
+
+
+def _rate_np(p, n, e):
+    p, n, e = np.broadcast_arrays(p, n, e)
+    feasible = e * n > p * (1 + ZERO_RATE)
+    zero = ~feasible & (e * n >= p * (1 - ZERO_RATE))
+    # Infeasible items solve a placeholder loan instead, keeping the maths finite
+    p, n, e = np.where(feasible, p, 1.0), np.where(feasible, n, 1.0), np.where(feasible, e, 2.0)
+    lo = np.zeros_like(p)
+    hi = e / p
+    r = np.clip(2 * (n * e - p) / (p * (n + 1)), hi * 1e-9, hi / 2)
+    done = ~feasible
+    for _ in range(MAX_ITERATIONS):
+        one_minus_v = -np.expm1(-n * np.log1p(r))
+        g = p * r / one_minus_v - e
+        below = g < 0
+        lo = np.where(below, r, lo)
+        hi = np.where(below, hi, r)
+        slope = p * (one_minus_v - r * n * (1 - one_minus_v) / (1 + r)) / one_minus_v ** 2
+        new = r - g / slope
+        new = np.where((new >= lo) & (new <= hi), new, (lo + hi) / 2)
+        converged = (np.abs(new - r) <= TOLERANCE * new) | (hi - lo <= TOLERANCE * hi)
+        r = np.where(done, r, new)
+        done |= converged
+        if done.all():
+            break
+    return np.where(feasible, r * 1200, np.where(zero, 0.0, np.nan))
+
+
+def rate(principal, tenure_months, emi):
+    """Annual rate (%) at which `emi` repays `principal` in `tenure_months`; NaN if emi x tenure < principal."""
+    return _vectorize(_rate_scalar, _rate_np, principal, tenure_months, emi)
@@ -0,0 +1,240 @@
+"""
+BaseHTTPRequestHandler front end for india_tools.app.
+
+APIHandler serves every route (api/index.py). function_handler(name)
+builds the handler class for one Vercel function, e.g. api/gst.py:
+it pre-imports just that tool and answers only its own paths.
+"""
+
+import io
+import time
+from http.server import BaseHTTPRequestHandler
+
+from india_tools import codec, core, limits, metrics, offload, profiling, streaming
+from india_tools.app import EndpointNotFound, execute, handle_get, record, resolve
+
+
+class _SocketReader(io.RawIOBase):
+    """
+    rfile's socket reads. While `deadline` is set, every recv waits only
+    until then, and running out counts as a request timeout.
+    """
+
+    def __init__(self, sock):
+        self._sock = sock
+        self.deadline = None
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.deadline is None:
+            return self._sock.recv_into(buffer)
+        try:
+            left = self.deadline - time.monotonic()
+            if left <= 0:
+                raise TimeoutError("timed out")
+            self._sock.settimeout(left)
+            return self._sock.recv_into(buffer)
+        except TimeoutError:
+            limits.LIMITS.count('timeout')
+            raise
+
+
+class APIHandler(BaseHTTPRequestHandler):
+
+    def setup(self):
+        super().setup()
+        self.rfile.close()
+        self._reader = _SocketReader(self.connection)
+        self.rfile = io.BufferedReader(self._reader)
+
+    def handle_one_request(self):
+        self.connection.settimeout(self.timeout)  # idle wait for the next request
+        try:
+            started = self.rfile.peek(1)
+        except TimeoutError:
+            started = b''
+        if not started:
+            self.close_connection = True
+            return
+        # The request has started: its request line and headers get read_timeout in all,
+        # not per recv, so a client trickling bytes can't hold the thread
+        self._reader.deadline = time.monotonic() + limits.LIMITS.read_timeout
+        try:
+            super().handle_one_request()
+        finally:
+            self._reader.deadline = None
+
+    def parse_request(self):
+        self.timer = metrics.Timer()
+        try:
+            ok = super().parse_request()
+        finally:
+            self._reader.deadline = None
+            self.connection.settimeout(self.timeout)  # the rest (body aside) gets the keep-alive timeout
+        self.timer.lap('headers')
+        return ok
+
+    def do_POST(self):
+        if profiling.PROFILER.enabled:
+            with profiling.PROFILER.request():
+                return self._post()
+        return self._post()
+
+    def _post(self):
+        path = self.path
+        status, error = 200, None
+
+        try:
+            length = limits.LIMITS.admit(self.client_address[0], path.partition('?')[0],
+                                         self.headers.get('Content-Length'))
+            if length > 0:
+                raw = limits.LIMITS.read_body(self.rfile, self.connection, length)
+                self.connection.settimeout(self.timeout)  # the reply gets the keep-alive timeout again
+            else:
+                raw = b''
+            self.timer.lap('read')
+            body = codec.loads(raw) if raw else {}
+
+            self.check_path(path)
+            media_type = streaming.negotiate(self.headers.get('Accept'))
+            self.timer.lap('parse')
+            response = execute(path, body, stream=media_type != streaming.JSON)
+            self.timer.lap('calc')
+
+            if media_type == streaming.JSON:
+                self._send_response(200, response)
+            else:
+                error = self._send_stream(200, media_type, streaming.encode(response, media_type))
+
+        except EndpointNotFound:
+            status = 404
+            self.timer.fail()
+            self.send_error(404)
+
+        except limits.Rejected as e:
+            status, error = e.status, str(e)
+            self.timer.fail()
+            # The body is still unread: answer and hang up
+            self._send_response(e.status, {"error": error}, [*e.headers, ('Connection', 'close')])
+
+        except TimeoutError as e:
+            status, error = 408, str(e)
+            limits.LIMITS.count('timeout')
+            self.timer.fail()
+            self._send_response(408, {"error": error}, [('Connection', 'close')])
+
+        except offload.Busy as e:
+            status, error = 503, str(e)
+            self.timer.fail()
+            self._send_response(503, {"error": error}, [('Retry-After', str(e.retry_after))])
+
+        except Exception as e:
+            status, error = 400, str(e)
+            self.timer.fail()
+            self._send_response(400, {"error": error})
+
+        finally:
+            record('POST', path.partition('?')[0], status, self.timer, error)
+
+    def do_GET(self):
+        path, _, query = self.path.partition('?')
+        try:
+            self.check_path(path)
+            limits.LIMITS.admit(self.client_address[0], path)
+        except EndpointNotFound:
+            self.send_error(404)
+            record('GET', path, 404, self.timer)
+            return
+        except limits.Rejected as e:
+            self.timer.fail()
+            self._send_response(e.status, {"error": str(e)}, e.headers)
+            record('GET', path, e.status, self.timer, str(e))
+            return
+        status, headers, payload = handle_get(path, query, self.headers.get('If-None-Match'))
+        self.timer.lap('calc')
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header('Content-Length', str(len(payload)))
+        self._add_cors_headers()
+        self.end_headers()
+        self.wfile.write(payload)
+        self.timer.lap('write')
+        record('GET', path, status, self.timer)
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self._add_cors_headers()
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+        record('OPTIONS', self.path.partition('?')[0], 200, self.timer)
+
+    def check_path(self, path):
+        """Hook for restricting which paths this handler serves."""
+
+    def _send_response(self, status, data, headers=()):
+        payload = codec.dumps(data)
+        self.timer.lap('serialize')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self._add_cors_headers()
+        self.end_headers()
+        self.wfile.write(payload)
+        self.timer.lap('write')
+
+    def _send_stream(self, status, media_type, chunks):
+        """Stream `chunks`; returns an error message if the body was cut short."""
+        chunked = self.request_version == 'HTTP/1.1' and self.protocol_version == 'HTTP/1.1'
+        self.send_response(status)
+        self.send_header('Content-Type', streaming.content_type(media_type))
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.send_header('Connection', 'close')  # body ends when the connection does
+        self._add_cors_headers()
+        self.end_headers()
+        try:
+            for chunk in metrics.timed_chunks(chunks, self.timer):
+                if chunk:
+                    self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk) if chunked else chunk)
+            if chunked:
+                self.wfile.write(b'0\r\n\r\n')
+        except Exception as e:
+            # Headers are gone already; cutting the connection marks the body as truncated
+            self.close_connection = True
+            return f"stream aborted: {e}"
+        return None
+
+    def end_headers(self):
+        if metrics.DEBUG and hasattr(self, 'timer'):
+            self.send_header('Server-Timing', metrics.server_timing(self.timer))
+        super().end_headers()
+
+    def _add_cors_headers(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+
+    def log_message(self, format, *args):
+        # Suppress default logging to reduce console clutter
+        pass
+
+
+def function_handler(name):
+    """Handler class for a single-tool Vercel function (/api/<name>, /api/<name>/...)."""
+    core.get(name)  # import at cold start, not on the first request
+
+    class handler(APIHandler):
+        def check_path(self, path):
+            target = resolve(path.partition('?')[0])
+            if target is None or target[0] != name:
+                raise EndpointNotFound(path)
+
+    handler.__qualname__ = f'handler[{name}]'
+    return handler
@@ -0,0 +1,113 @@
+"""
+Cacheable GET variants of the calculator endpoints.
+
+    GET /api/gst?amount=1000&rate=18
+
+Query parameters are decoded with JSON number semantics ("18" -> 18,
+"18.0" -> 18.0, anything else stays a string) and passed to the same
+dispatch as the POST body. Responses carry a strong ETag derived from
+the canonical inputs and a Cache-Control lifetime, and If-None-Match
+short-circuits to 304 without computing anything.
+
+A query that is not in canonical form (keys sorted, standard escaping)
+is redirected to the canonical URL so that CDNs see one URL per input.
+Results depending on today's date expire at the next local midnight.
+"""
+
+import hashlib
+import json
+import re
+import time
+from datetime import date
+from urllib.parse import parse_qsl, quote, urlencode
+
+from india_tools import codec
+
+# Bump when any calculator's output changes so old ETags stop matching.
+ETAG_VERSION = '2'
+
+MAX_AGE = 86400          # browsers
+SHARED_MAX_AGE = 604800  # CDN / Vercel edge
+
+_NUMBER = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?\Z')
+
+
+class QueryError(ValueError):
+    pass
+
+
+def parse_query(query):
+    """Query string -> (params dict, canonical query string)."""
+    pairs = parse_qsl(query, keep_blank_values=True)
+    params = {}
+    for name, value in pairs:
+        if name in params:
+            raise QueryError(f"Duplicate query parameter: {name}")
+        params[name] = json.loads(value) if _NUMBER.match(value) else value
+    canonical = urlencode(sorted(pairs), quote_via=quote)
+    return params, canonical
+
+
+def etag(path, canonical, day=None, version=None):
+    token = f'{ETAG_VERSION}|{path}?{canonical}|{day or ""}|{version or ""}'.encode()
+    return '"' + hashlib.blake2b(token, digest_size=12).hexdigest() + '"'
+
+
+def seconds_until_midnight(now=None):
+    """Seconds left in the current local day (at least 1)."""
+    now = time.time() if now is None else now
+    t = time.localtime(now)
+    midnight = time.mktime((t.tm_year, t.tm_mon, t.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+    return max(1, int(midnight - now))
+
+
+def cache_control(dated):
+    if dated:
+        ttl = seconds_until_midnight()
+        return f'public, max-age={ttl}, s-maxage={ttl}'
+    return f'public, max-age={MAX_AGE}, s-maxage={SHARED_MAX_AGE}'
+
+
+def etag_matches(if_none_match, tag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    candidates = (c.strip() for c in if_none_match.split(','))
+    return any(c.removeprefix('W/') == tag for c in candidates)
+
+
+def handle_get(dispatch, path, query, if_none_match=None, dated=False, version=None):
+    """
+    Answer a GET for `path` with `query` -> (status, headers, payload bytes).
+
+    dispatch(path, params) computes the result as for a POST body;
+    version (of the data behind it) is part of the ETag.
+    Headers exclude CORS, which the transport adds.
+    """
+    try:
+        params, canonical = parse_query(query)
+    except QueryError as e:
+        return _error(400, str(e))
+    if query != canonical:
+        location = f'{path}?{canonical}' if canonical else path
+        return 301, [('Location', location), ('Cache-Control', f'public, max-age={SHARED_MAX_AGE}'),
+                     ('Content-Type', 'application/json')], b''
+
+    tag = etag(path, canonical, date.today().isoformat() if dated else None, version)
+    headers = [('ETag', tag), ('Cache-Control', cache_control(dated))]
+    if etag_matches(if_none_match, tag):
+        return 304, headers, b''
+
+    try:
+        payload = codec.dumps(dispatch(path, params))
+    except LookupError:
+        return _error(404, "Endpoint not found")
+    except Exception as e:
+        return _error(400, str(e))
+    return 200, [('Content-Type', 'application/json'), *headers], payload
+
+
+def _error(status, message):
+    return status, [('Content-Type', 'application/json'), ('Cache-Control', 'no-store')], \
+        codec.dumps({"error": message})
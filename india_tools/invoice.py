@@ -0,0 +1,170 @@
+"""
+Invoice-level GST: many line items, many slabs, one pass.
+
+Every amount is carried as an integer number of paise. A JSON number is
+taken at the value it was written as (12.345 is 12345/1000, not the
+nearest binary float), so the only rounding is the explicit half-up
+rounding to the paisa:
+
+    line value      unit price x quantity, once per line
+    tax             once per (HSN code, rate) group, on the group's
+                    taxable value; CGST and SGST each at half the rate
+
+Lines are summed into their (HSN code, rate) group as they are
+validated, so the per-line cost is a few dict lookups and integer
+operations whatever the number of slabs. With inclusive pricing the
+line amounts include GST and each group's taxable value is backed out
+of its gross total, the tax being the difference, so the invoice total
+is exactly the sum of the lines.
+"""
+
+from decimal import Decimal
+
+MESSAGES = {
+    'amount': "Amount must be a non-negative number",
+    'quantity': "Quantity must be a positive number",
+    'rate': "Rate must be between 0 and 100",
+    'hsn': "HSN code must be a string",
+}
+SUMMARY_COLUMNS = ('hsn', 'rate', 'lines', 'taxable_value', 'cgst', 'sgst', 'igst', 'total_tax', 'total')
+
+_NUMBER = (int, float)
+_INF = float('inf')
+
+
+def _ratio(x):
+    """Exact (numerator, denominator) of a finite JSON number as written."""
+    if type(x) is int:
+        return x, 1
+    return Decimal(repr(x)).as_integer_ratio()
+
+
+def _half_up(n, d):
+    """n / d rounded half up, for n >= 0 and d > 0."""
+    return (2 * n + d) // (2 * d)
+
+
+def _rupees(paise):
+    return paise / 100
+
+
+def _line_error(i, key):
+    return ValueError(f"lines[{i}]: {MESSAGES[key]}")
+
+
+def _group(lines):
+    """Validate lines and sum them by (hsn, rate) -> {key: [line count, paise]}."""
+    groups = {}
+    for i, line in enumerate(lines):
+        if type(line) is not dict:
+            raise ValueError(f"lines[{i}] must be an object")
+        amount = line.get('amount')
+        quantity = line.get('quantity', 1)
+        rate = line.get('rate')
+        hsn = line.get('hsn', '')
+
+        if type(amount) not in _NUMBER or not (0 <= amount < _INF):
+            raise _line_error(i, 'amount')
+        if type(rate) not in _NUMBER or not (0 <= rate <= 100):
+            raise _line_error(i, 'rate')
+        if type(hsn) is not str:
+            if type(hsn) is not int:
+                raise _line_error(i, 'hsn')
+            hsn = str(hsn)
+
+        # Amounts with at most two decimals (nearly all of them) need no Decimal
+        paise = round(amount * 100) if amount < 1e13 else None
+        if paise is not None and paise / 100 == amount:
+            numerator, denominator = paise, 1
+        else:
+            numerator, denominator = _ratio(amount)
+            numerator *= 100
+        if quantity != 1 or type(quantity) is not int:
+            if type(quantity) not in _NUMBER or not (0 < quantity < _INF):
+                raise _line_error(i, 'quantity')
+            if type(quantity) is int:
+                numerator *= quantity
+            else:
+                qn, qd = _ratio(quantity)
+                numerator *= qn
+                denominator *= qd
+        if denominator != 1:
+            paise = _half_up(numerator, denominator)
+        else:
+            paise = numerator
+
+        group = groups.get((hsn, rate))
+        if group is None:
+            groups[(hsn, rate)] = [1, paise]
+        else:
+            group[0] += 1
+            group[1] += paise
+    return groups
+
+
+def _taxes(paise, rate, inter_state, inclusive):
+    """(taxable, cgst, sgst, igst) in paise for one group's total."""
+    rn, rd = _ratio(rate)
+    if inclusive:
+        taxable = _half_up(paise * 100 * rd, 100 * rd + rn)
+        tax = paise - taxable
+        if inter_state:
+            return taxable, 0, 0, tax
+        cgst = _half_up(tax, 2)
+        return taxable, cgst, tax - cgst, 0
+    if inter_state:
+        return paise, 0, 0, _half_up(paise * rn, 100 * rd)
+    half = _half_up(paise * rn, 200 * rd)
+    return paise, half, half, 0
+
+
+def invoice(lines, inter_state=False, inclusive=False):
+    """
+    GST for a whole invoice: totals plus an HSN-wise summary.
+
+    lines are {"amount", "rate", "quantity" (default 1), "hsn" (default
+    "")}; amount is the unit price, including GST when `inclusive`.
+    Intra-state supplies split the tax into CGST and SGST, inter-state
+    supplies charge IGST. A bad line raises ValueError naming its index.
+    """
+    if type(lines) is not list or not lines:
+        raise ValueError("lines must be a non-empty JSON array of line items")
+    if type(inter_state) is not bool:
+        raise ValueError("inter_state must be true or false")
+    if type(inclusive) is not bool:
+        raise ValueError("inclusive must be true or false")
+
+    summary = []
+    totals = [0, 0, 0, 0]
+    for (hsn, rate), (count, paise) in sorted(_group(lines).items()):
+        taxes = _taxes(paise, rate, inter_state, inclusive)
+        for j, value in enumerate(taxes):
+            totals[j] += value
+        taxable, cgst, sgst, igst = taxes
+        tax = cgst + sgst + igst
+        summary.append({
+            "hsn": hsn,
+            "rate": rate,
+            "lines": count,
+            "taxable_value": _rupees(taxable),
+            "cgst": _rupees(cgst),
+            "sgst": _rupees(sgst),
+            "igst": _rupees(igst),
+            "total_tax": _rupees(tax),
+            "total": _rupees(taxable + tax),
+        })
+
+    taxable, cgst, sgst, igst = totals
+    tax = cgst + sgst + igst
+    return {
+        "supply": "inter-state" if inter_state else "intra-state",
+        "inclusive": inclusive,
+        "line_count": len(lines),
+        "taxable_value": _rupees(taxable),
+        "cgst": _rupees(cgst),
+        "sgst": _rupees(sgst),
+        "igst": _rupees(igst),
+        "total_tax": _rupees(tax),
+        "total": _rupees(taxable + tax),
+        "hsn_summary": summary,
+    }
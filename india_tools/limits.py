@@ -0,0 +1,197 @@
+"""
+Request limits: body size, read timeouts and per-client rate limiting.
+
+Every check that needs only the request head runs before the body is
+read or parsed, so an abusive request costs a few dict lookups:
+
+    body size     Content-Length above max_body gets 413 unread
+    rate          token buckets per client IP and per (client IP, route);
+                  an empty bucket gets 429 with Retry-After
+    read timeout  the headers, then the body, must arrive within
+                  read_timeout seconds each once a request has started,
+                  however slowly the bytes trickle in (slow clients get
+                  408, or for headers are just disconnected)
+
+Rejected requests are counted by reason for /metrics. Buckets are
+sharded by key hash, each shard with its own lock, so request threads
+rarely wait on each other; each process (prefork worker) keeps its own.
+
+    API_MAX_BODY         bytes (default 16 MiB)
+    API_READ_TIMEOUT     seconds (default 10)
+    API_RATE_IP          requests/s per client IP (default 0: off)
+    API_RATE_ROUTE       requests/s per client IP and route (default 0: off)
+    API_RATE_BURST       seconds of rate a bucket holds (default 2)
+"""
+
+import math
+import os
+import threading
+import time
+
+from india_tools import core
+
+MAX_BODY = 16 * 1024 * 1024
+READ_TIMEOUT = 10.0
+BURST = 2.0
+SHARDS = 16
+MAX_KEYS = 100000  # buckets kept across all shards; full ones are forgotten first
+REASONS = ('body', 'rate_ip', 'rate_route', 'timeout')
+
+_CHUNK = 64 * 1024
+
+
+class Rejected(Exception):
+    """Refuse the request with `status` (and Retry-After when retry_after is set)."""
+
+    def __init__(self, status, message, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def headers(self):
+        return [('Retry-After', str(self.retry_after))] if self.retry_after is not None else []
+
+
+class TokenBuckets:
+    """Token buckets by key: `rate` tokens/s, holding at most `burst`."""
+
+    def __init__(self, rate, burst, shards=SHARDS, max_keys=MAX_KEYS, clock=time.monotonic):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._clock = clock
+        self._max_shard = max(1, max_keys // shards)
+        self._shards = [({}, threading.Lock()) for _ in range(shards)]
+
+    def take(self, key, tokens=1.0):
+        """Spend `tokens` from key's bucket -> 0.0, or the seconds until they are there."""
+        buckets, lock = self._shards[hash(key) % len(self._shards)]
+        now = self._clock()
+        with lock:
+            bucket = buckets.get(key)
+            if bucket is None:
+                if len(buckets) >= self._max_shard:
+                    self._prune(buckets, now)
+                bucket = buckets[key] = [self.burst, now]
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= tokens:
+                bucket[0] -= tokens
+                return 0.0
+            return (tokens - bucket[0]) / self.rate
+
+    def _prune(self, buckets, now):
+        # Buckets that would have refilled are indistinguishable from new ones
+        refill = self.burst / self.rate
+        for key in [k for k, (_, stamp) in buckets.items() if now - stamp >= refill]:
+            del buckets[key]
+        while len(buckets) >= self._max_shard:
+            del buckets[next(iter(buckets))]  # oldest first
+
+    def __len__(self):
+        return sum(len(buckets) for buckets, _ in self._shards)
+
+
+def _route(path):
+    """Rate-limit key for a path: the route it resolves to (unknown paths share one)."""
+    if path in core.ROUTES or path == '/api/batch':
+        return path
+    path = path.rstrip('/')
+    return path if path in core.ROUTES else None
+
+
+class Limits:
+    """The limits one server process enforces, and its rejection counters."""
+
+    def __init__(self, max_body=MAX_BODY, read_timeout=READ_TIMEOUT, ip_rate=0, route_rate=0, burst=BURST):
+        self._lock = threading.Lock()
+        self.rejected = dict.fromkeys(REASONS, 0)
+        self.max_body = max_body
+        self.read_timeout = read_timeout
+        self.ip_rate = self.route_rate = 0
+        self.burst = burst
+        self._ip = self._route = None
+        self.configure(ip_rate=ip_rate, route_rate=route_rate)
+
+    def configure(self, max_body=None, read_timeout=None, ip_rate=None, route_rate=None, burst=None):
+        if max_body is not None:
+            self.max_body = max_body
+        if read_timeout is not None:
+            self.read_timeout = read_timeout
+        if burst is not None:
+            self.burst = burst
+        if ip_rate is not None or burst is not None:
+            self.ip_rate = self.ip_rate if ip_rate is None else ip_rate
+            self._ip = TokenBuckets(self.ip_rate, self.ip_rate * self.burst) if self.ip_rate > 0 else None
+        if route_rate is not None or burst is not None:
+            self.route_rate = self.route_rate if route_rate is None else route_rate
+            self._route = TokenBuckets(self.route_rate, self.route_rate * self.burst) if self.route_rate > 0 else None
+
+    def count(self, reason):
+        with self._lock:
+            self.rejected[reason] += 1
+
+    def _reject(self, reason, status, message, wait=None):
+        self.count(reason)
+        raise Rejected(status, message, None if wait is None else max(1, math.ceil(wait)))
+
+    def admit(self, client, path, content_length=None):
+        """
+        Checks on the request head, before any of the body is read ->
+        the body length. Raises Rejected if the request must be refused.
+        """
+        try:
+            length = int(content_length or 0)
+        except ValueError:
+            raise Rejected(400, "Bad Content-Length") from None
+        if length < 0:
+            raise Rejected(400, "Bad Content-Length")
+        if length > self.max_body:
+            self._reject('body', 413, f"Request body too large (max {self.max_body} bytes)")
+        if self._ip is not None:
+            wait = self._ip.take(client)
+            if wait:
+                self._reject('rate_ip', 429, "Too many requests, retry later", wait)
+        if self._route is not None:
+            route = _route(path)
+            wait = self._route.take((client, route))
+            if wait:
+                self._reject('rate_route', 429, f"Too many requests to {route or 'this path'}, retry later", wait)
+        return length
+
+    def read_body(self, rfile, sock, length):
+        """
+        `length` bytes from a blocking socket's rfile, all within
+        read_timeout (TimeoutError otherwise). Shorter if the client
+        hangs up.
+        """
+        deadline = time.monotonic() + self.read_timeout
+        chunks = []
+        while length > 0:
+            left = deadline - time.monotonic()
+            try:
+                if left <= 0:
+                    raise TimeoutError
+                sock.settimeout(left)
+                chunk = rfile.read1(min(length, _CHUNK))
+            except TimeoutError:
+                raise TimeoutError("Request body not received in time") from None
+            if not chunk:
+                break
+            chunks.append(chunk)
+            length -= len(chunk)
+        return chunks[0] if len(chunks) == 1 else b''.join(chunks)
+
+    def stats(self):
+        with self._lock:
+            return dict(self.rejected)
+
+
+LIMITS = Limits(
+    max_body=int(os.environ.get('API_MAX_BODY', MAX_BODY)),
+    read_timeout=float(os.environ.get('API_READ_TIMEOUT', READ_TIMEOUT)),
+    ip_rate=float(os.environ.get('API_RATE_IP', 0)),
+    route_rate=float(os.environ.get('API_RATE_ROUTE', 0)),
+    burst=float(os.environ.get('API_RATE_BURST', BURST)),
+)
@@ -0,0 +1,147 @@
+"""
+Structured request logs: JSON lines on stdout, written off the request path.
+
+Request threads only build a small dict and enqueue it; a background
+thread takes whatever has queued up, serializes it and writes it with a
+single write + flush. Successful requests are sampled, warnings (4xx)
+and errors (5xx, aborted streams) are always kept. When the queue is
+full, records are dropped and counted rather than blocking a request.
+
+    API_LOG_LEVEL    DEBUG | INFO | WARNING | ERROR | OFF   (default INFO)
+    API_LOG_SAMPLE   fraction of successful requests logged (default 0.01)
+
+Sampled lines carry "sample" so counts can be scaled back up.
+"""
+
+import atexit
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40, 'OFF': 100}
+MAX_QUEUE = 10000
+MAX_BATCH = 512
+
+
+class Log:
+    def __init__(self, level='INFO', sample=0.01, stream=None, max_queue=MAX_QUEUE):
+        self.stream = stream  # None: whatever sys.stdout is at write time
+        self.max_queue = max_queue
+        self.dropped = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.configure(level, sample)
+
+    def configure(self, level=None, sample=None):
+        if level is not None:
+            level = level.upper()
+            if level not in LEVELS:
+                raise ValueError(f"log level must be one of {', '.join(LEVELS)}")
+            self.level = level
+            self._threshold = LEVELS[level]
+        if sample is not None:
+            if not 0 <= sample <= 1:
+                raise ValueError("log sample rate must be between 0 and 1")
+            self.sample = sample
+
+    def emit(self, level, msg, **fields):
+        if LEVELS[level] < self._threshold:
+            return
+        fields['level'] = level
+        fields['msg'] = msg
+        self._put(fields)
+
+    def request(self, method, path, status, seconds, stages=None, error=None):
+        """One line per finished request; successes only for a `sample` fraction."""
+        if status >= 500 or error is not None and status < 400:  # 5xx, or a stream cut short
+            level = 'ERROR'
+        else:
+            level = 'INFO' if status < 400 else 'WARNING'
+        if LEVELS[level] < self._threshold:
+            return
+        record = {'level': level, 'msg': 'request', 'method': method, 'path': path,
+                  'status': status, 'seconds': seconds}
+        if level == 'INFO':
+            if self.sample < 1:
+                if random.random() >= self.sample:
+                    return
+                record['sample'] = self.sample
+        elif error is not None:
+            record['error'] = error
+        if stages:
+            record['stages'] = stages
+        self._put(record)
+
+    def _put(self, record):
+        record['ts'] = time.time()
+        if self._queue.qsize() >= self.max_queue:
+            self.dropped += 1
+            return
+        self._queue.put(record)
+        if self._thread is None:
+            self._start()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._write_loop, name='api-log', daemon=True)
+                self._thread.start()
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            lines = ''.join(_format(r) for r in batch if r is not None)
+            stream = self.stream or sys.stdout
+            try:
+                stream.write(lines)
+                stream.flush()
+            except (OSError, ValueError):
+                pass  # stdout closed: nowhere left to log to
+            if stop:
+                return
+
+    def flush(self, timeout=5.0):
+        """Write out everything queued so far and stop the writer (restarts on the next record)."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def _after_fork(self):
+        # The writer thread doesn't survive fork(); the child starts its own.
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+
+def _format(record):
+    ts = record.pop('ts')
+    head = {'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(ts)) + f'.{int(ts % 1 * 1000):03d}Z',
+            'level': record.pop('level'), 'msg': record.pop('msg')}
+    seconds = record.pop('seconds', None)
+    stages = record.pop('stages', None)
+    if seconds is not None:
+        record['ms'] = round(seconds * 1000, 3)
+    if stages:
+        record['stages'] = {k: round(v * 1000, 3) for k, v in stages.items()}
+    head.update(record)
+    return json.dumps(head, separators=(',', ':'), default=str) + '\n'
+
+
+LOG = Log(os.environ.get('API_LOG_LEVEL', 'INFO'), float(os.environ.get('API_LOG_SAMPLE', 0.01)))
+
+atexit.register(LOG.flush)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=LOG._after_fork)
@@ -0,0 +1,179 @@
+"""
+Request metrics in Prometheus text format (GET /metrics).
+
+    india_tools_requests_total{method,route}
+    india_tools_request_errors_total{method,route,status}
+    india_tools_request_duration_seconds{method,route}     histogram
+    india_tools_stage_seconds_total{route,stage}           see STAGES
+
+`route` is the endpoint template (/api/gst, /api/emi/schedule, ...), so
+label cardinality stays bounded whatever paths clients send. Counters
+live in the process: in prefork mode each worker reports its own.
+
+In debug mode (API_DEBUG=1, or --debug on api/index.py) responses also
+carry a Server-Timing header with the stages of that request, which
+browser dev tools show next to the network timings.
+"""
+
+import os
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Where a request's time goes, in order. calc includes input validation;
+# the profiler (india_tools.profiling) splits the two.
+STAGES = (
+    'headers',    # request line read -> headers parsed (threaded handler)
+    'read',       # body read off the socket
+    'parse',      # JSON decode, routing, content negotiation
+    'calc',       # validation and the calculation
+    'serialize',  # JSON / CSV / NDJSON encoding
+    'write',      # response head and body written to the socket
+)
+
+DEBUG = os.environ.get('API_DEBUG', '') not in ('', '0')
+
+
+class Timer:
+    """Wall time of one request, split into stages: lap(stage) charges the time since the last lap."""
+
+    __slots__ = ('start', 'stages', '_mark')
+
+    def __init__(self):
+        self.start = self._mark = perf_counter()
+        self.stages = {}
+
+    def lap(self, stage):
+        now = perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self._mark
+        self._mark = now
+
+    def fail(self):
+        """Charge the time up to an error to the stage it interrupted (parse or calc)."""
+        self.lap('calc' if 'parse' in self.stages else 'parse')
+
+    def add(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def elapsed(self):
+        return perf_counter() - self.start
+
+
+def server_timing(timer):
+    """Server-Timing header value for the stages so far, in milliseconds."""
+    parts = [f'{stage};dur={seconds * 1000:.3f}' for stage, seconds in timer.stages.items()]
+    parts.append(f'total;dur={timer.elapsed() * 1000:.3f}')
+    return ', '.join(parts)
+
+
+def timed_chunks(chunks, timer, done=None, stage='serialize'):
+    """
+    Iterate a streamed body, charging the time spent producing each chunk
+    (not sending it) to `stage`. done(error), if given, runs once the
+    stream ends, fails or is abandoned.
+    """
+    error = None
+    chunks = iter(chunks)
+    try:
+        while True:
+            mark = perf_counter()
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                return
+            finally:
+                timer.add(stage, perf_counter() - mark)
+            yield chunk
+    except Exception as e:
+        error = f"stream aborted: {e}"
+        raise
+    finally:
+        if done is not None:
+            done(error)
+
+
+class Registry:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._durations = {}  # (method, route) -> [count, sum, per-bucket counts]
+        self._errors = {}     # (method, route, status) -> count
+        self._stages = {}     # (route, stage) -> seconds
+
+    def observe(self, method, route, status, timer):
+        """Account one finished request; returns its duration in seconds."""
+        seconds = timer.elapsed()
+        bucket = bisect_left(self.buckets, seconds)
+        with self._lock:
+            hist = self._durations.get((method, route))
+            if hist is None:
+                hist = self._durations[(method, route)] = [0, 0.0, [0] * (len(self.buckets) + 1)]
+            hist[0] += 1
+            hist[1] += seconds
+            hist[2][bucket] += 1
+            if status >= 400:
+                key = (method, route, status)
+                self._errors[key] = self._errors.get(key, 0) + 1
+            for stage, spent in timer.stages.items():
+                key = (route, stage)
+                self._stages[key] = self._stages.get(key, 0.0) + spent
+        return seconds
+
+    def clear(self):
+        with self._lock:
+            self._durations.clear()
+            self._errors.clear()
+            self._stages.clear()
+
+    def render(self, extra=()):
+        """
+        Prometheus exposition text. extra: (name, type, help, value) for
+        process-wide values such as cache counters; value may also be a
+        {'label="x"': value} dict for a labelled family.
+        """
+        with self._lock:
+            durations = {k: (n, s, list(b)) for k, (n, s, b) in self._durations.items()}
+            errors = dict(self._errors)
+            stages = dict(self._stages)
+
+        out = []
+        _family(out, 'india_tools_requests_total', 'counter', 'Requests served, by route.')
+        for (method, route), (count, _, _) in sorted(durations.items()):
+            out.append(f'india_tools_requests_total{{method="{method}",route="{route}"}} {count}')
+
+        _family(out, 'india_tools_request_errors_total', 'counter', 'Responses with status >= 400.')
+        for (method, route, status), count in sorted(errors.items()):
+            out.append(f'india_tools_request_errors_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+        name = 'india_tools_request_duration_seconds'
+        _family(out, name, 'histogram', 'Time spent handling a request.')
+        for (method, route), (count, total, counts) in sorted(durations.items()):
+            labels = f'method="{method}",route="{route}"'
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                out.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            out.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+            out.append(f'{name}_sum{{{labels}}} {total:.6f}')
+            out.append(f'{name}_count{{{labels}}} {count}')
+
+        _family(out, 'india_tools_stage_seconds_total', 'counter',
+                f"Time spent per request stage: {', '.join(STAGES)}.")
+        for (route, stage), spent in sorted(stages.items()):
+            out.append(f'india_tools_stage_seconds_total{{route="{route}",stage="{stage}"}} {spent:.6f}')
+
+        for name, kind, help_text, value in extra:
+            _family(out, name, kind, help_text)
+            if isinstance(value, dict):
+                out.extend(f'{name}{{{labels}}} {v}' for labels, v in value.items())
+            else:
+                out.append(f'{name} {value}')
+        return '\n'.join(out) + '\n'
+
+
+def _family(out, name, kind, help_text):
+    out.append(f'# HELP {name} {help_text}')
+    out.append(f'# TYPE {name} {kind}')
@@ -0,0 +1,227 @@
+"""
+Process-pool offload for heavy requests.
+
+Single calculations take microseconds and always run inline. Batches,
+bulk and invoice endpoints, schedules and grids can take tens of
+milliseconds of pure Python, which would otherwise hold the thread
+(or event loop) that owns the socket and, through the GIL, slow down
+every other request in the process. cost() estimates the work in a
+request body (items, lines, schedule months, grid cells); anything at
+or above the threshold runs in a ProcessPoolExecutor instead.
+
+Admission is bounded: at most workers + max_queue offloaded requests
+are in flight, and one more is refused straight away with Busy, which
+the front ends answer with 503 and a Retry-After header. A request that
+takes longer than `timeout` also gets Busy; its job keeps its slot until
+it finishes, so a stuck pool fills up and sheds load rather than queue
+without bound. Results, and the errors for bad input, are exactly what
+running inline would give.
+
+Streamed (NDJSON / CSV) replies always run inline: their rows are made
+as they are written, in bounded memory, where a worker would have to
+build them all and send them back in one piece.
+
+Off unless configured (API_OFFLOAD_WORKERS, or --offload-workers on
+api/index.py): a Vercel function has no use for a pool.
+"""
+
+import math
+import threading
+
+from india_tools import core
+
+THRESHOLD = 2000      # cost units (~ batch items) from which a request is offloaded
+MAX_QUEUE = 64        # offloaded requests waiting for a worker, beyond one per worker
+TIMEOUT = 30.0        # seconds an offloaded request may take
+RETRY_AFTER = 1       # seconds, sent with 503s
+
+
+class Busy(Exception):
+    """The pool can't take (or didn't finish) this request: answer 503 with Retry-After."""
+
+    def __init__(self, message, retry_after=RETRY_AFTER):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# ============ Cost ============
+def _size(value):
+    return len(value) if isinstance(value, list) else 1
+
+
+def _axis_size(spec):
+    if isinstance(spec, dict):
+        try:
+            return max(1, math.floor((spec['stop'] - spec['start']) / spec['step']) + 1)
+        except (KeyError, TypeError, ZeroDivisionError, ValueError, OverflowError):
+            return 1
+    return _size(spec)
+
+
+def _schedule_cost(body):
+    months = body.get('tenure_months')
+    months = months if type(months) is int and months > 0 else 1
+    if 'page' in body or 'page_size' in body:
+        page_size = body.get('page_size', 120)
+        return min(months, page_size) if type(page_size) is int and page_size > 0 else 1
+    return months  # a JSON reply is one 120-month page, but that is cheap either way
+
+
+def _grid_cost(body):
+    return _axis_size(body.get('principal')) * _axis_size(body.get('annual_rate')) \
+        * _axis_size(body.get('tenure_months'))
+
+
+# (tool, sub-path) -> body -> cost; other routes count the longest list in the body
+COSTS = {
+    ('emi', 'schedule'): _schedule_cost,
+    ('emi', 'grid'): _grid_cost,
+}
+
+
+def cost(path, body):
+    """Rough work units in a request: 0 for single calculations, else ~items processed."""
+    if path == '/api/batch':
+        return _size(body)
+    target = core.ROUTES.get(path) or core.ROUTES.get(path.rstrip('/'))
+    if target is None or target[1] is None:
+        return 0
+    if isinstance(body, list):
+        return len(body)
+    if not isinstance(body, dict):
+        return 0
+    estimate = COSTS.get(target)
+    if estimate is not None:
+        return estimate(body)
+    return max((len(v) for v in body.values() if isinstance(v, list)), default=1)
+
+
+# ============ Pool ============
+def _start_worker():
+    core.preload()
+
+
+def _run(path, body):
+    """Worker side: the request as route() would answer it."""
+    from india_tools import app
+
+    return app.route(path, body)
+
+
+def _context():
+    import multiprocessing  # only offloading servers pay for it, not every cold start
+
+    # Forking a process full of threads is unsafe; forkserver forks a clean helper instead
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+class Offloader:
+    """Runs requests with cost() >= threshold in a process pool, inline otherwise."""
+
+    def __init__(self, workers=0, threshold=THRESHOLD, max_queue=MAX_QUEUE, timeout=TIMEOUT,
+                 retry_after=RETRY_AFTER):
+        self._lock = threading.Lock()
+        self._pool = None
+        self.offloaded = self.rejected = self.timeouts = 0
+        self.workers = self.inflight = 0
+        self.configure(workers, threshold, max_queue, timeout, retry_after)
+
+    def configure(self, workers=None, threshold=None, max_queue=None, timeout=None, retry_after=None):
+        with self._lock:
+            if threshold is not None:
+                self.threshold = threshold
+            if timeout is not None:
+                self.timeout = timeout
+            if retry_after is not None:
+                self.retry_after = retry_after
+            if max_queue is not None:
+                self.max_queue = max_queue
+            if workers is not None and workers != self.workers:
+                self._shutdown()
+                self.workers = workers
+
+    @property
+    def enabled(self):
+        return self.workers > 0
+
+    def candidate(self, path):
+        """True if a request to `path` may be offloaded (worth moving off an event loop)."""
+        if not self.enabled:
+            return False
+        target = core.ROUTES.get(path) or core.ROUTES.get(path.rstrip('/'))
+        return path == '/api/batch' or (target is not None and target[1] is not None)
+
+    def call(self, inline, path, body, stream=False):
+        """inline(path, body, stream), or the same request answered by the pool if it is heavy (and not streamed)."""
+        if not self.enabled or stream or cost(path, body) < self.threshold:
+            return inline(path, body, stream)
+        from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout  # see _context()
+        from concurrent.futures.process import BrokenProcessPool
+
+        with self._lock:
+            if self.inflight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise Busy("Server busy, retry later", self.retry_after)
+            self.inflight += 1
+            pool = self._pool
+            if pool is None:
+                pool = self._pool = ProcessPoolExecutor(self.workers, mp_context=_context(),
+                                                        initializer=_start_worker)
+            self.offloaded += 1
+        try:
+            future = pool.submit(_run, path, body)
+        except BaseException as e:
+            self._done(None)
+            if isinstance(e, BrokenProcessPool):
+                self._broken(pool)
+            raise
+        future.add_done_callback(self._done)
+
+        try:
+            return future.result(self.timeout)
+        except FutureTimeout:
+            future.cancel()  # only helps if it hasn't started; otherwise it keeps its slot
+            with self._lock:
+                self.timeouts += 1
+            raise Busy("Request timed out, retry later", self.retry_after) from None
+        except BrokenProcessPool:
+            self._broken(pool)
+
+    def _broken(self, pool):
+        # A worker died: the pool is unusable, start a fresh one next time
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise Busy("Worker pool restarted, retry later", self.retry_after) from None
+
+    def _done(self, future):
+        with self._lock:
+            self.inflight -= 1
+
+    def _shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def shutdown(self):
+        with self._lock:
+            self._shutdown()
+
+    def _after_fork(self):
+        # The parent's pool (and its management thread) doesn't exist in a forked child
+        self._lock = threading.Lock()
+        self._pool = None
+        self.inflight = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "threshold": self.threshold,
+                "inflight": self.inflight,
+                "offloaded": self.offloaded,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+            }
@@ -0,0 +1,192 @@
+"""
+Part-prepayment what-ifs on a loan, applied to a saved amortization state.
+
+A loan being repaid is a State: where the current repayment segment
+starts (month, balance), its EMI, the months it has left, and what has
+been paid so far. Balances inside a segment follow amortization's closed
+form, so a prepayment at month k needs only the balance at k: the
+months already paid are summed in O(1) and the remaining schedule is
+re-solved from the new balance, keeping the EMI (reduce_tenure) or the
+end date (reduce_emi).
+
+Every result carries the new state as a compact token:
+
+    v1.<base64 of the state as JSON>.<base64 of a blake2b MAC>
+
+so the client can chain the next what-if off it. The MAC is keyed with
+API_STATE_KEY when set (tokens then can't be forged); without it the
+MAC only catches corrupted tokens, and the first token issued logs a
+warning. Either way a decoded state must describe a loan the calculator
+accepts, with its segment inside that loan. Recently issued states are
+also kept per process in SESSIONS, which saves decoding and checking them.
+"""
+
+import base64
+import hashlib
+import hmac
+import math
+import os
+from collections import namedtuple
+
+from india_tools import amortization, cache, codec, emisolver, logs
+
+MODES = ('reduce_tenure', 'reduce_emi')
+TOKEN_VERSION = 'v1'
+
+SESSIONS = cache.ResultCache(
+    maxsize=int(os.environ.get('API_STATE_SESSIONS', 4096)),
+    ttl=float(os.environ.get('API_STATE_TTL', 1800)),
+)
+
+_KEY = os.environ.get('API_STATE_KEY', '').encode()
+_warned = False
+
+State = namedtuple('State', [
+    'principal', 'annual_rate', 'tenure_months',  # the loan as taken
+    'month', 'balance', 'emi', 'remaining',       # current segment: starts after `month`, `remaining` may be fractional
+    'interest_paid', 'prepaid',                   # totals up to `month`
+    'baseline_interest',                          # total interest without any prepayment
+])
+
+
+def _remaining_interest(balance, annual_rate, emi, months):
+    """Interest still to pay on `balance`: whole EMIs, then a smaller final one for a fractional tenure."""
+    if balance <= 0:
+        return 0.0
+    whole = math.floor(months + 1e-9)
+    paid = emi * whole
+    if months - whole > 1e-9:
+        last = _balance(balance, annual_rate, emi, whole)
+        paid += last * (1 + annual_rate / 1200)
+    return paid - balance
+
+
+def _balance(balance, annual_rate, emi, k):
+    """Balance k months into a segment (amortization's closed form)."""
+    r = annual_rate / 1200
+    if r == 0:
+        return balance - emi * k
+    growth = (1 + r) ** k
+    return balance * growth - emi * (growth - 1) / r
+
+
+def start(principal, annual_rate, tenure_months):
+    """State of a new loan (inputs validated by the caller)."""
+    emi = amortization.emi(principal, annual_rate, tenure_months)
+    return State(principal, annual_rate, tenure_months, 0, principal, emi, tenure_months,
+                 0.0, 0.0, emi * tenure_months - principal)
+
+
+def apply(state, month, amount, mode='reduce_tenure'):
+    """
+    Prepay `amount` right after EMI number `month` -> new State.
+
+    month must fall in the current segment: from state.month up to the
+    last month it still has EMIs for. An amount beyond the outstanding
+    balance closes the loan.
+    """
+    if state.balance <= 0:
+        raise ValueError("The loan is already repaid")
+    last = state.month + math.ceil(state.remaining - 1e-9) - 1
+    if type(month) is not int or not state.month <= month <= last:
+        raise ValueError(f"month must be a whole number from {state.month} to {last}")
+    if type(amount) not in (int, float) or not amount > 0:
+        raise ValueError("Prepayment amount must be greater than 0")
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {', '.join(MODES)}")
+
+    elapsed = month - state.month
+    balance = _balance(state.balance, state.annual_rate, state.emi, elapsed)
+    interest = state.emi * elapsed - (state.balance - balance)
+    amount = min(amount, balance)
+    balance -= amount
+    remaining = state.remaining - elapsed
+
+    if balance <= 1e-9:
+        balance, emi, remaining = 0.0, 0.0, 0
+    elif mode == 'reduce_tenure':
+        emi = state.emi
+        remaining = emisolver.tenure(balance, state.annual_rate, emi)
+    else:
+        emi = amortization.emi(balance, state.annual_rate, remaining)
+    return state._replace(month=month, balance=balance, emi=emi, remaining=remaining,
+                          interest_paid=state.interest_paid + interest, prepaid=state.prepaid + amount)
+
+
+def summary(state):
+    """JSON-ready view of a state, rounded like the calculators."""
+    remaining = math.ceil(state.remaining - 1e-9)
+    total_interest = state.interest_paid + _remaining_interest(state.balance, state.annual_rate,
+                                                               state.emi, state.remaining)
+    tenure = state.month + remaining
+    return {
+        "principal": round(state.principal, 2),
+        "annual_rate": round(state.annual_rate, 2),
+        "month": state.month,
+        "outstanding": round(state.balance, 2),
+        "emi": round(state.emi, 2),
+        "remaining_months": remaining,
+        "tenure_months": tenure,
+        "prepaid": round(state.prepaid, 2),
+        "total_interest": round(total_interest, 2),
+        "interest_saved": round(state.baseline_interest - total_interest, 2) + 0.0,
+        "months_saved": state.tenure_months - tenure,
+    }
+
+
+# ============ Tokens ============
+def _mac(payload):
+    return hashlib.blake2b(payload, key=_KEY, digest_size=12).digest()
+
+
+def _b64(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def _unb64(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def encode(state):
+    """Token for `state`, remembered in SESSIONS."""
+    global _warned
+    if not _KEY and not _warned:
+        _warned = True
+        logs.LOG.emit('WARNING', 'API_STATE_KEY is not set: prepayment state tokens can be forged')
+    payload = codec.dumps(list(state))
+    token = f'{TOKEN_VERSION}.{_b64(payload)}.{_b64(_mac(payload))}'
+    SESSIONS.put(token, state)
+    return token
+
+
+def decode(token):
+    """State for a token from encode(); ValueError if it is malformed or was altered."""
+    state = SESSIONS.get(token) if type(token) is str else cache.MISS
+    if state is not cache.MISS:
+        return state
+    try:
+        version, body, mac = token.split('.')
+        payload = _unb64(body)
+        if version != TOKEN_VERSION or not hmac.compare_digest(_unb64(mac), _mac(payload)):
+            raise ValueError
+        values = codec.loads(payload)
+        if type(values) is not list or len(values) != len(State._fields) \
+                or not all(type(v) in (int, float) and math.isfinite(v) for v in values):
+            raise ValueError
+        state = State(*values)
+        _check(state)
+    except (AttributeError, ValueError, TypeError):
+        raise ValueError("state must be a token returned by /api/emi/prepay") from None
+    SESSIONS.put(token, state)
+    return state
+
+
+def _check(state):
+    """ValueError unless `state` is a segment of a loan the calculator accepts."""
+    from india_tools.core.emi import calculate_emi
+
+    calculate_emi(state.principal, state.annual_rate, state.tenure_months)
+    if (type(state.month) is not int or not 0 <= state.month <= state.tenure_months
+            or not 0 <= state.balance <= state.principal or not 0 <= state.remaining <= state.tenure_months
+            or not state.emi >= 0):
+        raise ValueError
@@ -0,0 +1,181 @@
+"""
+Opt-in profiling of request handling.
+
+    cprofile   a sample of requests run under cProfile, one at a time;
+               the accumulated stats are written as a pstats file
+               (python -m pstats, snakeviz). Validation shows up as the
+               tool's from_body, the calculation as its compute.
+    stacks     a background thread samples the stacks of the threads
+               currently handling a request every `interval` seconds and
+               counts them in collapsed-stack form ("a;b;c 42" lines),
+               ready for flamegraph.pl or speedscope
+
+Front ends wrap each request in PROFILER.request() only when
+PROFILER.enabled, so with profiling off the cost is one attribute check.
+Output is written at exit and by dump(); `{pid}` in the path keeps
+prefork workers apart.
+
+    API_PROFILE            off | cprofile | stacks (default off)
+    API_PROFILE_OUT        output path (default profile-{pid}.pstats / .folded)
+    API_PROFILE_SAMPLE     cprofile: fraction of requests profiled (default 0.01)
+    API_PROFILE_INTERVAL   stacks: seconds between samples (default 0.005)
+"""
+
+import atexit
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+MODES = ('off', 'cprofile', 'stacks')
+SAMPLE = 0.01
+INTERVAL = 0.005
+MAX_DEPTH = 128
+
+_SUFFIX = {'cprofile': 'pstats', 'stacks': 'folded'}
+
+
+def _frame_name(code):
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f'{module}.{code.co_qualname}'
+
+
+def collapse(frame, limit=MAX_DEPTH):
+    """A frame's stack, outermost call first, as one collapsed-stack key."""
+    names = []
+    while frame is not None and len(names) < limit:
+        names.append(_frame_name(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class Profiler:
+    def __init__(self, mode='off', out=None, sample=SAMPLE, interval=INTERVAL):
+        self._lock = threading.Lock()
+        self._reset()
+        self.mode = 'off'
+        self.enabled = False
+        self.out = None
+        self.sample = sample
+        self.interval = interval
+        self._atexit = False
+        self.configure(mode, out, sample, interval)
+
+    def _reset(self):
+        self._profile = None
+        self._profiling = threading.Lock()  # cProfile follows one request at a time
+        self._active = {}                   # thread id -> requests in progress
+        self._thread = None
+        self.stacks = {}
+        self.samples = self.profiled = 0
+
+    def configure(self, mode=None, out=None, sample=None, interval=None):
+        if mode is not None:
+            if mode not in MODES:
+                raise ValueError(f"profile mode must be one of {', '.join(MODES)}")
+            self.mode = mode
+            self.enabled = mode != 'off'  # checked per request: a plain attribute
+        if out is not None:
+            self.out = out
+        if sample is not None:
+            if not 0 <= sample <= 1:
+                raise ValueError("profile sample rate must be between 0 and 1")
+            self.sample = sample
+        if interval is not None:
+            self.interval = interval
+        if self.enabled and not self._atexit:
+            atexit.register(self.dump)
+            self._atexit = True
+
+    @property
+    def path(self):
+        out = self.out or f'profile-{{pid}}.{_SUFFIX.get(self.mode, "out")}'
+        return out.format(pid=os.getpid())
+
+    @contextmanager
+    def request(self):
+        """Profile the request handled inside this block (if sampled)."""
+        if self.mode == 'cprofile':
+            if random.random() >= self.sample or not self._profiling.acquire(blocking=False):
+                yield
+                return
+            try:
+                if self._profile is None:
+                    import cProfile  # only when profiling is on
+
+                    self._profile = cProfile.Profile()
+                self._profile.enable()
+                try:
+                    yield
+                finally:
+                    self._profile.disable()
+                    self.profiled += 1
+            finally:
+                self._profiling.release()
+        elif self.mode == 'stacks':
+            ident = threading.get_ident()
+            with self._lock:
+                self._active[ident] = self._active.get(ident, 0) + 1
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._sampler, name='profiler', daemon=True)
+                    self._thread.start()
+            try:
+                yield
+            finally:
+                with self._lock:
+                    if self._active[ident] == 1:
+                        del self._active[ident]
+                    else:
+                        self._active[ident] -= 1
+        else:
+            yield
+
+    def _sampler(self):
+        me = threading.get_ident()
+        while self.mode == 'stacks':
+            time.sleep(self.interval)
+            with self._lock:
+                active = [ident for ident in self._active if ident != me]
+            if not active:
+                continue
+            frames = sys._current_frames()
+            with self._lock:
+                for ident in active:
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        key = collapse(frame)
+                        self.stacks[key] = self.stacks.get(key, 0) + 1
+                        self.samples += 1
+        with self._lock:
+            self._thread = None
+
+    def dump(self):
+        """Write what has been collected to `path`; returns it (None if nothing to write)."""
+        if self.mode == 'cprofile' and self._profile is not None:
+            with self._profiling:
+                self._profile.dump_stats(self.path)
+            return self.path
+        if self.mode == 'stacks' and self.stacks:
+            with self._lock:
+                lines = [f'{stack} {count}\n' for stack, count in sorted(self.stacks.items())]
+            with open(self.path, 'w') as f:
+                f.writelines(lines)
+            return self.path
+        return None
+
+    def _after_fork(self):
+        # Each worker profiles itself; the parent's sampler thread is gone
+        self._lock = threading.Lock()
+        self._reset()
+
+
+PROFILER = Profiler(
+    os.environ.get('API_PROFILE', 'off'),
+    os.environ.get('API_PROFILE_OUT') or None,
+    float(os.environ.get('API_PROFILE_SAMPLE', SAMPLE)),
+    float(os.environ.get('API_PROFILE_INTERVAL', INTERVAL)),
+)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=PROFILER._after_fork)
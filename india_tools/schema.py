@@ -0,0 +1,180 @@
+"""
+Declarative input schemas, compiled to plain Python validators.
+
+A tool declares its inputs once:
+
+    INPUT = Schema(
+        Field('amount', 'number', minimum=0, message="Amount must be a non-negative number"),
+        Field('rate', 'number', minimum=0, maximum=100, message="Rate must be between 0 and 100"),
+    )
+
+and gets functions generated from it, each a straight run of inline
+checks with no per-field loop or lookups at call time:
+
+    INPUT.from_body(compute)   body dict -> compute(*values); a missing
+                               required field raises "amount and rate
+                               fields required"
+    INPUT.function(compute)    positional call with the same checks
+    INPUT.struct('GstInput')   typed namedtuple decoded and validated
+                               straight from a body or JSON bytes
+
+Every check failure raises ValueError(field.message). Compilation costs
+a few hundred microseconds and happens when the tool module is imported.
+"""
+
+import keyword
+from collections import namedtuple
+
+KINDS = {
+    'number': ('(int, float)', 'a number'),
+    'integer': ('int', 'an integer'),
+    'string': ('str', 'a string'),
+    'any': (None, 'any value'),
+}
+
+REQUIRED = object()
+
+
+class Field:
+    """One input: kind, bounds, and the error message shown when a check fails."""
+
+    __slots__ = ('name', 'kind', 'default', 'minimum', 'maximum', 'exclusive_minimum', 'message')
+
+    def __init__(self, name, kind='any', default=REQUIRED, minimum=None, maximum=None,
+                 exclusive_minimum=None, message=None):
+        if not name.isidentifier() or keyword.iskeyword(name):
+            raise ValueError(f"field name must be an identifier: {name!r}")
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {', '.join(KINDS)}")
+        self.name = name
+        self.kind = kind
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.exclusive_minimum = exclusive_minimum
+        self.message = message or f"{name} must be {KINDS[kind][1]}"
+
+    @property
+    def required(self):
+        return self.default is REQUIRED
+
+    def describe(self):
+        out = {'type': self.kind}
+        if not self.required:
+            out['default'] = self.default
+        for key in ('minimum', 'maximum', 'exclusive_minimum'):
+            if getattr(self, key) is not None:
+                out[key] = getattr(self, key)
+        return out
+
+    def _condition(self):
+        """Python expression that is true when the value fails this field's checks, or None."""
+        v = self.name
+        parts = []
+        types = KINDS[self.kind][0]
+        if types is not None:
+            parts.append(f'not isinstance({v}, {types})')
+        # Written as `not (bound <op> v)` so NaN fails every bound.
+        if self.minimum is not None and self.maximum is not None:
+            parts.append(f'not ({self.minimum!r} <= {v} <= {self.maximum!r})')
+        elif self.minimum is not None:
+            parts.append(f'not ({v} >= {self.minimum!r})')
+        elif self.maximum is not None:
+            parts.append(f'not ({v} <= {self.maximum!r})')
+        if self.exclusive_minimum is not None:
+            parts.append(f'not ({v} > {self.exclusive_minimum!r})')
+        if not parts:
+            return None
+        if not self.required and self.default is None:  # optional, null allowed
+            return f'{v} is not None and ({" or ".join(parts)})'
+        return ' or '.join(parts)
+
+
+class Schema:
+    def __init__(self, *fields):
+        self.fields = fields
+        self.names = tuple(f.name for f in fields)
+        # ((name, default), ...) for batch.run: missing required inputs read as None
+        self.batch_fields = tuple((f.name, None if f.required else f.default) for f in fields)
+
+    def describe(self):
+        """JSON-able summary, e.g. for documentation."""
+        return {
+            'fields': {f.name: f.describe() for f in self.fields},
+            'required': [f.name for f in self.fields if f.required],
+        }
+
+    def missing_message(self):
+        required = [f.name for f in self.fields if f.required]
+        if len(required) == 1:
+            return f"{required[0]} field required"
+        if len(required) == 2:
+            return f"{required[0]} and {required[1]} fields required"
+        return f"{', '.join(required)} fields required"
+
+    def _checks(self, lines):
+        for f in self.fields:
+            condition = f._condition()
+            if condition:
+                lines.append(f'    if {condition}:')
+                lines.append(f'        raise ValueError({f.message!r})')
+
+    def from_body(self, compute, name='from_body'):
+        """Compile `body -> compute(*inputs)` with this schema's checks inlined."""
+        lines = [f'def {name}(body):']
+        for f in self.fields:
+            default = '' if f.required else f', _default_{f.name}'
+            lines.append(f'    {f.name} = body.get({f.name!r}{default})')
+        missing = [_missing(f) for f in self.fields if f.required]
+        if missing:
+            lines.append(f'    if {" or ".join(missing)}:')
+            lines.append(f'        raise ValueError({self.missing_message()!r})')
+        self._checks(lines)
+        lines.append(f'    return _compute({", ".join(self.names)})')
+        return self._compile(lines, name, compute)
+
+    def function(self, compute, name):
+        """Compile a positional `name(*inputs)` with this schema's checks inlined."""
+        params = [f.name if f.required else f'{f.name}=_default_{f.name}' for f in self.fields]
+        lines = [f'def {name}({", ".join(params)}):']
+        self._checks(lines)
+        lines.append(f'    return _compute({", ".join(self.names)})')
+        fn = self._compile(lines, name, compute)
+        fn.__doc__ = compute.__doc__
+        return fn
+
+    def struct(self, name, module):
+        """
+        Typed input record: a namedtuple with `from_body(dict)` and
+        `from_json(bytes)` constructors that validate like from_body().
+        """
+        from india_tools import codec
+
+        base = namedtuple(name, self.names, module=module)
+        cls = type(name, (base,), {
+            '__slots__': (),
+            '__module__': module,
+            '__doc__': f"Validated input: {', '.join(self.names)}.",
+            'schema': self,
+        })
+        decode = self.from_body(cls, name=f'{name}_from_body')
+        cls.from_body = staticmethod(decode)
+        cls.from_json = staticmethod(lambda raw: decode(codec.loads(raw)))
+        return cls
+
+    def _compile(self, lines, name, compute):
+        namespace = {'_compute': compute}
+        namespace.update((f'_default_{f.name}', f.default) for f in self.fields if not f.required)
+        source = '\n'.join(lines) + '\n'
+        exec(compile(source, f'<schema {name}>', 'exec'), namespace)
+        fn = namespace[name]
+        fn.__module__ = compute.__module__
+        fn.__source__ = source
+        return fn
+
+
+def _missing(field):
+    # Strings: empty counts as missing, as it always has for e.g. "dob"
+    if field.kind == 'string':
+        return f'not {field.name}'
+    return f'{field.name} is None'
@@ -0,0 +1,227 @@
+"""
+Production serving modes for the API handlers.
+
+    single   plain HTTPServer, one connection at a time (old dev behaviour)
+    thread   one process, a pool of worker threads
+    prefork  N forked processes sharing one listening socket,
+             each with its own pool of worker threads
+
+The pooled modes speak HTTP/1.1 keep-alive and drain in-flight requests
+on SIGTERM / Ctrl-C before exiting. Any BaseHTTPRequestHandler subclass
+works unchanged, so routing stays in the handler (e.g. api/index.py).
+"""
+
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer
+
+from india_tools import logs
+
+MODES = ('single', 'thread', 'prefork')
+
+
+class DrainAwareMixin:
+    """Handler mixin: HTTP/1.1 keep-alive, closed once the server starts draining."""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; with Nagle on, the body
+    # waits for the client's delayed ACK (~40ms) on every kept-alive request.
+    disable_nagle_algorithm = True
+
+    def handle_one_request(self):
+        # Between requests the connection is idle; a draining server may cut it.
+        self.server.mark_idle(self.connection, True)
+        try:
+            super().handle_one_request()
+        finally:
+            self.server.mark_idle(self.connection, False)
+        if self.server.draining:
+            self.close_connection = True
+
+    def parse_request(self):
+        # Request line has been read: the connection is busy until we reply.
+        self.server.mark_idle(self.connection, False)
+        return super().parse_request()
+
+    def end_headers(self):
+        if self.server.draining:
+            self.send_header('Connection', 'close')
+        super().end_headers()
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that hands each accepted connection to a thread pool."""
+
+    request_queue_size = 128  # socketserver's default of 5 drops SYNs under bursts
+
+    def __init__(self, server_address, handler_cls, threads=8, keepalive=5.0,
+                 bind_and_activate=True):
+        handler = type(handler_cls.__name__, (DrainAwareMixin, handler_cls),
+                       {'timeout': keepalive})
+        super().__init__(server_address, handler, bind_and_activate)
+        self.threads = threads
+        self.draining = False
+        # Worker threads start lazily on first submit, so building the pool
+        # before a fork is safe.
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='api')
+        self._cond = threading.Condition()
+        self._inflight = 0
+        self._idle = set()
+
+    def process_request(self, request, client_address):
+        with self._cond:
+            self._inflight += 1
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._cond:
+                self._inflight -= 1
+                self._cond.notify_all()
+
+    def mark_idle(self, conn, idle):
+        with self._cond:
+            if idle and not self.draining:
+                self._idle.add(conn)
+            else:
+                self._idle.discard(conn)
+                if idle:
+                    _hangup(conn)
+
+    def drain(self, timeout=30.0):
+        """Stop keep-alive, wait for in-flight requests. Returns True if all finished."""
+        with self._cond:
+            self.draining = True
+            for conn in self._idle:
+                _hangup(conn)
+            self._idle.clear()
+            deadline = time.monotonic() + timeout
+            while self._inflight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            clean = self._inflight == 0
+        self._pool.shutdown(wait=clean, cancel_futures=True)
+        return clean
+
+
+def _hangup(conn):
+    try:
+        conn.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+def _run_until_signalled(server, drain_timeout):
+    """serve_forever() until SIGTERM/Ctrl-C, then drain and close."""
+    def on_term(signum, frame):
+        # shutdown() blocks until serve_forever returns, so not from this thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, on_term)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if isinstance(server, PooledHTTPServer):
+            server.drain(drain_timeout)
+        server.server_close()
+
+
+def _prefork(server, workers, drain_timeout):
+    children = set()
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            # The parent coordinates shutdown; children only react to SIGTERM.
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            code = 0
+            try:
+                _run_until_signalled(server, drain_timeout)
+            except BaseException:
+                code = 1
+            finally:
+                logs.LOG.flush()  # os._exit skips atexit
+                os._exit(code)
+        children.add(pid)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    for _ in range(workers):
+        spawn()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while children:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if not stopping:
+            spawn()  # replace a crashed worker
+    server.server_close()
+
+
+def make_server(handler_cls, host='127.0.0.1', port=8000, mode='thread',
+                threads=8, keepalive=5.0):
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {', '.join(MODES)}")
+    if mode == 'single':
+        return HTTPServer((host, port), handler_cls)
+    return PooledHTTPServer((host, port), handler_cls, threads=threads, keepalive=keepalive)
+
+
+def serve(handler_cls, host='127.0.0.1', port=8000, mode='thread', workers=None,
+          threads=8, keepalive=5.0, drain_timeout=30.0):
+    """
+    Run handler_cls until stopped.
+
+    workers: processes for prefork (default: CPU count),
+             threads for thread mode (default: `threads`).
+    """
+    if mode == 'thread' and workers:
+        threads = workers
+    server = make_server(handler_cls, host, port, mode, threads, keepalive)
+
+    if mode == 'prefork':
+        if not hasattr(os, 'fork'):
+            raise RuntimeError("prefork mode needs os.fork (not available on this platform)")
+        _prefork(server, workers or os.cpu_count() or 1, drain_timeout)
+    else:
+        _run_until_signalled(server, drain_timeout)
+
+
+def add_arguments(parser, extra_modes=()):
+    """Shared CLI flags for the serving entry points."""
+    parser.add_argument('--host', default=os.environ.get('API_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('API_PORT', 8000)))
+    parser.add_argument('--mode', choices=MODES + tuple(extra_modes),
+                        default=os.environ.get('API_MODE', 'thread'))
+    parser.add_argument('--workers', type=int, default=None,
+                        help='processes (prefork) or threads (thread mode)')
+    parser.add_argument('--threads', type=int, default=8, help='threads per prefork worker')
+    parser.add_argument('--keepalive', type=float, default=5.0, help='idle keep-alive timeout, seconds')
+    parser.add_argument('--drain-timeout', type=float, default=30.0,
+                        help='seconds to wait for in-flight requests on shutdown')
+    return parser
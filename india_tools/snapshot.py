@@ -0,0 +1,109 @@
+"""
+Precomputed static tables, read in one go at cold start.
+
+`python main.py snapshot` writes india_tools/data/snapshot.bin, a
+marshal'd dict of plain bytes, tuples and numbers (one read, no parsing
+or validation to redo):
+
+    months      for every month of the years FIRST_YEAR..LAST_YEAR - 1,
+                the ordinal of the day before its 1st (native int32s)
+                and its length (a byte); agetable converts just the
+                slice a reference date needs
+    cgpa        the compiled CGPA table and its alias index
+                (cgpatable.Table.state()), with the digest of the JSON
+                it was compiled from
+
+Every section is optional to its users: agetable computes months outside
+the snapshot's years, and cgpatable parses the table file whenever its
+digest is not the snapshot's, so a stale snapshot is slower, never wrong.
+The file is read on first use; one that is missing, unreadable or of
+another FORMAT or byte order counts as no snapshot. API_SNAPSHOT names
+another file, or 0 to use none.
+
+The file is committed (vercel.json ships india_tools/** with every
+function, so deployments load it too); rerun `python main.py snapshot`
+and commit the result when india_tools/data or the table code changes.
+"""
+
+import marshal
+import os
+import sys
+from array import array
+
+FORMAT = 2
+PATH = os.path.join(os.path.dirname(__file__), 'data', 'snapshot.bin')
+FIRST_YEAR, LAST_YEAR = 1800, 2300  # months saved; covers today's table (SPAN years back) until 2299
+
+_sections = None
+
+
+def path():
+    """The snapshot file in use, None if disabled."""
+    value = os.environ.get('API_SNAPSHOT', PATH)
+    return None if value in ('', '0') else value
+
+
+def read(file):
+    """The sections saved in `file`, {} if there is no usable snapshot there."""
+    try:
+        with open(file, 'rb') as f:
+            data = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+    if type(data) is not dict or data.get('format') != FORMAT or data.get('byteorder') != sys.byteorder:
+        return {}
+    return data
+
+
+def months(first, last):
+    """(offsets, lengths) lists for the years first..last - 1 from the snapshot, or None."""
+    saved = get('months')
+    if saved is None:
+        return None
+    start, end = (first - saved['first']) * 12, (last - saved['first']) * 12
+    if start < 0 or end > len(saved['lengths']):
+        return None
+    return memoryview(saved['offsets']).cast('i')[start:end].tolist(), list(saved['lengths'][start:end])
+
+
+def get(section):
+    """A section of the snapshot in use, or None."""
+    global _sections
+    if _sections is None:
+        file = path()
+        _sections = read(file) if file else {}
+    return _sections.get(section)
+
+
+def reset():
+    """Forget the loaded snapshot: the next get() reads path() again."""
+    global _sections
+    _sections = None
+
+
+def build():
+    """Every section, computed from the current code and data files."""
+    from india_tools import agetable, cgpatable
+
+    offsets, lengths = agetable.months(FIRST_YEAR, LAST_YEAR)
+    return {
+        "format": FORMAT,
+        "byteorder": sys.byteorder,
+        "months": {"first": FIRST_YEAR, "offsets": array('i', offsets).tobytes(), "lengths": bytes(lengths)},
+        "cgpa": cgpatable.parse(_read(cgpatable.PATH)).state(),
+    }
+
+
+def _read(file):
+    with open(file, 'rb') as f:
+        return f.read()
+
+
+def write(file=PATH):
+    """Build the snapshot into `file` (atomically); returns its size in bytes."""
+    data = marshal.dumps(build())
+    tmp = f'{file}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, file)
+    return len(data)
@@ -0,0 +1,117 @@
+"""
+Streaming responses: NDJSON and CSV from row generators.
+
+A route that can produce a lot of output (schedules, batches) returns a
+`Rows` object when the client asked for a streaming format; transports
+then send `encode(rows, media_type)` chunk by chunk (chunked transfer
+encoding on HTTP/1.1), so memory stays bounded by one chunk. Plain JSON
+responses are unchanged.
+"""
+
+import io
+import itertools
+
+from india_tools import codec
+
+JSON = 'application/json'
+NDJSON = 'application/x-ndjson'
+CSV = 'text/csv'
+
+_MEDIA_TYPES = {
+    'application/json': JSON,
+    'application/x-ndjson': NDJSON,
+    'application/ndjson': NDJSON,
+    'application/jsonlines': NDJSON,
+    'text/csv': CSV,
+}
+
+CHUNK_ROWS = 512
+
+
+def negotiate(accept):
+    """Media type to answer with for an Accept header; JSON unless a stream format wins."""
+    if not accept:
+        return JSON
+    best, best_q = JSON, 0.0
+    for part in accept.split(','):
+        media, *params = [x.strip() for x in part.split(';')]
+        kind = _MEDIA_TYPES.get(media.lower())
+        if kind is None:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q > best_q:
+            best, best_q = kind, q
+    return best
+
+
+class Rows:
+    """Lazily produced result rows (dicts) plus the CSV column order."""
+
+    def __init__(self, rows, fields=None):
+        self.rows = rows
+        self.fields = fields
+
+    @classmethod
+    def of(cls, result):
+        if isinstance(result, cls):
+            return result
+        return cls(result if isinstance(result, list) else [result])
+
+
+def content_type(media_type):
+    return f'{media_type}; charset=utf-8' if media_type == CSV else media_type
+
+
+def encode(result, media_type, chunk_rows=CHUNK_ROWS):
+    """Iterator of byte chunks for a route result in NDJSON or CSV."""
+    rows = Rows.of(result)
+    if media_type == CSV:
+        return _csv_chunks(rows, chunk_rows)
+    return _ndjson_chunks(rows, chunk_rows)
+
+
+def _ndjson_chunks(rows, chunk_rows):
+    lines = []
+    dumps = codec.dumps
+    for row in rows.rows:
+        lines.append(dumps(row))
+        if len(lines) >= chunk_rows:
+            yield b'\n'.join(lines) + b'\n'
+            lines.clear()
+    if lines:
+        yield b'\n'.join(lines) + b'\n'
+
+
+def _csv_chunks(rows, chunk_rows):
+    import csv  # JSON replies (and cold starts) don't need it
+
+    it = iter(rows.rows)
+    fields = rows.fields
+    buffered = []
+    if fields is None:
+        first = next(it, None)
+        if first is None:
+            return
+        fields = list(first)
+        buffered.append(first)
+
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fields, restval='', extrasaction='ignore', lineterminator='\n')
+    writer.writeheader()
+    count = 0
+    for row in itertools.chain(buffered, it):
+        writer.writerow(row)
+        count += 1
+        if count >= chunk_rows:
+            yield buf.getvalue().encode()
+            buf.seek(0)
+            buf.truncate()
+            count = 0
+    if buf.tell():
+        yield buf.getvalue().encode()
@@ -0,0 +1,445 @@
+"""
+Compact binary protocol for high-volume internal callers.
+
+A persistent TCP or Unix socket carrying length-prefixed frames instead
+of HTTP requests with JSON text. Everything is big-endian:
+
+    request    u32 length | u32 id | u8 op     | payload
+    response   u32 length | u32 id | u8 status | payload
+
+`length` counts the bytes after itself. Ids are the caller's, echoed
+back; a connection's requests are answered in order, so a client may
+pipeline as many as it likes before reading.
+
+Ops and their payloads:
+
+    ROUTE  u16 path length | path | JSON body      any POST endpoint
+    GST    fixed layout of /api/gst's inputs   (amount, rate)
+    EMI    fixed layout of /api/emi's inputs   (principal, annual_rate, tenure_months)
+    AGE    fixed layout of /api/age's inputs   (dob, as_of)
+
+A fixed layout is a u8 mask of the inputs that are present, a u8 mask
+of the numbers that are ints, then per present input a f64 (numbers)
+or a u8 length and UTF-8 bytes (strings). Responses to fixed ops are
+status STRUCT: the same masks over the tool's result fields and one
+f64 each, in the order of FIXED; anything those can't carry exactly
+(ints beyond 2**53, other types) comes back as status JSON instead.
+
+    STRUCT / JSON   result, fixed layout / the JSON an HTTP client gets
+    ERROR           u16 HTTP-style status | UTF-8 message (400, 404, 413, 429, 503)
+
+The server decodes a fixed op back into the very body an HTTP client
+would have posted and answers it with the same dispatch (api/index.py's
+execute), so results, cache entries and error messages are identical;
+the fixed layouts only skip JSON text and HTTP parsing. limits.LIMITS
+applies per request, and requests are reported to `observe` as method
+WIRE. Client picks the fixed layout whenever a body fits it.
+
+Off unless asked for: api/index.py --wire-port / --wire-socket.
+"""
+
+import asyncio
+import math
+import socket
+import struct
+import threading
+
+from india_tools import codec, limits, metrics, offload
+
+_HEAD = struct.Struct('>IIB')   # length, id, op / status
+_U16 = struct.Struct('>H')
+_F64 = struct.Struct('>d')
+_MASKS = struct.Struct('>BB')
+
+OP_ROUTE, OP_GST, OP_EMI, OP_AGE = 0, 1, 2, 3
+STRUCT, JSON, ERROR = 0, 1, 2
+
+# op -> (path, inputs as (name, kind), result fields): part of the protocol, never reordered
+FIXED = {
+    OP_GST: ('/api/gst', (('amount', float), ('rate', float)),
+             ('original', 'gst_amount', 'gst_rate', 'total')),
+    OP_EMI: ('/api/emi', (('principal', float), ('annual_rate', float), ('tenure_months', float)),
+             ('principal', 'annual_rate', 'tenure_months', 'emi', 'total_interest', 'total_amount')),
+    OP_AGE: ('/api/age', (('dob', str), ('as_of', str)),
+             ('years', 'months', 'days', 'total_days')),
+}
+OPS = {path: op for op, (path, _, _) in FIXED.items()}
+
+MAX_EXACT = 2 ** 53   # ints up to this survive a round trip through f64
+MAX_STRING = 255
+
+
+class RemoteError(Exception):
+    """An ERROR response: `status` as HTTP would have answered, str() its message."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ============ Layouts ============
+def _exact(value):
+    kind = type(value)
+    if kind is int:
+        return -MAX_EXACT <= value <= MAX_EXACT
+    return kind is float and math.isfinite(value)
+
+
+def pack_fixed(fields, values):
+    """
+    Fixed layout of `values` ({name: value}) over `fields` ((name, kind),
+    ...), or None when they don't fit it (unknown keys, other types,
+    numbers f64 can't carry exactly).
+    """
+    if len(values) > len(fields):
+        return None
+    present = ints = 0
+    parts = []
+    found = 0
+    for i, (name, kind) in enumerate(fields):
+        if name not in values:
+            continue
+        value = values[name]
+        found += 1
+        present |= 1 << i
+        if kind is float:
+            if not _exact(value):
+                return None
+            if type(value) is int:
+                ints |= 1 << i
+            parts.append(_F64.pack(value))
+        else:
+            if type(value) is not str:
+                return None
+            raw = value.encode()
+            if len(raw) > MAX_STRING:
+                return None
+            parts.append(bytes((len(raw),)) + raw)
+    if found != len(values):
+        return None
+    return _MASKS.pack(present, ints) + b''.join(parts)
+
+
+def unpack_fixed(fields, payload):
+    """{name: value} from a fixed layout; ValueError if it is malformed."""
+    try:
+        present, ints = _MASKS.unpack_from(payload)
+        offset = _MASKS.size
+        values = {}
+        for i, (name, kind) in enumerate(fields):
+            if not present >> i & 1:
+                continue
+            if kind is float:
+                value = _F64.unpack_from(payload, offset)[0]
+                offset += 8
+                values[name] = int(value) if ints >> i & 1 else value
+            else:
+                size = payload[offset]
+                values[name] = payload[offset + 1:offset + 1 + size].decode()
+                offset += 1 + size
+                if offset > len(payload):
+                    raise ValueError
+    except (struct.error, IndexError, ValueError, OverflowError):
+        raise ValueError("Malformed request payload") from None
+    if offset != len(payload):
+        raise ValueError("Malformed request payload")
+    return values
+
+
+def _pack_result(names, result):
+    """STRUCT payload for a result dict with exactly `names`, all numbers; else None."""
+    if type(result) is not dict or len(result) != len(names):
+        return None
+    ints = 0
+    parts = []
+    for i, name in enumerate(names):
+        value = result.get(name)
+        if not _exact(value):
+            return None
+        if type(value) is int:
+            ints |= 1 << i
+        parts.append(value)
+    return _MASKS.pack((1 << len(names)) - 1, ints) + struct.pack(f'>{len(names)}d', *parts)
+
+
+def _unpack_result(names, payload):
+    _, ints = _MASKS.unpack_from(payload)
+    values = struct.unpack_from(f'>{len(names)}d', payload, _MASKS.size)
+    return {name: int(value) if ints >> i & 1 else value for i, (name, value) in enumerate(zip(names, values))}
+
+
+def encode_request(ident, path, body):
+    """One request frame: a fixed op if `body` fits one, else ROUTE with JSON."""
+    op = OPS.get(path)
+    payload = pack_fixed(FIXED[op][1], body) if op is not None and type(body) is dict else None
+    if payload is None:
+        op = OP_ROUTE
+        raw = path.encode()
+        payload = _U16.pack(len(raw)) + raw + codec.dumps(body)
+    return _HEAD.pack(len(payload) + 5, ident, op) + payload
+
+
+def _frame(ident, status, payload):
+    return _HEAD.pack(len(payload) + 5, ident, status) + payload
+
+
+def _error(ident, status, message):
+    return _frame(ident, ERROR, _U16.pack(status) + message.encode())
+
+
+# ============ Server ============
+class WireServer:
+    """
+    Frames in, dispatch(path, body) -> result, frames out: the asyncio
+    counterpart of aio.AsyncServer. `threaded(path)` picks requests to
+    run in a worker thread (those that may wait on the offload pool).
+    """
+
+    def __init__(self, dispatch, observe=None, threaded=None, idle_timeout=300.0):
+        self.dispatch = dispatch
+        self.observe = observe
+        self.threaded = threaded
+        self.idle_timeout = idle_timeout
+        self._servers = []
+        self._writers = {}   # writer -> its connection's task
+
+    async def start(self, host='127.0.0.1', port=0, unix=None):
+        if unix is not None:
+            server = await asyncio.start_unix_server(self._client, unix)
+        else:
+            server = await asyncio.start_server(self._client, host, port, backlog=1024)
+        self._servers.append(server)
+        return server
+
+    @property
+    def sockets(self):
+        return [sock for server in self._servers for sock in server.sockets]
+
+    async def _client(self, reader, writer):
+        peer = writer.get_extra_info('peername')
+        client = peer[0] if isinstance(peer, tuple) else 'unix'
+        self._writers[writer] = asyncio.current_task()
+        buffer = bytearray()
+        try:
+            while True:
+                chunk = await asyncio.wait_for(reader.read(1 << 16), self.idle_timeout)
+                if not chunk:
+                    break
+                buffer += chunk
+                out = []
+                while len(buffer) >= 4:
+                    length = int.from_bytes(buffer[:4], 'big')
+                    if length < 5 or length > limits.LIMITS.max_body:
+                        if length >= 5 and len(buffer) < 8:
+                            break  # the 413 echoes the request's id: wait for all of it
+                        # Can't skip it: answer what came before, refuse it and hang up
+                        if length < 5:
+                            out.append(_error(0, 400, "Bad frame length"))
+                        else:
+                            limits.LIMITS.count('body')
+                            out.append(_error(int.from_bytes(buffer[4:8], 'big'), 413,
+                                              f"Request too large (max {limits.LIMITS.max_body} bytes)"))
+                        writer.write(b''.join(out))
+                        await writer.drain()
+                        return
+                    if len(buffer) < 4 + length:
+                        break
+                    ident, op = struct.unpack_from('>IB', buffer, 4)
+                    payload = bytes(buffer[9:4 + length])
+                    del buffer[:4 + length]
+                    out.append(await self._request(client, ident, op, payload))
+                if out:
+                    writer.write(b''.join(out))  # one write per read: pipelined answers go out together
+                    await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            self._writers.pop(writer, None)
+            writer.close()
+
+    async def _request(self, client, ident, op, payload):
+        timer = metrics.Timer()
+        path, fixed = '', None
+        try:
+            if op == OP_ROUTE:
+                size = _U16.unpack_from(payload)[0]
+                path = payload[2:2 + size].decode()
+                raw = payload[2 + size:]
+                limits.LIMITS.admit(client, path, len(raw))
+                body = codec.loads(raw) if raw else {}
+            elif op in FIXED:
+                path, fields, fixed = FIXED[op]
+                limits.LIMITS.admit(client, path, len(payload))
+                body = unpack_fixed(fields, payload)
+            else:
+                raise ValueError(f"Unknown op {op}")
+            timer.lap('parse')
+            if self.threaded is not None and op == OP_ROUTE and self.threaded(path):
+                result = await asyncio.to_thread(self.dispatch, path, body)
+            else:
+                result = self.dispatch(path, body)
+            timer.lap('calc')
+            packed = _pack_result(fixed, result) if fixed is not None else None
+            frame = _frame(ident, STRUCT, packed) if packed is not None else _frame(ident, JSON, codec.dumps(result))
+            timer.lap('serialize')
+            status, error = 200, None
+        except limits.Rejected as e:
+            status, error = e.status, str(e)
+        except LookupError:
+            status, error = 404, "Endpoint not found"
+        except offload.Busy as e:
+            status, error = 503, str(e)
+        except Exception as e:
+            status, error = 400, str(e)
+        if status != 200:
+            timer.fail()
+            frame = _error(ident, status, error)
+            if status == 404:
+                error = None  # as over HTTP: not logged as an error
+        if self.observe is not None:
+            self.observe('WIRE', path, status, timer, error)
+        return frame
+
+    async def close(self):
+        for server in self._servers:
+            server.close()
+        tasks = list(self._writers.values())
+        for writer in list(self._writers):
+            writer.close()  # the connection sees EOF and ends
+        if tasks:
+            await asyncio.wait(tasks, timeout=5)
+        for server in self._servers:
+            await server.wait_closed()
+
+
+class Background:
+    """A WireServer on its own event loop thread, next to an HTTP front end."""
+
+    def __init__(self, dispatch, host='127.0.0.1', port=None, unix=None, observe=None, threaded=None):
+        self.server = WireServer(dispatch, observe, threaded)
+        self._loop = asyncio.new_event_loop()
+        started = threading.Event()
+        failure = []
+
+        async def start():
+            try:
+                if port is not None:
+                    await self.server.start(host, port)
+                if unix is not None:
+                    await self.server.start(unix=unix)
+            except OSError as e:
+                failure.append(e)
+            started.set()
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            self._loop.create_task(start())
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name='wire', daemon=True)
+        self._thread.start()
+        started.wait()
+        if failure:
+            self.stop()
+            raise failure[0]
+
+    @property
+    def addresses(self):
+        return [sock.getsockname() for sock in self.server.sockets]
+
+    def stop(self):
+        async def close():
+            await self.server.close()
+            self._loop.stop()
+
+        self._loop.call_soon_threadsafe(lambda: self._loop.create_task(close()))
+        self._thread.join(5)
+
+
+# ============ Client ============
+class Client:
+    """
+    Blocking client on one persistent connection:
+
+        with Client(port=9000) as c:             # or Client(unix='/run/tools.sock')
+            c.gst(1000, 18)                      # same dict as POST /api/gst
+            c.call('/api/emi/schedule', {...})   # any endpoint
+            c.pipeline([('/api/gst', {...}), ...])
+
+    Errors raise RemoteError; pipeline() returns them in place instead.
+    Not thread-safe: one client per thread.
+    """
+
+    def __init__(self, host='127.0.0.1', port=None, unix=None, timeout=30.0):
+        if unix is not None:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(unix)
+        else:
+            self.sock = socket.create_connection((host, port), timeout)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self.sock.makefile('rb')
+        self._next = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._file.close()
+        self.sock.close()
+
+    def gst(self, amount, rate):
+        return self.call('/api/gst', {'amount': amount, 'rate': rate})
+
+    def emi(self, principal, annual_rate, tenure_months):
+        return self.call('/api/emi', {'principal': principal, 'annual_rate': annual_rate,
+                                      'tenure_months': tenure_months})
+
+    def age(self, dob, as_of=None):
+        return self.call('/api/age', {'dob': dob} if as_of is None else {'dob': dob, 'as_of': as_of})
+
+    def call(self, path, body):
+        result = self.pipeline([(path, body)])[0]
+        if isinstance(result, RemoteError):
+            raise result
+        return result
+
+    def pipeline(self, requests, window=256):
+        """
+        Results of [(path, body), ...], sent `window` at a time without
+        waiting for answers; failed requests give RemoteError instances.
+        """
+        requests = list(requests)
+        results = []
+        for start in range(0, len(requests), window):
+            chunk = requests[start:start + window]
+            first = self._next
+            self._next = (first + len(chunk)) & 0xFFFFFFFF
+            self.sock.sendall(b''.join(encode_request((first + i) & 0xFFFFFFFF, path, body)
+                                       for i, (path, body) in enumerate(chunk)))
+            for i, (path, _) in enumerate(chunk):
+                results.append(self._response((first + i) & 0xFFFFFFFF, path))
+        return results
+
+    def _read(self, size):
+        data = self._file.read(size)
+        if len(data) < size:
+            raise ConnectionError("connection closed by the server")
+        return data
+
+    def _response(self, expected, path):
+        length, ident, status = _HEAD.unpack(self._read(_HEAD.size))
+        payload = self._read(length - 5)
+        if status == ERROR:
+            error = RemoteError(_U16.unpack_from(payload)[0], payload[2:].decode())
+            if ident != expected:
+                raise error  # refused before its id was read (e.g. too large): the connection is gone
+            return error
+        if ident != expected:
+            raise ConnectionError(f"response {ident} out of order (expected {expected})")
+        if status == STRUCT:
+            return _unpack_result(FIXED[OPS[path]][2], payload)
+        return codec.loads(payload)
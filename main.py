@@ -1,6 +1,86 @@
-def main():
-    print("Hello from india-tools!")
+"""
+india-tools command line.
+
+    python main.py bulk INPUT.csv OUTPUT.csv [--tool age|cgpa|gst|emi] [--format csv|ndjson]
+                   [--chunk-mb 8] [--workers N] [--column FIELD=COLUMN] [--keep COLUMN] [--quiet]
+    python main.py snapshot [OUTPUT]
+
+bulk runs a calculator over every row of a CSV file (see india_tools.bulk),
+on N processes with --workers, printing throughput per chunk to stderr.
+OUTPUT may be '-' for stdout; Ctrl-C stops after the chunk being written.
+
+snapshot precomputes the static tables loaded at cold start (see
+india_tools.snapshot); rerun it and commit the file when
+india_tools/data changes.
+"""
+
+import argparse
+import os
+import sys
+
+from india_tools import bulk, core, snapshot
+
+
+def _column(spec):
+    field, sep, column = spec.partition('=')
+    if not sep or not field or not column:
+        raise argparse.ArgumentTypeError("expected FIELD=COLUMN")
+    return field, column
+
+
+def _bulk(args):
+    def progress(stats):
+        print(f"  chunk {stats['chunk']:>5}: {stats['rows']:>9,} rows  {stats['errors']:>7,} errors  "
+              f"{stats['seconds']:7.3f}s  {stats['rows_per_s']:>12,.0f} rows/s", file=sys.stderr)
+
+    try:
+        total = bulk.run(args.input, args.output, tool=args.tool, fmt=args.format,
+                         chunk_bytes=int(args.chunk_mb * (1 << 20)), columns=dict(args.column),
+                         keep=args.keep, progress=None if args.quiet else progress,
+                         workers=args.workers or os.cpu_count() or 1)
+    except KeyboardInterrupt:
+        print("⛔ Cancelled: the output holds the chunks written so far", file=sys.stderr)
+        return 130
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    print(f"✅ {total['tool']}: {total['rows']:,} rows ({total['errors']:,} errors) in {total['seconds']:.2f}s, "
+          f"{total['rows_per_s']:,.0f} rows/s", file=sys.stderr)
+    return 0
+
+
+def _snapshot(args):
+    try:
+        size = snapshot.write(args.output)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    print(f"✅ Snapshot: {args.output} ({size:,} bytes)", file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('bulk', help='run a calculator over a CSV file')
+    run.add_argument('input', help='CSV file with a header row')
+    run.add_argument('output', help="output file, '-' for stdout")
+    run.add_argument('--tool', choices=sorted(core.TOOLS), help='calculator (default: from the header)')
+    run.add_argument('--format', choices=bulk.FORMATS, default='csv', help='output format')
+    run.add_argument('--chunk-mb', type=float, default=bulk.CHUNK_BYTES / (1 << 20),
+                     help='input read per chunk, MiB')
+    run.add_argument('--workers', type=int, default=1, help='processes to shard the file over (0: one per CPU)')
+    run.add_argument('--column', type=_column, action='append', default=[],
+                     help='FIELD=COLUMN: read input FIELD from another column (repeatable)')
+    run.add_argument('--keep', action='append', default=[], help='copy this input column to the output (repeatable)')
+    run.add_argument('--quiet', action='store_true', help='no per-chunk progress')
+    run.set_defaults(command=_bulk)
+    save = commands.add_parser('snapshot', help='precompute the static tables loaded at cold start')
+    save.add_argument('output', nargs='?', default=snapshot.PATH, help='snapshot file')
+    save.set_defaults(command=_snapshot)
+    args = parser.parse_args(argv)
+    return args.command(args)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Per-day age table and /api/age/bulk"""
+
+import json
+import random
+from datetime import date, timedelta
+
+from api.index import calculate_age, route
+from india_tools import agetable
+
+AS_OF = '2024-03-31'
+ODD = [None, '', 7, '2000-02-30', '20000115', '2000-01-15T10:00', '2024-04-01', '٢٠٠٠-٠١-١٥', '1700-06-15']
+
+
+def _dates(n, seed=3):
+    rng = random.Random(seed)
+    lo, hi = date(1900, 1, 1).toordinal(), date(2024, 3, 31).toordinal()
+    return [date.fromordinal(rng.randint(lo, hi)).isoformat() for _ in range(n)]
+
+
+def _both_backends(fn):
+    """Run fn with NumPy (if installed) and on the pure-Python path."""
+    saved = agetable.np, agetable._numpy_checked
+    try:
+        fn()
+        agetable.np, agetable._numpy_checked = None, True
+        fn()
+    finally:
+        agetable.np, agetable._numpy_checked = saved
+
+
+def _single(dob):
+    try:
+        return calculate_age(dob, AS_OF)
+    except Exception as e:
+        return str(e)
+
+
+def test_bulk_matches_single_endpoint():
+    dobs = _dates(500) + ODD
+
+    def check():
+        result = route('/api/age/bulk', {'dobs': dobs, 'as_of': AS_OF})
+        assert result['as_of'] == AS_OF and result['count'] == len(dobs)
+        errors = {e['index']: e['error'] for e in result['errors']}
+        for i, dob in enumerate(dobs):
+            expected = route('/api/age', {'dob': dob, 'as_of': AS_OF}) if i not in errors else None
+            got = {k: result[k][i] for k in ('years', 'months', 'days', 'total_days')}
+            if expected is None:
+                assert set(got.values()) == {None}
+                assert errors[i] == _single(dob) if dob else errors[i] == "dob field required"
+            else:
+                assert got == expected, dob
+        assert errors[len(dobs) - 3] == "Date of birth cannot be in the future"
+    _both_backends(check)
+
+
+def test_reference_date_and_leap_days():
+    assert calculate_age('2000-02-29', '2024-02-28') == {'years': 23, 'months': 11, 'days': 30, 'total_days': 8765}
+    assert calculate_age('2000-02-29', '2024-02-29')['years'] == 24
+    assert calculate_age('2000-01-15', '2000-03-01') == {'years': 0, 'months': 1, 'days': 15, 'total_days': 46}
+    today = date.today()
+    assert calculate_age((today - timedelta(days=1)).isoformat())['total_days'] == 1
+    for bad in ('31/03/2024', 20240331):
+        try:
+            calculate_age('2000-01-01', bad)
+        except ValueError as e:
+            assert 'as_of must be a date string' in str(e)
+        else:
+            raise AssertionError(bad)
+
+
+def test_bulk_streams_rows():
+    dobs = _dates(10) + ['nope']
+    rows = list(route('/api/age/bulk', {'dobs': dobs, 'as_of': AS_OF}, stream=True).rows)
+    assert [r['dob'] for r in rows] == dobs
+    assert rows[0]['years'] == calculate_age(dobs[0], AS_OF)['years']
+    assert rows[-1]['years'] is None and 'Invalid isoformat' in rows[-1]['error']
+    json.dumps(rows)
+
+
+if __name__ == '__main__':
+    test_bulk_matches_single_endpoint()
+    test_reference_date_and_leap_days()
+    test_bulk_streams_rows()
+    print("✅ age table tests passed")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""asyncio server and ASGI app: same answers as APIHandler"""
+
+import asyncio
+import json
+
+from api.index import route
+from india_tools.aio import ASGIApp, AsyncServer
+
+
+async def _request(reader, writer, path, data, extra=''):
+    body = json.dumps(data).encode()
+    writer.write(f'POST {path} HTTP/1.1\r\nHost: x\r\nContent-Length: {len(body)}\r\n{extra}\r\n'.encode() + body)
+    await writer.drain()
+    head = (await reader.readuntil(b'\r\n\r\n')).decode()
+    status = int(head.split(' ')[1])
+    length = int(head.lower().split('content-length: ')[1].split('\r\n')[0])
+    return status, json.loads(await reader.readexactly(length)), head
+
+
+def test_keepalive_many_connections():
+    async def main():
+        server = AsyncServer(route, idle_timeout=5)
+        await server.start('127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+
+        conns = [await asyncio.open_connection('127.0.0.1', port) for _ in range(200)]
+        for reader, writer in conns[:3]:
+            status, body, head = await _request(reader, writer, '/api/gst', {'amount': 1000, 'rate': 18})
+            assert status == 200 and body['total'] == 1180.0
+            assert 'Connection: keep-alive' in head
+            status, body, _ = await _request(reader, writer, '/api/cgpa', {'cgpa': 8.5})
+            assert status == 200 and body['percentage'] == 80.75
+
+        reader, writer = conns[0]
+        status, body, _ = await _request(reader, writer, '/api/emi', {'principal': 1})
+        assert status == 400 and 'required' in body['error']
+        status, body, head = await _request(reader, writer, '/api/nope', {}, 'Connection: close\r\n')
+        assert status == 404 and 'Connection: close' in head
+
+        assert await server.drain(1)
+        for _, writer in conns:
+            writer.close()
+
+    asyncio.run(main())
+
+
+def test_asgi_app():
+    async def call(method, path, body=b''):
+        sent = []
+        messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        await ASGIApp(route)({'type': 'http', 'method': method, 'path': path}, receive, send)
+        return sent[0]['status'], sent[1]['body']
+
+    async def main():
+        status, body = await call('POST', '/api/gst', b'{"amount": 500, "rate": 5}')
+        assert status == 200 and json.loads(body) == {'original': 500, 'gst_amount': 25.0, 'gst_rate': 5, 'total': 525.0}
+        assert (await call('OPTIONS', '/api/gst'))[0] == 200
+        assert (await call('POST', '/api/gst', b'not json'))[0] == 400
+
+    asyncio.run(main())
+
+
+if __name__ == '__main__':
+    test_keepalive_many_connections()
+    test_asgi_app()
+    print("✅ asyncio / ASGI tests passed")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""EMI engine and /api/emi/schedule"""
+
+import math
+
+from api.index import calculate_emi, route
+from india_tools import amortization
+
+LOANS = [(1000000, 7, 240), (250000, 10.5, 360), (1200, 0, 12), (50000, 36, 6),
+         (1000, 5e-324, 10)]  # a rate too small to change (1 + r) ** n: as 0%
+
+
+def _both_backends(fn):
+    """Run fn once with NumPy (if installed) and once on the pure-Python fallback."""
+    saved = amortization.np
+    try:
+        fn()
+        amortization.np = None
+        fn()
+    finally:
+        amortization.np = saved
+
+
+def test_vectorized_emi_matches_calculator():
+    def check():
+        principals, rates, tenures = zip(*LOANS)
+        emis = amortization.emi(list(principals), list(rates), list(tenures))
+        for loan, value in zip(LOANS, list(emis)):
+            assert round(value, 2) == calculate_emi(*loan)['emi']
+        assert round(amortization.emi(*LOANS[0]), 2) == calculate_emi(*LOANS[0])['emi']
+    _both_backends(check)
+    items = [dict(zip(('principal', 'annual_rate', 'tenure_months'), loan)) for loan in LOANS]
+    assert route('/api/emi/batch', items) == [calculate_emi(*loan) for loan in LOANS]
+    assert calculate_emi(*LOANS[-1])['emi'] == 100.0
+
+
+def test_schedule_amortizes_to_zero():
+    def check():
+        for principal, rate, months in LOANS:
+            cols = amortization.schedule(principal, rate, months)
+            assert list(cols['month']) == list(range(1, months + 1))
+            assert math.isclose(sum(cols['principal']), principal, rel_tol=1e-9)
+            assert abs(cols['closing_balance'][-1]) < 1e-6
+            assert list(cols['opening_balance'][1:]) == list(cols['closing_balance'][:-1])
+    _both_backends(check)
+
+
+def test_schedule_pages_stitch_together():
+    body = {'principal': 1000000, 'annual_rate': 8.5, 'tenure_months': 360, 'page_size': 100}
+    full = route('/api/emi/schedule', dict(body, page_size=360))
+    pages = [route('/api/emi/schedule', dict(body, page=p)) for p in range(1, 5)]
+    assert pages[0]['pages'] == 4 and pages[0]['emi'] == calculate_emi(1000000, 8.5, 360)['emi']
+    for column in amortization.COLUMNS:
+        assert sum((p['schedule'][column] for p in pages), []) == full['schedule'][column]
+    assert full['schedule']['closing_balance'][-1] == 0.0
+    assert route('/api/emi/schedule', dict(body, page=9))['schedule']['month'] == []
+
+
+def test_schedule_validation():
+    for body, message in [({'principal': 1000}, 'required'),
+                          ({'principal': 1000, 'annual_rate': 7, 'tenure_months': 12, 'page': 0}, 'page'),
+                          ({'principal': 1000, 'annual_rate': 7, 'tenure_months': 12, 'page_size': 10 ** 6}, 'page_size'),
+                          ({'principal': 1000, 'annual_rate': 7, 'tenure_months': 12, 'page': True}, 'page'),
+                          ({'principal': 1000, 'annual_rate': 7, 'tenure_months': 12, 'page_size': True}, 'page_size'),
+                          ({'principal': -1, 'annual_rate': 7, 'tenure_months': 12}, 'Principal')]:
+        try:
+            route('/api/emi/schedule', body)
+        except ValueError as e:
+            assert message in str(e)
+        else:
+            raise AssertionError(body)
+
+
+if __name__ == '__main__':
+    test_vectorized_emi_matches_calculator()
+    test_schedule_amortizes_to_zero()
+    test_schedule_pages_stitch_together()
+    test_schedule_validation()
+    print("✅ amortization tests passed")
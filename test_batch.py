@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Batch endpoints must match the single-item endpoints item for item"""
+
+import contextlib
+import io
+
+from api.index import route
+
+CASES = {
+    'age': [{'dob': '2000-01-15'}, {'dob': '1990-12-31T08:00'}, {'dob': '2999-01-01'},
+            {'dob': 'garbage'}, {'dob': ''}, {}, {'dob': 12}],
+    'cgpa': [{'cgpa': 8.5}, {'cgpa': 8.5, 'university': 'VTU'}, {'cgpa': 10, 'university': 'Anna'},
+             {'cgpa': 11}, {'cgpa': '8'}, {'cgpa': True}, {'university': 'PTU'}],
+    'gst': [{'amount': 1000, 'rate': 18}, {'amount': 99.99, 'rate': 5}, {'amount': 0, 'rate': 28},
+            {'amount': 10, 'rate': 18.0}, {'amount': -1, 'rate': 5}, {'amount': 5, 'rate': 101},
+            {'amount': '5', 'rate': 5}, {'amount': 5}, {'amount': 5, 'rate': [1]}, {'amount': 5, 'rate': 0},
+            {'amount': 5, 'rate': -0.0}],
+    'emi': [{'principal': 1000000, 'annual_rate': 7, 'tenure_months': 240},
+            {'principal': 500000, 'annual_rate': 7.0, 'tenure_months': 240},
+            {'principal': 1200, 'annual_rate': 0, 'tenure_months': 12},
+            {'principal': 1, 'annual_rate': 1e6, 'tenure_months': 10 ** 6},
+            {'principal': 0, 'annual_rate': 7, 'tenure_months': 12},
+            {'principal': 1000, 'annual_rate': 7, 'tenure_months': 12.5},
+            {'principal': 1000, 'annual_rate': 7}],
+}
+
+
+def _single(path, item):
+    try:
+        return route(path, item)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def test_per_tool_batch_matches_single():
+    with contextlib.redirect_stdout(io.StringIO()):
+        for tool, items in CASES.items():
+            items = items + [42]
+            expected = [_single(f'/api/{tool}', item) for item in items[:-1]]
+            expected.append({"error": "Each item must be a JSON object"})
+            assert route(f'/api/{tool}/batch', items) == expected, tool
+    # -0.0 == 0, but neither may take the other's sign in a batch
+    for items in (CASES['gst'][-2:], CASES['gst'][:-3:-1]):
+        assert [str(r['gst_amount']) for r in route('/api/gst/batch', items)] == [
+            str(route('/api/gst', item)['gst_amount']) for item in items]
+
+
+def test_mixed_batch_keeps_order():
+    items = [{'tool': 'gst', 'input': {'amount': 100, 'rate': 12}},
+             {'tool': 'emi', 'input': {'principal': 1200, 'annual_rate': 0, 'tenure_months': 12}},
+             {'tool': 'tax', 'input': {}},
+             {'tool': 'gst', 'input': {'amount': -5, 'rate': 12}},
+             'nope']
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = route('/api/batch', items)
+    assert results[0]['total'] == 112.0
+    assert results[1]['emi'] == 100.0
+    assert results[2] == {"error": "Unknown tool: tax"}
+    assert 'non-negative' in results[3]['error']
+    assert results[4] == {"error": "Each item must be a JSON object"}
+
+
+def test_batch_body_must_be_array():
+    try:
+        route('/api/gst/batch', {'amount': 1, 'rate': 5})
+    except ValueError as e:
+        assert 'JSON array' in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+
+if __name__ == '__main__':
+    test_per_tool_batch_matches_single()
+    test_mixed_batch_keeps_order()
+    test_batch_body_must_be_array()
+    print("✅ batch tests passed")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Benchmark harness: percentiles, result files and a short load run"""
+
+import json
+import os
+import tempfile
+
+from benchmarks import bulk, differential, load, report, startup, wire
+
+
+def test_percentiles_nearest_rank():
+    samples = [i / 1000 for i in range(1, 101)]  # 1..100 ms
+    assert report.percentiles(samples) == {"p50": 51.0, "p95": 96.0, "p99": 100.0}
+    assert report.percentiles([]) == {"p50": None, "p95": None, "p99": None}
+
+
+def test_write_records_run_metadata():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'run.json')
+        report.write(path, 'load', {'/api/gst': {'rps': 10.0}})
+        with open(path) as f:
+            data = json.load(f)
+    assert data['kind'] == 'load'
+    assert data['results'] == {'/api/gst': {'rps': 10.0}}
+    assert {'commit', 'python', 'cpus'} <= set(data['meta'])
+
+
+def test_short_load_run_in_process():
+    with load.inprocess_server(threads=2) as (host, port):
+        results = load.run(host, port, concurrency=2, duration=0.2, warmup=0)
+    assert set(results) == set(load.ENDPOINTS)
+    for r in results.values():
+        assert r['requests'] > 0 and r['errors'] == 0
+        assert r['p50'] <= r['p95'] <= r['p99']
+
+
+def test_short_wire_run_in_process():
+    endpoints = {'/api/gst': load.ENDPOINTS['/api/gst']}
+    with wire.inprocess_servers(threads=2) as (host, port, wire_port):
+        results = wire.run(host, port, wire_port, endpoints, duration=0.1, window=10, warmup=0)
+    assert set(results) == {f'{way} /api/gst' for way in wire.WAYS}
+    assert all(r['requests'] > 0 for r in results.values())
+
+
+def test_bulk_scaling_checks_outputs():
+    results = bulk.run(tools=('gst',), rows=2000, workers=(1, 2), chunk_bytes=8192)
+    assert set(results) == {'gst x1', 'gst x2'}
+    assert results['gst x1']['speedup'] == 1.0 and results['gst x2']['rows'] == 2000
+
+
+def test_startup_profile_and_first_request():
+    r = startup.measure('api.gst', runs=1)
+    assert r['first_request_ms'] > 0 and 'india_tools.core.gst' in r['india_tools_modules']
+    imports = startup.profile('api.gst', runs=1, top=5)
+    assert len(imports) == 5 and imports[0][0] == 'api.gst'
+    assert all(cumulative >= own >= 0 for _, cumulative, own in imports)
+
+
+def test_differential_corpus_agrees():
+    r = differential.check(cases=0)
+    assert r['cases'] == sum(map(len, differential.CORPUS.values())) and r['counts'] == {} and r['crashes'] == [], \
+        r['divergences'][:1] or r['crashes']
+
+
+def test_differential_paths_agree():
+    r = differential.run(cases=600, seed=11)
+    corpus = sum(map(len, differential.CORPUS.values()))
+    assert r['cases'] == 2400 + corpus and r['counts'] == {} and r['crashes'] == [], \
+        r['divergences'][:1] or r['crashes']
+    assert r['throughput']['gst batch']['cases'] == 600 + len(differential.CORPUS['gst']) and r['throughput']['age function']['cases'] > 0
+
+
+def test_differential_finds_and_shrinks():
+    def rounds_late(tool, items):  # a path rounding GST after adding it up
+        out = differential._batch(tool, items)
+        for item, result in zip(items, out):
+            if 'total' in result:
+                result['total'] = round(item['amount'] + item['amount'] * item['rate'] / 100, 1)
+        return out
+
+    r = differential.check(tools=('gst',), cases=300, seed=3, implementations={'late': (rounds_late, False)})
+    assert r['counts']['gst late'] > 0 and len(r['divergences']) == differential.SHOWN
+    first = r['divergences'][0]
+    assert first['shrunk'].keys() <= first['body'].keys() and first['got']['total'] != first['expected']['total']
+    assert differential._same(0.1 + 0.2, 0.30000000000000004) and not differential._same(0.0, -0.0)
+    assert not differential._same(1, 1.0) and differential._same(float('nan'), float('nan'))
+
+
+if __name__ == '__main__':
+    test_percentiles_nearest_rank()
+    test_write_records_run_metadata()
+    test_short_load_run_in_process()
+    test_short_wire_run_in_process()
+    test_bulk_scaling_checks_outputs()
+    test_startup_profile_and_first_request()
+    test_differential_corpus_agrees()
+    test_differential_paths_agree()
+    test_differential_finds_and_shrinks()
+    print("✅ benchmark harness tests passed")
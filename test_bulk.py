@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Bulk CSV runner: typed columns, chunking, same results as the API"""
+
+import csv
+import io
+import json
+import os
+import tempfile
+import threading
+from contextlib import redirect_stderr
+
+import main
+from api.index import route
+from india_tools import bulk
+
+
+def _write(text):
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    with os.fdopen(fd, 'w') as f:
+        f.write(text)
+    return path
+
+
+def _expected(path, item):
+    try:
+        return route(path, item)
+    except ValueError as e:
+        return {'error': str(e)}
+
+
+GST = 'id,amount,rate\n' + ''.join(f'{i},{i * 37.5 if i % 3 else i * 1000},{(0, 5, 12, 18, 28)[i % 5]}\n'
+                                   for i in range(500))
+GST += 'a,-1,18\nb,abc,5\nc,,18\nd,100,\n"e,1",1e3,18\nf,100\n\n'
+
+
+def test_typed_columns():
+    assert bulk._column(['1', '-2', '0'], 'number', None) == [1, -2, 0]
+    assert bulk._column(['1', '2.5', '1e3'], 'number', None) == [1, 2.5, 1000.0]
+    column = bulk._column(['1', '', '007', 'nan', ' 5', 'x'], 'any', 'dflt')
+    assert column == [1, 'dflt', '007', 'nan', ' 5', 'x'] and type(column[0]) is int
+    assert bulk._column(['2000-01-15', '', '123'], 'string', None) == ['2000-01-15', None, '123']
+    assert bulk.parse(b'a,b\n\n"x,1",2\r\n') == [['a', 'b'], ['x,1', '2']]
+    # Only \n ends a line, as in the chunk boundaries: not \x1c-\x1e, \x85 or \u2028
+    odd = 'id\x1c1,\x85,a\u2028b\r\n2,x\x1e,y\n'
+    assert bulk.parse(odd.encode()) == [['id\x1c1', '\x85', 'a\u2028b'], ['2', 'x\x1e', 'y']]
+
+
+def test_gst_in_chunks_matches_api():
+    src = _write(GST)
+    out = src + '.out'
+    chunks = []
+    try:
+        total = bulk.run(src, out, keep=['id'], chunk_bytes=1024, progress=chunks.append)
+        with open(out) as f:
+            got = list(csv.DictReader(f))
+    finally:
+        os.unlink(src)
+        os.unlink(out)
+    assert total['tool'] == 'gst' and total['rows'] == 506 and total['chunks'] == len(chunks) > 5
+    assert total['errors'] == sum(c['errors'] for c in chunks) == 5
+    assert sum(c['rows'] for c in chunks) == 506
+
+    items = list(csv.reader(io.StringIO(GST)))[1:]
+    for cells, row in zip([c for c in items if c], got):
+        item = {name: bulk._cell(value) for name, value in zip(('amount', 'rate'), cells[1:]) if value}
+        expected = _expected('/api/gst', item)
+        assert row['id'] == cells[0]
+        assert row['error'] == expected.get('error', ''), (cells, row)
+        for field in ('original', 'gst_amount', 'gst_rate', 'total'):
+            assert row[field] == str(expected.get(field, '')), (cells, row, expected)
+
+
+def test_emi_and_age_ndjson():
+    src = _write('loan,p,annual_rate,tenure_months\n1,1000000,7,240\n2,5e5,0,12\n3,100,7,1.5\n')
+    out = src + '.out'
+    try:
+        bulk.run(src, out, fmt='ndjson', columns={'principal': 'p'}, keep=['loan'])
+        with open(out) as f:
+            rows = [json.loads(line) for line in f]
+    finally:
+        os.unlink(src)
+        os.unlink(out)
+    assert rows[0] == {'loan': '1', **route('/api/emi', {'principal': 1000000, 'annual_rate': 7, 'tenure_months': 240})}
+    assert rows[1]['emi'] == 41666.67
+    assert rows[2] == {'loan': '3', **_expected('/api/emi', {'principal': 100, 'annual_rate': 7, 'tenure_months': 1.5})}
+
+    dobs = ['2000-01-15', '2000-02-30', 'x', '', '1990-06-30'] * 30
+    src = _write('dob,as_of\n' + ''.join(f'{d},2024-06-30\n' for d in dobs))
+    try:
+        with redirect_stderr(io.StringIO()):
+            assert main.main(['bulk', src, out, '--quiet']) == 0
+        with open(out) as f:
+            got = list(csv.DictReader(f))
+    finally:
+        os.unlink(src)
+        os.unlink(out)
+    for dob, row in zip(dobs, got):
+        expected = _expected('/api/age', {'dob': dob, 'as_of': '2024-06-30'} if dob else {'as_of': '2024-06-30'})
+        assert row['error'] == expected.get('error', '') and row['years'] == str(expected.get('years', '')), (dob, row)
+
+
+def test_age_batch_shared_reference_date():
+    items = [{'dob': d, 'as_of': '2024-06-30'} for d in ['2000-01-15', '2000-02-30', 'x', '1990-06-30', 5] * 20]
+    for item, result in zip(items, route('/api/age/batch', items)):
+        assert result == _expected('/api/age', item), (item, result)
+
+
+def _shared_blocks():
+    return {name for name in os.listdir('/dev/shm') if name.startswith('psm_')} if os.path.isdir('/dev/shm') else set()
+
+
+def test_sharded_matches_serial_and_cancels():
+    src = _write(GST * 20 + 'g\u2028h,100,5\ni\x1cj,200,\x85\n')
+    serial, sharded = src + '.serial', src + '.sharded'
+    before = _shared_blocks()
+    try:
+        expected = bulk.run(src, serial, keep=['id'], chunk_bytes=4096)
+        total = bulk.run(src, sharded, keep=['id'], chunk_bytes=4096, workers=2)
+        with open(serial, 'rb') as a, open(sharded, 'rb') as b:
+            assert a.read() == b.read()
+        with open(serial, newline='') as f:
+            ids = [row[0] for row in csv.reader(f)]
+        assert ids[-2:] == ['g\u2028h', 'i\x1cj'] and len(ids) == 1 + expected['rows']
+        assert (total['rows'], total['errors'], total['workers']) == (expected['rows'], expected['errors'], 2)
+
+        cancel = threading.Event()
+        seen = []
+
+        def progress(stats):
+            seen.append(stats['rows'])
+            cancel.set()
+
+        try:
+            bulk.run(src, sharded, chunk_bytes=4096, workers=2, progress=progress, cancel=cancel)
+        except bulk.Cancelled:
+            pass
+        else:
+            raise AssertionError("expected Cancelled")
+        with open(sharded) as f:
+            assert len(f.read().splitlines()) == 1 + seen[0]  # header + the one chunk written
+        assert _shared_blocks() == before  # every shard's block freed
+    finally:
+        for path in (src, serial, sharded):
+            os.unlink(path)
+
+
+def test_headers_and_tools():
+    assert bulk.detect(['dob']) == 'age' and bulk.detect(['amount', 'rate', 'id']) == 'gst'
+    assert bulk.detect(['principal', 'annual_rate', 'tenure_months', 'emi']) == 'emi'
+    for header, kwargs, message in [
+        (['foo'], {}, "no tool takes the columns foo"),
+        (['amount'], {'tool': 'gst'}, "gst needs the columns rate"),
+        (['dob'], {'keep': ['id']}, "no column named id to keep"),
+    ]:
+        try:
+            bulk.Plan(header, **kwargs)
+        except ValueError as e:
+            assert str(e).startswith(message), str(e)
+        else:
+            raise AssertionError(message)
+
+    empty = _write('')
+    try:
+        with redirect_stderr(io.StringIO()) as err:
+            assert main.main(['bulk', empty, '-']) == 1
+        assert 'is empty' in err.getvalue()
+    finally:
+        os.unlink(empty)
+
+
+if __name__ == '__main__':
+    test_typed_columns()
+    test_gst_in_chunks_matches_api()
+    test_emi_and_age_ndjson()
+    test_age_batch_shared_reference_date()
+    test_sharded_matches_serial_and_cancels()
+    test_headers_and_tools()
+    print("✅ bulk runner tests passed")
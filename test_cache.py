@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Result cache: LRU/TTL eviction, key canonicalization, counters"""
+
+import contextlib
+import io
+from datetime import date
+from unittest import mock
+
+from api import index
+from india_tools.cache import MISS, ResultCache, canonical_key
+
+
+def test_lru_and_ttl():
+    now = [0.0]
+    c = ResultCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    c.put('a', 1)
+    c.put('b', 2)
+    assert c.get('a') == 1  # 'b' is now least recently used
+    c.put('c', 3)
+    assert c.get('b') is MISS and c.evictions == 1
+    now[0] = 11
+    assert c.get('a') is MISS and c.expirations == 1
+    assert c.stats()['hits'] == 1 and c.stats()['misses'] == 2
+
+
+def test_canonical_key():
+    assert canonical_key('/api/gst', {'amount': 1, 'rate': 18}) == canonical_key('/api/gst', {'rate': 18, 'amount': 1})
+    assert canonical_key('/api/gst', {'amount': 1, 'rate': 18}) != canonical_key('/api/gst', {'amount': 1.0, 'rate': 18})
+    assert canonical_key('/api/gst', {'amount': True, 'rate': 18}) != canonical_key('/api/gst', {'amount': 1, 'rate': 18})
+    zeros = [canonical_key('/api/gst', {'amount': 1, 'rate': rate}) for rate in (0.0, -0.0, '0.0', '-0.0', 1.0, -1.0, 0)]
+    assert len(set(zeros)) == len(zeros)
+    assert canonical_key('/api/gst', {'amount': [1], 'rate': 18}) is None
+    assert canonical_key('/api/gst', [1, 2]) is None
+
+
+def test_cached_route_hits_and_date_rollover():
+    index.RESULT_CACHE.clear()
+    before = index.RESULT_CACHE.stats()
+    with contextlib.redirect_stdout(io.StringIO()):
+        first = index.cached_route('/api/gst', {'amount': 1000, 'rate': 18})
+        again = index.cached_route('/api/gst', {'rate': 18, 'amount': 1000})
+        assert again is first
+        assert index.cached_route('/api/gst', {'amount': 1000.0, 'rate': 18})['original'] == 1000.0
+
+        index.cached_route('/api/age', {'dob': '2000-02-29'})
+        tomorrow = date.fromordinal(date.today().toordinal() + 1)
+        with mock.patch('india_tools.cache.date') as fake:
+            fake.today.return_value = tomorrow
+            index.cached_route('/api/age', {'dob': '2000-02-29'})  # new day: recomputed
+    after = index.RESULT_CACHE.stats()
+    assert after['hits'] - before['hits'] == 1
+    assert after['misses'] - before['misses'] == 4
+
+
+def test_signed_zero_keys_apart():
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert str(index.cached_route('/api/gst', {'amount': 7, 'rate': 0.0})['gst_rate']) == '0.0'
+        assert str(index.cached_route('/api/gst', {'amount': 7, 'rate': -0.0})['gst_rate']) == '-0.0'
+        # a float zero's entry must not answer the string "0.0", which is a 400
+        try:
+            index.cached_route('/api/gst', {'amount': 7, 'rate': '0.0'})
+        except ValueError as e:
+            assert 'Rate must be between 0 and 100' in str(e)
+        else:
+            raise AssertionError("string rate served from the float's cache entry")
+
+
+if __name__ == '__main__':
+    test_lru_and_ttl()
+    test_canonical_key()
+    test_cached_route_hits_and_date_rollover()
+    test_signed_zero_keys_apart()
+    print("✅ cache tests passed")
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""CGPA conversion table: aliases, formulas, hot reload, transcripts"""
+
+import json
+import os
+import tempfile
+
+from api.index import calculate_cgpa, route
+from india_tools import cgpatable
+from india_tools.app import RESULT_CACHE, cached_route
+
+TABLE = {
+    'version': 'test.1',
+    'default': 'generic',
+    'universities': {
+        'generic': {'name': 'Generic', 'formula': {'type': 'linear', 'factor': 9.5}},
+        'PW': {'name': 'Piecewise Institute', 'aliases': ['PWI'],
+               'formula': {'type': 'piecewise', 'segments': [{'from': 0, 'factor': 10, 'offset': -5},
+                                                             {'from': 8, 'factor': 12, 'offset': -20}]}},
+        'US': {'name': 'Four Point College', 'formula': {'type': 'scale', 'maximum': 4}},
+    },
+}
+
+
+def _source(table, **kwargs):
+    fd, path = tempfile.mkstemp(suffix='.json')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(table, f)
+    return cgpatable.Source(path, **kwargs)
+
+
+def test_aliases_and_prefixes():
+    table = cgpatable.TABLES.current()
+    for name, key in [('vtu', 'VTU'), (' V.T.U ', 'VTU'), ('Visvesvaraya Technological University', 'VTU'),
+                      ('Visvesvaraya Tech. Univ.', 'VTU'), ('anna university', 'Anna'), ('ANNA', 'Anna'),
+                      ('University of Mumbai', 'Mumbai'), ('uptu', 'AKTU'), ('Gujarat', 'GTU'),
+                      ('University', None), ('Harvard', None), ('default', 'default'),
+                      ('Uttar Pradesh Tech. Univ.', 'AKTU'), ('Mumb', 'Mumbai'),
+                      # other institutions whose names only look short once "University" is dropped
+                      ('Gujarat University', None), ('Punjab University', None),
+                      ('Uttar Pradesh University', None), ('Gujarat Uni', None)]:
+        found = table.lookup(name)
+        assert (found.key if found else None) == key, (name, found and found.key)
+
+    # The table keeps the old per-university results
+    assert calculate_cgpa(8.5, 'VTU') == {'cgpa': 8.5, 'percentage': 85.0, 'university': 'VTU', 'matched': 'VTU'}
+    assert calculate_cgpa(8.5, 'vtu')['percentage'] == 85.0
+    assert calculate_cgpa(8.5, 'Somewhere') == {'cgpa': 8.5, 'percentage': 80.75, 'university': 'Somewhere',
+                                                'matched': None}
+    assert calculate_cgpa(8.5, 'GTU')['percentage'] == 80.0
+    for name in ('Gujarat University', 'Punjab University', 'Uttar Pradesh University'):
+        assert calculate_cgpa(8, name) == {'cgpa': 8, 'percentage': 76.0, 'university': name, 'matched': None}
+    for university in (None, 5, True, ['VTU']):
+        assert route('/api/cgpa', {'cgpa': 8, 'university': university}) == {
+            'cgpa': 8, 'percentage': 76.0, 'university': university, 'matched': None}
+    assert route('/api/cgpa/batch', [{'cgpa': 8, 'university': None}])[0]['percentage'] == 76.0
+
+
+def test_formulas_and_bad_tables():
+    source = _source(TABLE, interval=0)
+    os.unlink(source.path)
+    table = source.table
+    pw, us = table.universities['PW'].formula, table.universities['US'].formula
+    assert [round(pw.percentage(c), 6) for c in (0, 4, 7.99, 8, 10)] == [0.0, 35.0, 74.9, 76.0, 100.0]
+    assert us.maximum == 4 and us.percentage(3.2) == 80.0
+    assert table.resolve('pwi')[0] is table.universities['PW'] and table.resolve('x') == (table.default, False)
+
+    for broken, message in [
+        ({**TABLE, 'version': 1}, "version must be a string"),
+        ({**TABLE, 'default': 'nope'}, "default 'nope' is not one of the universities"),
+        ({**TABLE, 'universities': {'A': {'formula': {'type': 'cubic'}}}}, "universities.A.formula: type must be"),
+        ({**TABLE, 'universities': {'A': {'formula': {'type': 'piecewise', 'segments': [
+            {'from': 5, 'factor': 1}, {'from': 5, 'factor': 2}]}}}}, "segments[1]: segments must start at increasing"),
+        ({'version': '1', 'default': 'A', 'universities': {
+            'A': {'aliases': ['x'], 'formula': {'type': 'linear', 'factor': 10}},
+            'B': {'aliases': ['X'], 'formula': {'type': 'linear', 'factor': 9}}}}, "alias 'X' names both A and B"),
+    ]:
+        try:
+            cgpatable.parse(json.dumps(broken))
+        except ValueError as e:
+            assert message in str(e), (message, str(e))
+        else:
+            raise AssertionError(message)
+
+
+def test_hot_reload():
+    now = [0.0]
+    source = _source(TABLE, interval=5, clock=lambda: now[0])
+    try:
+        assert source.current().version == 'test.1'
+        with open(source.path, 'w') as f:
+            json.dump({**TABLE, 'version': 'test.2'}, f)
+        assert source.current().version == 'test.1'  # not checked before the interval is up
+        now[0] = 5
+        assert source.current().version == 'test.2' and source.reloads == 1
+
+        with open(source.path, 'w') as f:
+            f.write('{"version": "broken"')
+        now[0] = 10
+        assert source.current().version == 'test.2' and source.failures == 1  # the last good table stays
+    finally:
+        os.unlink(source.path)
+
+
+def test_version_in_cache_key():
+    saved = cgpatable.TABLES
+    cgpatable.TABLES = _source({**TABLE, 'universities': {**TABLE['universities'],
+                                                          'VTU': {'formula': {'type': 'linear', 'factor': 10}}}},
+                               interval=0)
+    try:
+        RESULT_CACHE.clear()
+        assert cached_route('/api/cgpa', {'cgpa': 8, 'university': 'VTU'})['percentage'] == 80.0
+        with open(cgpatable.TABLES.path, 'w') as f:
+            json.dump({**TABLE, 'universities': {**TABLE['universities'],
+                                                 'VTU': {'formula': {'type': 'linear', 'factor': 9}}}}, f)
+        assert cgpatable.TABLES.check()
+        assert cached_route('/api/cgpa', {'cgpa': 8, 'university': 'VTU'})['percentage'] == 72.0
+    finally:
+        os.unlink(cgpatable.TABLES.path)
+        cgpatable.TABLES = saved
+        RESULT_CACHE.clear()
+
+
+def test_batch_matches_single():
+    items = [{'cgpa': 8.5, 'university': u} for u in ('VTU', 'anna univ', 'Nowhere', 'default')]
+    items += [{'cgpa': 11}, {'cgpa': 7}]
+    out = route('/api/cgpa/batch', items)
+    for item, result in zip(items, out):
+        try:
+            expected = route('/api/cgpa', item)
+        except ValueError as e:
+            expected = {'error': str(e)}
+        assert result == expected, (item, result, expected)
+
+
+def test_transcripts():
+    body = {'university': 'VTU', 'transcripts': [
+        {'sgpa': [8.0, 9.0, 7.5], 'credits': [20, 25, 15]},
+        {'sgpa': [6.0, 7.0], 'university': 'GTU'},
+        {'cgpa': 9.25, 'university': 'Somewhere'},
+    ]}
+    result = route('/api/cgpa/transcript', body)
+    first, second, third = result['transcripts']
+    assert result['count'] == 3 and result['version'] == cgpatable.TABLES.current().version
+    assert first['computed_cgpa'] == round((8 * 20 + 9 * 25 + 7.5 * 15) / 60, 2) == first['cgpa']
+    assert first['credits'] == 60 and first['semester_percentages'] == [80.0, 90.0, 75.0]
+    assert first['percentage'] == calculate_cgpa(first['cgpa'], 'VTU')['percentage']
+    assert second['matched'] == 'GTU' and second['cgpa'] == 6.5 and second['percentage'] == 60.0
+    assert third == {'university': 'Somewhere', 'matched': None, 'semesters': 0, 'credits': None,
+                     'computed_cgpa': None, 'cgpa': 9.25, 'percentage': 87.88, 'semester_percentages': []}
+
+    rows = list(route('/api/cgpa/transcript', body, stream=True).rows)
+    assert [r['percentage'] for r in rows] == [t['percentage'] for t in result['transcripts']]
+
+    for bad, message in [
+        ({}, "transcripts field required"),
+        ({'transcripts': []}, "transcripts must be a non-empty JSON array"),
+        ({'transcripts': [{'sgpa': [8]}, {'sgpa': [11]}]}, "transcripts[1]: sgpa must be a list of numbers between 0 and 10"),
+        ({'transcripts': [{'sgpa': [8, 9], 'credits': [4]}]}, "transcripts[0]: credits must list one positive number per semester"),
+        ({'transcripts': [{}]}, "transcripts[0]: sgpa or cgpa required"),
+        ({'transcripts': [5]}, "transcripts[0]: must be an object"),
+    ]:
+        try:
+            route('/api/cgpa/transcript', bad)
+        except ValueError as e:
+            assert str(e) == message, (str(e), message)
+        else:
+            raise AssertionError(message)
+
+
+if __name__ == '__main__':
+    test_aliases_and_prefixes()
+    test_formulas_and_bad_tables()
+    test_hot_reload()
+    test_version_in_cache_key()
+    test_batch_matches_single()
+    test_transcripts()
+    print("✅ CGPA table tests passed")
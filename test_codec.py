@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""JSON codec backends and typed input structs"""
+
+import json
+import math
+
+from india_tools import aio, app, codec, core
+
+
+def _each_backend(test):
+    previous = codec.BACKEND
+    try:
+        for backend in codec.available():
+            codec.use(backend)
+            test(backend)
+    finally:
+        codec.use(previous)
+
+
+def test_backends_agree_on_payloads():
+    def check(backend):
+        body = {'principal': 1000000, 'annual_rate': 7.5, 'tenure_months': 240, 'note': 'ग्राहक'}
+        raw = codec.dumps(body)
+        assert isinstance(raw, bytes) and b': ' not in raw, backend
+        assert codec.loads(raw) == body == json.loads(raw)
+        assert codec.loads(raw.decode()) == body
+    _each_backend(check)
+
+
+def test_edges_fall_back_to_stdlib():
+    def check(backend):
+        assert math.isnan(codec.loads(b'{"amount": NaN}')['amount'])  # json.loads accepts NaN
+        assert json.loads(codec.dumps({'n': 10 ** 30})) == {'n': 10 ** 30}
+        try:
+            codec.loads(b'{"amount":')
+        except json.JSONDecodeError as e:
+            assert 'Expecting value' in str(e)
+        else:
+            raise AssertionError(backend)
+    _each_backend(check)
+
+
+def test_non_finite_results_are_400_on_every_backend():
+    def check(backend):
+        for value in ({'total': math.inf}, [1, -math.inf], {'x': {'y': math.nan}}, [None, (1.5, math.nan)]):
+            try:
+                codec.dumps(value)
+            except ValueError as e:
+                assert str(e) == codec.NON_FINITE, backend
+            else:
+                raise AssertionError(backend)
+        assert codec.dumps({'matched': None}) == b'{"matched":null}'
+        if backend != 'json':  # a null from None needs no second encoding
+            stdlib, codec._json_dumps = codec._json_dumps, None
+            try:
+                assert codec.dumps([{'error': 'x', 'row': None}, {'cgpa': 8.5, 'matched': None}]) \
+                    == b'[{"error":"x","row":null},{"cgpa":8.5,"matched":null}]'
+            finally:
+                codec._json_dumps = stdlib
+        error = {"error": codec.NON_FINITE}
+        status, _, payload = aio.handle(app.route, 'POST', '/api/gst', b'{"amount":1.7e308,"rate":100}')
+        assert (status, json.loads(payload)) == (400, error), backend
+        status, _, payload = app.handle_get('/api/gst', 'amount=1.7e308&rate=100')
+        assert (status, json.loads(payload)) == (400, error), backend
+    _each_backend(check)
+
+
+def test_typed_inputs():
+    gst, cgpa, emi, age = (core.get(name) for name in ('gst', 'cgpa', 'emi', 'age'))
+    inp = gst.GstInput.from_json(b'{"rate": 18, "amount": 1000}')
+    assert inp == (1000, 18) and inp.amount == 1000 and type(inp) is gst.GstInput
+    assert gst.compute(*inp)['total'] == 1180.0
+    assert cgpa.CgpaInput.from_body({'cgpa': 8.5}).university == 'default'
+    assert age.AgeInput.from_body({'dob': '2000-01-15'}).dob == '2000-01-15'
+    for raw, message in ((b'{"principal": 1}', "principal, annual_rate, tenure_months fields required"),
+                         (b'{"principal": 1, "annual_rate": 7, "tenure_months": 0}',
+                          "Tenure must be greater than 0 months")):
+        try:
+            emi.EmiInput.from_json(raw)
+        except ValueError as e:
+            assert str(e) == message
+        else:
+            raise AssertionError(raw)
+
+
+if __name__ == '__main__':
+    test_backends_agree_on_payloads()
+    test_edges_fall_back_to_stdlib()
+    test_non_finite_results_are_400_on_every_backend()
+    test_typed_inputs()
+    print("✅ codec tests passed")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Calculator core: lazy tool registry and thin Vercel entry points"""
+
+import json
+import os
+import subprocess
+import sys
+
+from india_tools import core
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _loaded_after_import(module):
+    code = f"import json, sys, {module}; print(json.dumps(sorted(m for m in sys.modules if m.startswith('india_tools'))))"
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(json.loads(out.stdout))
+
+
+def test_function_imports_only_its_tool():
+    for name in core.TOOLS:
+        loaded = _loaded_after_import(f'api.{name}')
+        tools = {m for m in loaded if m.startswith('india_tools.core.')}
+        assert tools == {f'india_tools.core.{name}'}, loaded
+        assert 'india_tools.amortization' not in loaded
+
+
+def test_index_loads_tools_lazily():
+    loaded = _loaded_after_import('api.index')
+    assert not any(m.startswith('india_tools.core.') for m in loaded)
+
+
+def test_function_handler_serves_only_its_paths():
+    from api import gst
+
+    class Probe(gst.handler):
+        def __init__(self):
+            pass
+
+    probe = Probe()
+    probe.check_path('/api/gst')
+    probe.check_path('/api/gst/batch?x=1')
+    for path in ('/api/emi', '/api/batch', '/nope'):
+        try:
+            probe.check_path(path)
+        except LookupError:
+            pass
+        else:
+            raise AssertionError(path)
+
+
+if __name__ == '__main__':
+    test_function_imports_only_its_tool()
+    test_index_loads_tools_lazily()
+    test_function_handler_serves_only_its_paths()
+    print("✅ core tests passed")
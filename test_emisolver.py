@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""EMI solve modes: tenure, rate and principal for a given EMI"""
+
+import math
+import random
+
+from api.index import calculate_emi, route
+from india_tools import amortization, emisolver
+from india_tools.core.emi import OUT_OF_RANGE
+
+LOANS = [(1000000, 7, 240), (250000, 10.5, 360), (1200, 0, 12), (50000, 36, 6), (80000, 0.01, 1)]
+
+
+def _both_backends(fn):
+    """Run fn once with NumPy (if installed) and once on the pure-Python fallback."""
+    saved = emisolver.np
+    try:
+        fn()
+        emisolver.np = None
+        fn()
+    finally:
+        emisolver.np = saved
+
+
+def test_inverses_recover_the_loan():
+    def check():
+        rng = random.Random(5)
+        loans = LOANS + [(rng.uniform(1e4, 1e7), rng.choice([0, rng.uniform(0.01, 60)]), rng.randint(1, 480))
+                         for _ in range(500)]
+        principals, rates, tenures = (list(column) for column in zip(*loans))
+        emis = [amortization.emi(*loan) for loan in loans]
+        solved = zip(emisolver.tenure(principals, rates, emis),
+                     emisolver.rate(principals, tenures, emis),
+                     emisolver.principal(rates, tenures, emis))
+        for (principal, rate, months), (n, r, p) in zip(loans, solved):
+            assert math.isclose(n, months, rel_tol=1e-6), (principal, rate, months, n)
+            assert abs(r - rate) < 1e-6, (principal, rate, months, r)
+            assert math.isclose(p, principal, rel_tol=1e-9)
+        assert math.isclose(emisolver.rate(*LOANS[0][::2], emis[0]), 7)  # scalars in, float out
+    _both_backends(check)
+
+
+def test_infeasible_is_nan():
+    def check():
+        # 1% a month on 1000 is 10: an EMI of 10 never repays; 80 x 12 < 1000
+        assert math.isnan(emisolver.tenure(1000, 12, 10))
+        assert math.isnan(emisolver.rate(1000, 12, 80))
+        assert list(map(math.isnan, emisolver.rate([1000, 1200], [12, 12], [80, 100]))) == [True, False]
+        assert emisolver.rate(1200, 12, 100) == 0
+    _both_backends(check)
+
+
+def test_solve_modes_on_api_emi():
+    emi = calculate_emi(1000000, 7, 240)['emi']
+    tenure = route('/api/emi', {'solve': 'tenure', 'principal': 1000000, 'annual_rate': 7, 'emi': emi})
+    assert tenure == dict(calculate_emi(1000000, 7, 240), solve='tenure')
+    # Rounds up to whole months, so the EMI shown is at most the one asked for
+    tenure = route('/api/emi', {'solve': 'tenure', 'principal': 1000000, 'annual_rate': 7, 'emi': 10000})
+    assert tenure['emi'] <= 10000 < calculate_emi(1000000, 7, tenure['tenure_months'] - 1)['emi']
+    assert route('/api/emi', {'solve': 'tenure', 'principal': 1000000, 'annual_rate': 7, 'emi': 10000,
+                              'tenure_months': 12}) == tenure  # ignored: it is the unknown
+
+    rate = route('/api/emi', {'solve': 'rate', 'principal': 1000000, 'tenure_months': 240, 'emi': emi})
+    assert rate['annual_rate'] == 7.0 and rate['total_amount'] == round(emi * 240, 2)
+
+    principal = route('/api/emi', {'solve': 'principal', 'annual_rate': 7, 'tenure_months': 240, 'emi': 10000})
+    assert principal['emi'] <= 10000
+    assert calculate_emi(principal['principal'] + 0.01, 7, 240)['emi'] >= 10000
+
+    assert 'solve' not in route('/api/emi', {'solve': 'emi', 'principal': 1000000, 'annual_rate': 7, 'tenure_months': 240})
+
+
+def test_solve_errors():
+    cases = [
+        ({'solve': 'months'}, "solve must be one of emi, tenure, rate, principal"),
+        ({'solve': 'rate', 'principal': 1000, 'emi': 100}, "principal, tenure_months, emi fields required"),
+        ({'solve': 'rate', 'principal': 1000, 'tenure_months': 12, 'emi': 0}, "EMI must be greater than 0"),
+        ({'solve': 'rate', 'principal': 1000, 'tenure_months': 12, 'emi': 80}, "EMI x tenure must be at least the principal"),
+        ({'solve': 'tenure', 'principal': 1000, 'annual_rate': 12, 'emi': 10}, "EMI must be more than the first month's interest"),
+        ({'solve': 'principal', 'annual_rate': -1, 'tenure_months': 12, 'emi': 10}, "Interest rate cannot be negative"),
+        # results past float range: a 400, not an OverflowError
+        ({'solve': 'principal', 'annual_rate': 10, 'tenure_months': 480, 'emi': 1e308}, OUT_OF_RANGE),
+        ({'solve': 'tenure', 'principal': 1000, 'annual_rate': 0, 'emi': 5e-324}, OUT_OF_RANGE),
+        ({'principal': 1, 'annual_rate': 1e6, 'tenure_months': 600}, OUT_OF_RANGE),
+        # tenures no float can count, or with an EMI that rounds to 0.00
+        ({'solve': 'tenure', 'principal': 1e5, 'annual_rate': 0, 'emi': 1e-300}, OUT_OF_RANGE),
+        ({'solve': 'tenure', 'principal': 1, 'annual_rate': 0, 'emi': 1e-10}, OUT_OF_RANGE),
+    ]
+    for body, message in cases:
+        try:
+            route('/api/emi', body)
+        except ValueError as e:
+            assert str(e) == message, (body, str(e))
+        else:
+            raise AssertionError(body)
+        assert route('/api/emi/batch', [body]) == [{'error': message}]
+
+
+def test_batch_solves_match_single():
+    rng = random.Random(9)
+    items = [{'principal': 1000000, 'annual_rate': 7, 'tenure_months': 240}, {'solve': 'months'}, 'x',
+             {'annual_rate': 1, 'tenure_months': 382, 'emi': 274877906944, 'solve': 'principal'}]
+    for _ in range(300):
+        p, a, n = round(rng.uniform(1e4, 1e7), 2), round(rng.uniform(0, 30), 2), rng.randint(1, 360)
+        emi = calculate_emi(p, a, n)['emi'] * rng.choice([1, 1, 0.5, 1.5])
+        items.append(rng.choice([
+            {'solve': 'tenure', 'principal': p, 'annual_rate': a, 'emi': emi},
+            {'solve': 'rate', 'principal': p, 'tenure_months': n, 'emi': emi},
+            {'solve': 'principal', 'annual_rate': a, 'tenure_months': n, 'emi': emi},
+            {'solve': 'rate', 'principal': p, 'tenure_months': n, 'emi': -emi},
+        ]))
+
+    def check():
+        expected = []
+        for item in items:
+            try:
+                expected.append(route('/api/emi', item))
+            except Exception as e:
+                expected.append({'error': str(e) if isinstance(item, dict) else "Each item must be a JSON object"})
+        assert route('/api/emi/batch', items) == expected
+    _both_backends(check)
+
+
+if __name__ == '__main__':
+    test_inverses_recover_the_loan()
+    test_infeasible_is_nan()
+    test_solve_modes_on_api_emi()
+    test_solve_errors()
+    test_batch_solves_match_single()
+    print("✅ EMI solver tests passed")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""GET variants: canonical queries, ETag / If-None-Match, Cache-Control"""
+
+import http.client
+import json
+import threading
+import time
+from http.server import HTTPServer
+
+from api import gst as gst_function
+from api.index import APIHandler, handle_get
+from india_tools import httpcache
+from india_tools.server import PooledHTTPServer
+
+
+def test_parse_query_uses_json_numbers():
+    params, canonical = httpcache.parse_query('rate=18&amount=1000.50&university=Mumbai%20Uni')
+    assert params == {'rate': 18, 'amount': 1000.5, 'university': 'Mumbai Uni'}
+    assert type(params['rate']) is int
+    assert canonical == 'amount=1000.50&rate=18&university=Mumbai%20Uni'
+    assert httpcache.parse_query('dob=2000-01-15')[0] == {'dob': '2000-01-15'}
+
+
+def test_etag_and_conditional_get():
+    status, headers, body = handle_get('/api/gst', 'amount=1000&rate=18')
+    headers = dict(headers)
+    assert status == 200 and json.loads(body)['total'] == 1180.0
+    assert 's-maxage' in headers['Cache-Control']
+    assert headers['ETag'] == dict(handle_get('/api/gst', 'amount=1000&rate=18')[1])['ETag']
+    assert headers['ETag'] != dict(handle_get('/api/gst', 'amount=1000&rate=5')[1])['ETag']
+
+    status, _, body = handle_get('/api/gst', 'amount=1000&rate=18', f'"other", W/{headers["ETag"]}')
+    assert status == 304 and body == b''
+
+
+def test_redirects_and_errors():
+    status, headers, _ = handle_get('/api/gst', 'rate=18&amount=1000')
+    assert status == 301 and dict(headers)['Location'] == '/api/gst?amount=1000&rate=18'
+    status, headers, body = handle_get('/api/gst', 'amount=1&amount=2')
+    assert status == 400 and dict(headers)['Cache-Control'] == 'no-store'
+    assert handle_get('/api/gst', 'amount=-1&rate=18')[0] == 400
+    assert handle_get('/api/batch', 'a=1')[0] == 404
+
+
+def test_age_expires_at_midnight():
+    cc = dict(handle_get('/api/age', 'dob=2000-01-15')[1])['Cache-Control']
+    assert 0 < int(cc.split('max-age=')[1].split(',')[0]) <= 86400
+    t = time.mktime((2024, 3, 10, 23, 59, 0, 0, 0, -1))
+    assert httpcache.seconds_until_midnight(t) == 60
+
+
+def _get(port, path, headers=None):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    conn.request('GET', path, headers=headers or {})
+    res = conn.getresponse()
+    body = res.read()
+    conn.close()
+    return res, body
+
+
+def test_served_over_http():
+    servers = [PooledHTTPServer(('127.0.0.1', 0), APIHandler, threads=2),
+               HTTPServer(('127.0.0.1', 0), gst_function.handler)]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        for server in servers:
+            port = server.server_address[1]
+            res, body = _get(port, '/api/gst?amount=1000&rate=18')
+            assert res.status == 200 and json.loads(body)['gst_amount'] == 180.0
+            assert res.getheader('Access-Control-Allow-Origin') == '*'
+            res, body = _get(port, '/api/gst?amount=1000&rate=18', {'If-None-Match': res.getheader('ETag')})
+            assert res.status == 304 and body == b''
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    test_parse_query_uses_json_numbers()
+    test_etag_and_conditional_get()
+    test_redirects_and_errors()
+    test_age_expires_at_midnight()
+    test_served_over_http()
+    print("✅ HTTP caching tests passed")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""GST invoices: paise arithmetic, HSN grouping, CGST/SGST/IGST split"""
+
+import json
+from decimal import Decimal
+
+from api.index import calculate_gst, calculate_gst_invoice, route
+from benchmarks.invoice import decimal_invoice, make_lines
+
+LINES = [
+    {'hsn': '8471', 'amount': 1000, 'rate': 18},
+    {'hsn': 8471, 'amount': 99.99, 'quantity': 3, 'rate': 5},
+    {'hsn': '7113', 'amount': 12.345, 'quantity': 2, 'rate': 0.25},
+    {'hsn': '8471', 'amount': 0.1, 'quantity': 7, 'rate': 18},
+]
+
+
+def test_groups_by_hsn_and_rate():
+    result = calculate_gst_invoice(LINES)
+    summary = {(g['hsn'], g['rate']): g for g in result['hsn_summary']}
+    assert list(summary) == [('7113', 0.25), ('8471', 5), ('8471', 18)]
+    assert summary[('8471', 18)]['lines'] == 2
+    assert summary[('8471', 18)]['taxable_value'] == 1000.7     # 0.1 x 7 is 70 paise, not 0.7000000000000001
+    assert summary[('8471', 18)]['cgst'] == summary[('8471', 18)]['sgst'] == 90.06
+    assert summary[('8471', 5)]['cgst'] == 7.5                  # 299.97 x 2.5% = 7.49925
+    assert summary[('7113', 0.25)]['taxable_value'] == 24.69    # 12.345 x 2, exactly
+    assert result['igst'] == 0 and result['supply'] == 'intra-state'
+    assert result['total'] == round(result['taxable_value'] + result['total_tax'], 2) == 1520.54
+
+
+def test_inter_state_and_inclusive():
+    inter = calculate_gst_invoice(LINES, inter_state=True)
+    assert inter['cgst'] == inter['sgst'] == 0
+    assert inter['igst'] == 195.19
+    single = calculate_gst(1000, 18)
+    assert calculate_gst_invoice([{'amount': 1000, 'rate': 18}], inter_state=True)['igst'] == single['gst_amount']
+
+    inclusive = calculate_gst_invoice([{'amount': 1180, 'rate': 18}, {'amount': 105, 'rate': 5, 'quantity': 3}],
+                                      inclusive=True)
+    assert inclusive['total'] == 1180 + 315
+    assert inclusive['taxable_value'] == 1000 + 300
+    assert inclusive['cgst'] + inclusive['sgst'] == inclusive['total_tax'] == 195
+
+
+def test_matches_decimal_reference():
+    lines = make_lines(2000, seed=11)
+    assert Decimal(repr(calculate_gst_invoice(lines)['total'])) == decimal_invoice(lines)
+
+
+def test_errors_name_the_line():
+    cases = [
+        ({}, "lines field required"),
+        ({'lines': []}, "lines must be a non-empty JSON array of line items"),
+        ({'lines': [{'amount': 1, 'rate': 5}, 'x']}, "lines[1] must be an object"),
+        ({'lines': [{'amount': -1, 'rate': 5}]}, "lines[0]: Amount must be a non-negative number"),
+        ({'lines': [{'amount': float('nan'), 'rate': 5}]}, "lines[0]: Amount must be a non-negative number"),
+        ({'lines': [{'amount': 1, 'rate': 101}]}, "lines[0]: Rate must be between 0 and 100"),
+        ({'lines': [{'amount': 1, 'rate': 5, 'quantity': 0}]}, "lines[0]: Quantity must be a positive number"),
+        ({'lines': [{'amount': 1, 'rate': 5, 'quantity': True}]}, "lines[0]: Quantity must be a positive number"),
+        ({'lines': [{'amount': 1, 'rate': 5, 'hsn': None}]}, "lines[0]: HSN code must be a string"),
+        ({'lines': [{'amount': 1, 'rate': 5}], 'inter_state': 'yes'}, "inter_state must be true or false"),
+    ]
+    for body, message in cases:
+        try:
+            route('/api/gst/invoice', body)
+        except ValueError as e:
+            assert str(e) == message, (body, str(e))
+        else:
+            raise AssertionError(body)
+
+
+def test_invoice_streams_summary_rows():
+    rows = list(route('/api/gst/invoice', {'lines': LINES}, stream=True).rows)
+    assert [r['hsn'] for r in rows] == ['7113', '8471', '8471']
+    json.dumps(rows)
+
+
+if __name__ == '__main__':
+    test_groups_by_hsn_and_rate()
+    test_inter_state_and_inclusive()
+    test_matches_decimal_reference()
+    test_errors_name_the_line()
+    test_invoice_streams_summary_rows()
+    print("✅ invoice tests passed")
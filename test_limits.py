@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""Request limits: body size, read timeouts and token-bucket rate limiting"""
+
+import asyncio
+import http.client
+import json
+import math
+import socket
+import threading
+import time
+
+from api.index import APIHandler
+from india_tools import aio, limits
+from india_tools.app import route
+from india_tools.server import PooledHTTPServer
+
+
+class _Clock:
+    now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _configured(**settings):
+    """Apply settings to the shared LIMITS; returns the previous ones."""
+    saved = {'max_body': limits.LIMITS.max_body, 'read_timeout': limits.LIMITS.read_timeout,
+             'ip_rate': limits.LIMITS.ip_rate, 'route_rate': limits.LIMITS.route_rate,
+             'burst': limits.LIMITS.burst}
+    limits.LIMITS.configure(**settings)
+    return saved
+
+
+def test_token_buckets():
+    clock = _Clock()
+    buckets = limits.TokenBuckets(rate=2, burst=3, shards=4, max_keys=8, clock=clock)
+    assert [buckets.take('a') for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert buckets.take('a') == 0.5 and buckets.take('b') == 0.0  # keys are independent
+    clock.now += 0.5
+    assert buckets.take('a') == 0.0 and buckets.take('a') == 0.5
+    clock.now += 60
+    assert [buckets.take('a') for _ in range(4)][-1] == 0.5  # refills to burst, not beyond
+
+    for i in range(100):
+        buckets.take(('ip', i))
+    assert len(buckets) <= 8
+
+
+def test_admit():
+    checks = limits.Limits(max_body=100, ip_rate=1, route_rate=0, burst=2)
+    assert checks.admit('1.2.3.4', '/api/gst', '100') == 100
+    assert checks.admit('1.2.3.4', '/api/gst', None) == 0
+    try:
+        checks.admit('1.2.3.4', '/api/gst', '101')
+    except limits.Rejected as e:
+        assert e.status == 413 and 'max 100 bytes' in str(e) and e.headers == []
+    else:
+        raise AssertionError("expected 413")
+    try:
+        checks.admit('1.2.3.4', '/api/gst')
+    except limits.Rejected as e:
+        assert e.status == 429 and e.headers == [('Retry-After', '1')]
+    else:
+        raise AssertionError("expected 429")
+    assert checks.admit('5.6.7.8', '/api/gst') == 0
+    for bad in ('abc', '-1'):
+        try:
+            checks.admit('9.9.9.9', '/api/gst', bad)
+        except limits.Rejected as e:
+            assert e.status == 400 and str(e) == "Bad Content-Length"
+    assert checks.stats() == {'body': 1, 'rate_ip': 1, 'rate_route': 0, 'timeout': 0}
+
+    checks = limits.Limits(route_rate=1, burst=1)
+    assert checks.admit('1.2.3.4', '/api/gst/') == 0
+    assert checks.admit('1.2.3.4', '/api/emi') == 0  # another route, its own bucket
+    try:
+        checks.admit('1.2.3.4', '/api/gst')
+    except limits.Rejected as e:
+        assert e.status == 429 and '/api/gst' in str(e)
+    else:
+        raise AssertionError("expected 429")
+
+
+def _raw(port, data, read=True):
+    sock = socket.create_connection(('127.0.0.1', port), timeout=5)
+    sock.sendall(data)
+    if not read:
+        return sock
+    reply = sock.recv(65536)
+    sock.close()
+    return reply
+
+
+def _trickle(port, line, data, pause):
+    """Send the request `line`, then `data` a byte per `pause` seconds; seconds until the server hangs up."""
+    sock = socket.create_connection(('127.0.0.1', port), timeout=5)
+    start = time.monotonic()
+    try:
+        sock.sendall(line)
+        for byte in data:
+            sock.sendall(bytes([byte]))
+            time.sleep(pause)
+        return math.inf
+    except OSError:
+        return time.monotonic() - start
+    finally:
+        sock.close()
+
+
+def test_handler_rejects_early():
+    saved = _configured(max_body=1000, read_timeout=0.3, route_rate=1, burst=2)
+    server = PooledHTTPServer(('127.0.0.1', 0), APIHandler, threads=2, keepalive=2.0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    try:
+        # Too large: refused from the headers, nothing read
+        reply = _raw(port, b'POST /api/gst HTTP/1.1\r\nHost: x\r\nContent-Length: 5000000\r\n\r\n')
+        assert reply.startswith(b'HTTP/1.0 413') or reply.startswith(b'HTTP/1.1 413')
+        assert b'Connection: close' in reply
+
+        # Slow body: 408 once read_timeout has passed
+        start = time.monotonic()
+        reply = _raw(port, b'POST /api/cgpa HTTP/1.1\r\nHost: x\r\nContent-Length: 20\r\n\r\n{"cgpa"')
+        assert b' 408 ' in reply.split(b'\r\n')[0] and time.monotonic() - start < 2
+
+        # Slow headers: one byte at a time, each well inside read_timeout, cut off after it
+        before = limits.LIMITS.stats()['timeout']
+        assert _trickle(port, b'POST /api/gst HTTP/1.1\r\n', b'Host: x\r\nX-Slow: ' + b'a' * 100, 0.05) < 1.5
+        assert limits.LIMITS.stats()['timeout'] == before + 1
+
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        statuses = []
+        for _ in range(3):
+            conn.request('POST', '/api/emi', json.dumps({'principal': 1e5, 'annual_rate': 9, 'tenure_months': 12}))
+            res = conn.getresponse()
+            statuses.append((res.status, res.getheader('Retry-After')))
+            res.read()
+            if res.status != 200:
+                conn.close()
+        assert statuses == [(200, None), (200, None), (429, '1')]
+        assert limits.LIMITS.stats()['timeout'] >= 1
+    finally:
+        limits.LIMITS.configure(**saved)
+        server.shutdown()
+        server.drain(2)
+        server.server_close()
+
+
+def test_asyncio_rejects_early():
+    saved = _configured(max_body=1000, read_timeout=0.3)
+
+    async def main():
+        server = aio.AsyncServer(route)
+        await server.start('127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        for data, status in ((b'POST /api/gst HTTP/1.1\r\nContent-Length: 5000\r\n\r\n', b' 413 '),
+                             (b'POST /api/gst HTTP/1.1\r\nContent-Length: 20\r\n\r\n{', b' 408 ')):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(data)
+            head = await reader.readuntil(b'\r\n\r\n')
+            assert status in head.split(b'\r\n')[0] and b'Connection: close' in head, head
+            writer.close()
+        before = limits.LIMITS.stats()['timeout']
+        closed = await asyncio.to_thread(_trickle, port, b'GET /api/gst?amount=1&rate=5 HTTP/1.1\r\n',
+                                       b'X-Slow: ' + b'a' * 100, 0.05)
+        assert closed < 1.5 and limits.LIMITS.stats()['timeout'] == before + 1
+        await server.drain(1)
+
+    try:
+        asyncio.run(main())
+    finally:
+        limits.LIMITS.configure(**saved)
+
+
+if __name__ == '__main__':
+    test_token_buckets()
+    test_admit()
+    test_handler_rejects_early()
+    test_asyncio_rejects_early()
+    print("✅ limits tests passed")
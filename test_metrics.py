@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Request metrics (/metrics) and the sampled JSON-lines request log"""
+
+import io
+import json
+import threading
+import urllib.request
+from http.server import HTTPServer
+
+from india_tools import app, logs, metrics
+from india_tools.handler import APIHandler
+
+
+def test_route_labels_are_bounded():
+    assert app.route_label('/api/gst') == '/api/gst'
+    assert app.route_label('/api/gst/') == '/api/gst'
+    assert app.route_label('/api/emi/schedule') == '/api/emi/schedule'
+    assert app.route_label('/api/cgpa/batch') == '/api/cgpa/batch'
+    assert app.route_label('/api/gst/../../etc') == 'other'
+    assert app.route_label('/wp-login.php') == 'other'
+
+
+def test_histogram_and_stage_rendering():
+    registry = metrics.Registry(buckets=(0.001, 0.01))
+    timer = metrics.Timer()
+    timer.add('calc', 0.5)
+    registry.observe('POST', '/api/gst', 200, timer)
+    registry.observe('POST', '/api/gst', 400, metrics.Timer())
+    text = registry.render(extra=[('x_total', 'counter', 'X.', 7)])
+    assert 'india_tools_requests_total{method="POST",route="/api/gst"} 2' in text
+    assert 'india_tools_request_errors_total{method="POST",route="/api/gst",status="400"} 1' in text
+    assert 'india_tools_request_duration_seconds_bucket{method="POST",route="/api/gst",le="0.001"} 2' in text
+    assert 'india_tools_request_duration_seconds_bucket{method="POST",route="/api/gst",le="+Inf"} 2' in text
+    assert 'india_tools_stage_seconds_total{route="/api/gst",stage="calc"} 0.500000' in text
+    assert ('# HELP india_tools_stage_seconds_total Time spent per request stage: '
+            'headers, read, parse, calc, serialize, write.') in text
+    assert '# TYPE india_tools_request_duration_seconds histogram' in text and 'x_total 7' in text
+
+
+def test_log_sampling_and_format():
+    out = io.StringIO()
+    log = logs.Log(level='INFO', sample=0, stream=out)
+    log.request('POST', '/api/gst', 200, 0.002)  # sampled out
+    log.request('POST', '/api/gst', 400, 0.001, {'parse': 0.0005}, error='Amount must be greater than 0')
+    log.request('POST', '/api/emi/schedule', 200, 0.01, error='stream aborted: boom')
+    log.configure(sample=1)
+    log.request('GET', '/api/age', 200, 0.003)
+    log.flush()
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [(r['level'], r['status']) for r in lines] == [('WARNING', 400), ('ERROR', 200), ('INFO', 200)]
+    assert lines[0]['error'] == 'Amount must be greater than 0' and lines[0]['stages'] == {'parse': 0.5}
+    assert lines[2]['ms'] == 3.0 and 'sample' not in lines[2] and lines[2]['ts'].endswith('Z')
+
+    quiet = logs.Log(level='ERROR', stream=out)
+    quiet.request('POST', '/api/gst', 404, 0.001)
+    assert quiet._thread is None  # below threshold: nothing queued, no writer started
+
+
+def test_metrics_endpoint_counts_requests():
+    server = HTTPServer(('127.0.0.1', 0), APIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    before = app.METRICS.render()
+    try:
+        for amount in (1000, -1):
+            req = urllib.request.Request(base + '/api/gst', json.dumps({'amount': amount, 'rate': 18}).encode())
+            try:
+                urllib.request.urlopen(req).read()
+            except urllib.error.HTTPError as e:
+                assert e.code == 400
+        with urllib.request.urlopen(base + '/metrics') as resp:
+            assert resp.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+            text = resp.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert text != before
+    assert 'india_tools_request_errors_total{method="POST",route="/api/gst",status="400"}' in text
+    assert 'india_tools_stage_seconds_total{route="/api/gst",stage="calc"}' in text
+    assert 'india_tools_cache_hits_total' in text
+
+
+if __name__ == '__main__':
+    test_route_labels_are_bounded()
+    test_histogram_and_stage_rendering()
+    test_log_sampling_and_format()
+    test_metrics_endpoint_counts_requests()
+    print("✅ metrics tests passed")
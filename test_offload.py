@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Process-pool offload: same answers as inline, 503 + Retry-After under load"""
+
+import asyncio
+import json
+import threading
+
+from api.index import route
+from india_tools import aio, offload
+
+
+def _error(fn, *args):
+    try:
+        fn(*args)
+    except Exception as e:
+        return type(e), str(e)
+    raise AssertionError(args)
+
+
+def test_cost():
+    assert offload.cost('/api/gst', {'amount': 1, 'rate': 18}) == 0
+    assert offload.cost('/api/gst/batch', [{}] * 50) == 50
+    assert offload.cost('/api/batch', [{}] * 7) == 7
+    assert offload.cost('/api/age/bulk', {'dobs': ['2000-01-01'] * 30}) == 30
+    assert offload.cost('/api/gst/invoice', {'lines': [{}] * 12}) == 12
+    assert offload.cost('/api/emi/schedule', {'tenure_months': 240}) == 240
+    assert offload.cost('/api/emi/schedule', {'tenure_months': 240, 'page_size': 12}) == 12
+    grid = {'principal': [1, 2], 'annual_rate': {'start': 0, 'stop': 12, 'step': 0.5}, 'tenure_months': [12, 24, 36]}
+    assert offload.cost('/api/emi/grid', grid) == 2 * 25 * 3
+    assert offload.cost('/api/nope', [1, 2, 3]) == 0
+
+
+def test_inline_when_disabled_or_light():
+    calls = []
+
+    def inline(path, body, stream=False):
+        calls.append(path)
+        return route(path, body, stream)
+
+    pool = offload.Offloader(workers=0, threshold=1)
+    assert pool.call(inline, '/api/gst/batch', [{'amount': 1, 'rate': 5}])[0]['total'] == 1.05
+    pool = offload.Offloader(workers=1, threshold=100)
+    assert pool.call(inline, '/api/gst/batch', [{'amount': 1, 'rate': 5}])[0]['total'] == 1.05
+    assert calls == ['/api/gst/batch'] * 2 and pool.stats()['offloaded'] == 0
+    assert not offload.Offloader().candidate('/api/gst/batch')
+    assert pool.candidate('/api/gst/batch') and pool.candidate('/api/batch') and not pool.candidate('/api/gst')
+
+
+def test_pool_matches_inline():
+    pool = offload.Offloader(workers=1, threshold=1)
+    try:
+        body = [{'amount': 100 + i, 'rate': 18} for i in range(20)]
+        assert pool.call(route, '/api/gst/batch', body) == route('/api/gst/batch', body)
+        # Streams run inline: rows still produced lazily, never built whole in a worker
+        rows = pool.call(route, '/api/emi/schedule', {'principal': 1e5, 'annual_rate': 9, 'tenure_months': 24},
+                         stream=True)
+        assert not isinstance(rows.rows, list)
+        assert list(rows.rows) == list(route('/api/emi/schedule', {'principal': 1e5, 'annual_rate': 9,
+                                                                   'tenure_months': 24}, True).rows)
+        bad = {'lines': [{'amount': 1, 'rate': 5}, {'amount': -1, 'rate': 5}]}
+        assert _error(pool.call, route, '/api/gst/invoice', bad) == _error(route, '/api/gst/invoice', bad)
+        assert pool.stats()['offloaded'] == 2 and pool.stats()['inflight'] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_busy_and_timeout():
+    pool = offload.Offloader(workers=1, threshold=1, max_queue=0, retry_after=7)
+    pool.inflight = 1  # the only worker is taken
+    kind, message = _error(pool.call, route, '/api/gst/batch', [{'amount': 1, 'rate': 5}])
+    assert kind is offload.Busy and message == "Server busy, retry later"
+    assert pool.stats()['rejected'] == 1
+
+    pool = offload.Offloader(workers=1, threshold=1, timeout=0)
+    try:
+        try:
+            pool.call(route, '/api/gst/batch', [{'amount': 1, 'rate': 5}])
+        except offload.Busy as e:
+            assert str(e) == "Request timed out, retry later" and e.retry_after == offload.RETRY_AFTER
+        else:
+            raise AssertionError("expected a timeout")
+        assert pool.stats()['timeouts'] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_503_with_retry_after():
+    def busy(path, body, stream=False):
+        raise offload.Busy("Server busy, retry later", 3)
+
+    status, headers, payload = aio.handle(busy, 'POST', '/api/gst/batch', b'[]')
+    assert status == 503 and ('Retry-After', '3') in headers
+    assert json.loads(payload) == {'error': "Server busy, retry later"}
+
+    # The server-side predicate moves candidate requests off the event loop
+    threads = []
+
+    def dispatch(path, body, stream=False):
+        threads.append(threading.current_thread())
+        return route(path, body, stream)
+
+    async def main():
+        server = aio.AsyncServer(dispatch, threaded=lambda path: path.endswith('/batch'))
+        for path, body in (('/api/gst', {'amount': 1, 'rate': 5}), ('/api/gst/batch', [{'amount': 1, 'rate': 5}])):
+            await aio._call(server.threaded, dispatch, 'POST', path, json.dumps(body).encode(), {}, None, None)
+
+    asyncio.run(main())
+    assert threads[0] is threading.main_thread() and threads[1] is not threading.main_thread()
+
+
+if __name__ == '__main__':
+    test_cost()
+    test_inline_when_disabled_or_light()
+    test_pool_matches_inline()
+    test_busy_and_timeout()
+    test_503_with_retry_after()
+    print("✅ offload tests passed")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Per-stage timing, Server-Timing in debug mode, and the opt-in profilers"""
+
+import http.client
+import json
+import os
+import pstats
+import tempfile
+import threading
+import time
+
+from api.index import APIHandler, route
+from india_tools import aio, metrics, profiling
+from india_tools.server import PooledHTTPServer
+
+
+def _stages(header):
+    return [part.split(';')[0] for part in header.split(', ')]
+
+
+def test_stages_and_server_timing():
+    seen = []
+    server = PooledHTTPServer(('127.0.0.1', 0), APIHandler, threads=2, keepalive=2.0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    observe = metrics.Registry.observe
+    metrics.Registry.observe = lambda self, method, path, status, timer: seen.append(dict(timer.stages)) or 0.0
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+        conn.request('POST', '/api/gst', json.dumps({'amount': 100, 'rate': 18}))
+        res = conn.getresponse()
+        res.read()
+        assert res.getheader('Server-Timing') is None  # debug off
+
+        metrics.DEBUG = True
+        conn.request('POST', '/api/gst', json.dumps({'amount': 100, 'rate': 18}))
+        res = conn.getresponse()
+        res.read()
+        assert _stages(res.getheader('Server-Timing')) == ['headers', 'read', 'parse', 'calc', 'serialize', 'total']
+        conn.close()
+    finally:
+        metrics.DEBUG = False
+        metrics.Registry.observe = observe
+        server.shutdown()
+        server.drain(2)
+        server.server_close()
+    assert list(seen[0]) == list(metrics.STAGES)
+
+    metrics.DEBUG = True
+    try:
+        status, headers, _ = aio.handle(route, 'POST', '/api/gst', b'{"amount": 1, "rate": 5}')
+    finally:
+        metrics.DEBUG = False
+    assert status == 200 and _stages(dict(headers)['Server-Timing']) == ['parse', 'calc', 'serialize', 'total']
+
+
+def test_cprofile_mode():
+    out = os.path.join(tempfile.mkdtemp(), 'requests-{pid}.pstats')
+    profiler = profiling.Profiler('cprofile', out, sample=1.0)
+    for _ in range(3):
+        with profiler.request():
+            route('/api/cgpa', {'cgpa': 8.5, 'university': 'VTU'})
+    with profiler.request():
+        with profiler.request():  # already profiling: the nested request just runs
+            pass
+    path = profiler.dump()
+    assert path == out.format(pid=os.getpid()) and profiler.profiled == 4
+    functions = {name for _, _, name in pstats.Stats(path).stats}
+    assert {'from_body', 'compute'} <= functions  # validation and calculation, apart
+    os.unlink(path)
+
+    assert profiling.Profiler('cprofile', out, sample=0.0).dump() is None
+    try:
+        profiling.Profiler('perf')
+    except ValueError as e:
+        assert 'off, cprofile, stacks' in str(e)
+    else:
+        raise AssertionError("expected a bad mode error")
+
+
+def test_stack_sampling():
+    out = os.path.join(tempfile.mkdtemp(), 'requests.folded')
+    profiler = profiling.Profiler('stacks', out, interval=0.001)
+
+    def slow_request():
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            route('/api/gst', {'amount': 100, 'rate': 18})
+
+    try:
+        with profiler.request():
+            slow_request()
+        assert profiler.samples > 0
+        time.sleep(0.01)  # a sample in flight
+        idle = profiler.samples
+        time.sleep(0.02)
+        assert profiler.samples == idle  # only threads inside a request are sampled
+        path = profiler.dump()
+        with open(path) as f:
+            lines = f.read().splitlines()
+        stack, count = lines[0].rsplit(' ', 1)
+        assert int(count) > 0 and any('<locals>.slow_request;' in line for line in lines)
+        os.unlink(path)
+    finally:
+        profiler.configure(mode='off')
+
+
+if __name__ == '__main__':
+    test_stages_and_server_timing()
+    test_cprofile_mode()
+    test_stack_sampling()
+    print("✅ profiling tests passed")
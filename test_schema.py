@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Tool registry: route table, compiled input validators"""
+
+import math
+
+from india_tools import app, core
+from india_tools.schema import Field, Schema
+
+
+def _error(fn, *args):
+    try:
+        fn(*args)
+    except ValueError as e:
+        return str(e)
+    raise AssertionError(f"{fn.__name__}{args} did not raise")
+
+
+def test_compiled_validators():
+    schema = Schema(
+        Field('amount', 'number', minimum=0, message="Amount must be a non-negative number"),
+        Field('rate', 'number', minimum=0, maximum=100, message="Rate must be between 0 and 100"),
+        Field('label', default='x'),
+    )
+    from_body = schema.from_body(lambda amount, rate, label: (amount, rate, label))
+    assert from_body({'amount': 5, 'rate': 18}) == (5, 18, 'x')
+    assert _error(from_body, {'amount': 5}) == "amount and rate fields required"
+    assert _error(from_body, {'amount': '5', 'rate': 18}) == "Amount must be a non-negative number"
+    assert _error(from_body, {'amount': 5, 'rate': 101}) == "Rate must be between 0 and 100"
+    assert _error(from_body, {'amount': math.nan, 'rate': 18}) == "Amount must be a non-negative number"
+
+    fn = schema.function(lambda amount, rate, label: label, 'calc')
+    assert fn(1, 2) == 'x' and fn(1, 2, 'y') == 'y'
+    assert _error(fn, -1, 2) == "Amount must be a non-negative number"
+    assert 'for ' not in fn.__source__  # straight-line checks, no per-field loop
+    assert schema.describe()['required'] == ['amount', 'rate']
+
+
+def test_tools_keep_their_messages():
+    gst, emi, age = core.get('gst'), core.get('emi'), core.get('age')
+    assert _error(gst.from_body, {'rate': 18}) == "amount and rate fields required"
+    assert _error(emi.from_body, {}) == "principal, annual_rate, tenure_months fields required"
+    assert _error(emi.calculate_emi, 1000, 7, 1.5) == "Tenure must be greater than 0 months"
+    assert _error(age.from_body, {'dob': ''}) == "dob field required"
+    assert gst.calculate_gst(1000, 18)['total'] == 1180.0
+
+
+def test_route_table_scales_without_imports():
+    saved = dict(core.TOOLS), dict(core.ROUTES), dict(core._extra)
+    try:
+        for i in range(2000):
+            core.register(f'tool{i}', f'nonexistent.tool{i}', routes=('extra',))
+        assert app.resolve('/api/tool1999/extra') == ('tool1999', 'extra')
+        assert app.resolve('/api/gst') == ('gst', None) and app.resolve('/api/gst/') == ('gst', None)
+        assert app.resolve('/api/gst/extra') is None and app.resolve('/api/nope') is None
+        assert not any(name.startswith('tool') for name in core.loaded())
+    finally:
+        for table, old in zip((core.TOOLS, core.ROUTES, core._extra), saved):
+            table.clear()
+            table.update(old)
+
+
+if __name__ == '__main__':
+    test_compiled_validators()
+    test_tools_keep_their_messages()
+    test_route_table_scales_without_imports()
+    print("✅ schema tests passed")
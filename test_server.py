@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Serving modes: keep-alive, concurrency and graceful drain (no external server needed)"""
+
+import http.client
+import json
+import threading
+
+from api.index import APIHandler
+from india_tools.server import PooledHTTPServer
+
+
+def _start(threads=4):
+    server = PooledHTTPServer(('127.0.0.1', 0), APIHandler, threads=threads, keepalive=2.0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _post(conn, path, data):
+    conn.request('POST', path, json.dumps(data), {'Content-Type': 'application/json'})
+    res = conn.getresponse()
+    return res.status, json.loads(res.read())
+
+
+def test_keepalive_reuses_connection():
+    server = _start()
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+        assert _post(conn, '/api/gst', {'amount': 1000, 'rate': 18}) == (
+            200, {'original': 1000, 'gst_amount': 180.0, 'gst_rate': 18, 'total': 1180.0})
+        sock = conn.sock
+        status, body = _post(conn, '/api/cgpa', {'cgpa': 8.5, 'university': 'VTU'})
+        assert status == 200 and body['percentage'] == 85.0
+        assert conn.sock is sock  # same TCP connection
+        status, body = _post(conn, '/api/emi', {'principal': 1000, 'annual_rate': 0, 'tenure_months': 0})
+        assert status == 400 and 'Tenure' in body['error']
+        conn.close()
+    finally:
+        server.shutdown()
+        assert server.drain(2)
+        server.server_close()
+
+
+def test_idle_connection_does_not_block_others():
+    server = _start(threads=2)
+    try:
+        idle = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+        _post(idle, '/api/gst', {'amount': 1, 'rate': 5})  # now parked in keep-alive
+        other = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+        assert _post(other, '/api/age', {'dob': '2000-01-15'})[0] == 200
+        idle.close()
+        other.close()
+    finally:
+        server.shutdown()
+        server.drain(2)
+        server.server_close()
+
+
+def test_drain_closes_idle_keepalive():
+    server = _start()
+    conn = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+    _post(conn, '/api/gst', {'amount': 1, 'rate': 5})
+    server.shutdown()
+    assert server.drain(1)  # idle connection is cut, not waited on for `keepalive` seconds
+    server.server_close()
+    conn.close()
+
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Static-table snapshot: same tables as computing them, stale or missing files ignored"""
+
+import calendar
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import date
+
+from india_tools import agetable, cgpatable, snapshot
+
+
+def _using(path):
+    os.environ['API_SNAPSHOT'] = path
+    snapshot.reset()
+
+
+def _restore():
+    os.environ.pop('API_SNAPSHOT', None)
+    snapshot.reset()
+
+
+def test_month_tables_match():
+    assert all(agetable.month_length(y, m) == calendar.monthrange(y, m)[1]
+               for y in range(1, 2500) for m in range(1, 13))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'snapshot.bin')
+        snapshot.write(path)
+        try:
+            _using(path)
+            for as_of in (date(2024, 6, 30), date(2000, 3, 1), date(snapshot.LAST_YEAR - 1, 12, 31)):
+                saved = snapshot.months(as_of.year - agetable.SPAN + 1, as_of.year + 1)
+                table = agetable.AgeTable(as_of)
+                assert saved == (table.offsets, table.lengths)
+                assert saved == agetable.months(table.base, as_of.year + 1)
+            assert snapshot.months(1700, 1900) is None and snapshot.months(2200, 2301) is None
+            table = agetable.AgeTable(date(1990, 3, 1))  # starts before the snapshot: computed
+            assert (table.offsets, table.lengths) == agetable.months(1791, 1991)
+            assert agetable.AgeTable(date(2400, 1, 1)).age('2399-02-28') == (0, 10, 4, 307)
+        finally:
+            _restore()
+
+
+def test_cgpa_table_from_snapshot():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'snapshot.bin')
+        snapshot.write(path)
+        try:
+            _using(path)
+            restored = cgpatable.load()
+            parsed = cgpatable.parse(open(cgpatable.PATH, 'rb').read())
+            assert restored.state() == parsed.state() and restored.info() == parsed.info()
+            for name in ('vtu', 'Visvesvaraya Tech', 'Mumbai University', 'nowhere', 'an'):
+                a, b = restored.resolve(name), parsed.resolve(name)
+                assert (a[0].key, a[1]) == (b[0].key, b[1])
+                assert a[0].formula.percentage(7.3) == b[0].formula.percentage(7.3)
+
+            # Another table file: the snapshot's digest doesn't match, so it is parsed
+            other = os.path.join(tmp, 'cgpa.json')
+            with open(other, 'w') as f:
+                json.dump({'version': 'x', 'default': 'g',
+                           'universities': {'g': {'formula': {'type': 'linear', 'factor': 9}}}}, f)
+            assert cgpatable.load(other).version == 'x'
+        finally:
+            _restore()
+
+
+def test_unusable_snapshots_ignored():
+    with tempfile.TemporaryDirectory() as tmp:
+        for content in (b'', b'not marshal', b'\xe9\x00'):
+            path = os.path.join(tmp, 'bad.bin')
+            with open(path, 'wb') as f:
+                f.write(content)
+            assert snapshot.read(path) == {}
+        assert snapshot.read(os.path.join(tmp, 'missing.bin')) == {}
+        try:
+            _using('0')
+            assert snapshot.path() is None and snapshot.get('months') is None
+            assert agetable.AgeTable(date(2024, 6, 30)).age('2000-02-29') == (24, 4, 1, 8888)
+        finally:
+            _restore()
+
+
+def test_committed_snapshot_is_current():
+    # deployments load the committed file: rerun `python main.py snapshot` if this fails
+    assert snapshot.read(snapshot.PATH) == snapshot.build()
+
+
+def test_cold_start_skips_heavy_modules():
+    probe = ("import sys, api.gst, api.age; print(sorted(m for m in ('csv', 'cProfile', "
+             "'multiprocessing', 'concurrent.futures', 'numpy', 'argparse') if m in sys.modules))")
+    out = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert out.stdout.strip() == '[]', out.stdout
+
+
+if __name__ == '__main__':
+    test_month_tables_match()
+    test_cgpa_table_from_snapshot()
+    test_unusable_snapshots_ignored()
+    test_committed_snapshot_is_current()
+    test_cold_start_skips_heavy_modules()
+    print("✅ snapshot tests passed")
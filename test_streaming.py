@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""NDJSON / CSV streaming and Accept negotiation"""
+
+import asyncio
+import contextlib
+import csv
+import http.client
+import io
+import json
+import threading
+
+from api.index import APIHandler, route
+from india_tools import streaming
+from india_tools.aio import ASGIApp, AsyncServer
+from india_tools.server import PooledHTTPServer
+
+LOAN = {'principal': 2500000, 'annual_rate': 8.75, 'tenure_months': 360}
+
+
+def test_negotiate():
+    assert streaming.negotiate(None) == streaming.JSON
+    assert streaming.negotiate('application/json, text/plain, */*') == streaming.JSON
+    assert streaming.negotiate('application/x-ndjson') == streaming.NDJSON
+    assert streaming.negotiate('text/csv;q=0.5, application/ndjson;q=0.9') == streaming.NDJSON
+    assert streaming.negotiate('application/json;q=0.1, text/csv') == streaming.CSV
+    assert streaming.negotiate('text/html') == streaming.JSON
+
+
+def test_encode_chunks_are_bounded():
+    rows = streaming.Rows(({'n': i, 'sq': i * i} for i in range(2000)), ('n', 'sq'))
+    chunks = list(streaming.encode(rows, streaming.CSV, chunk_rows=100))
+    assert len(chunks) == 20
+    parsed = list(csv.DictReader(io.StringIO(b''.join(chunks).decode())))
+    assert parsed[1999] == {'n': '1999', 'sq': str(1999 * 1999)}
+    lines = b''.join(streaming.encode({'a': 1}, streaming.NDJSON)).splitlines()
+    assert [json.loads(x) for x in lines] == [{'a': 1}]
+
+
+def _fetch(port, path, data, accept):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    conn.request('POST', path, json.dumps(data), {'Accept': accept})
+    res = conn.getresponse()
+    body = res.read()
+    conn.close()
+    return res, body
+
+
+def test_threaded_server_streams_schedule_and_batch():
+    server = PooledHTTPServer(('127.0.0.1', 0), APIHandler, threads=2)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            res, body = _fetch(port, '/api/emi/schedule', LOAN, 'application/x-ndjson')
+            assert res.getheader('Transfer-Encoding') == 'chunked'
+            rows = [json.loads(line) for line in body.splitlines()]
+            page = route('/api/emi/schedule', dict(LOAN, page=3, page_size=120))['schedule']
+            assert [r['interest'] for r in rows[240:]] == page['interest']
+            assert rows[-1]['closing_balance'] == 0.0 and len(rows) == 360
+
+            items = [{'amount': 100 * i, 'rate': 18} for i in range(10)] + [{'amount': -1, 'rate': 5}]
+            res, body = _fetch(port, '/api/gst/batch', items, 'text/csv')
+            assert res.getheader('Content-Type').startswith('text/csv')
+            parsed = list(csv.DictReader(io.StringIO(body.decode())))
+            assert parsed[3]['total'] == '354.0' and parsed[3]['error'] == ''
+            assert 'non-negative' in parsed[10]['error']
+    finally:
+        server.shutdown()
+        server.drain(1)
+        server.server_close()
+
+
+def test_async_and_asgi_stream():
+    async def via_socket():
+        server = AsyncServer(route)
+        await server.start('127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        res, body = await asyncio.to_thread(_fetch, port, '/api/emi/schedule', LOAN, 'text/csv')
+        await server.drain(1)
+        return res, body
+
+    res, body = asyncio.run(via_socket())
+    assert res.getheader('Transfer-Encoding') == 'chunked'
+    assert len(list(csv.DictReader(io.StringIO(body.decode())))) == 360
+
+    async def via_asgi():
+        sent = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': json.dumps(LOAN).encode()}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'method': 'POST', 'path': '/api/emi/schedule',
+                 'headers': [(b'accept', b'application/x-ndjson')]}
+        await ASGIApp(route)(scope, receive, send)
+        return sent
+
+    sent = asyncio.run(via_asgi())
+    body = b''.join(m.get('body', b'') for m in sent[1:])
+    assert len(body.splitlines()) == 360 and sent[-1]['body'] == b''
+
+
+if __name__ == '__main__':
+    test_negotiate()
+    test_encode_chunks_are_bounded()
+    test_threaded_server_streams_schedule_and_batch()
+    test_async_and_asgi_stream()
+    print("✅ streaming tests passed")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""/api/emi/grid and /api/emi/prepay what-ifs"""
+
+import math
+
+from api.index import calculate_emi, route
+from india_tools import amortization, codec, prepayment
+
+
+def _simulate(principal, annual_rate, tenure_months, prepayments, mode):
+    """Month-by-month reference: (months paid, total interest, prepaid)."""
+    r = annual_rate / 1200
+    balance, emi = principal, amortization.emi(principal, annual_rate, tenure_months)
+    month = interest = prepaid = 0
+    while balance > 1e-6:
+        month += 1
+        charge = balance * r
+        interest += charge
+        balance = balance + charge - min(emi, balance + charge)
+        amount = prepayments.get(month, 0)
+        if amount:
+            amount = min(amount, balance)
+            balance -= amount
+            prepaid += amount
+            if mode == 'reduce_emi' and balance > 1e-6:
+                emi = amortization.emi(balance, annual_rate, tenure_months - month)
+    return month, interest, prepaid
+
+
+def test_grid_cells_match_calculator():
+    grid = route('/api/emi/grid', {'principal': [500000, 1000000],
+                                  'annual_rate': {'start': 0, 'stop': 12, 'step': 0.1},
+                                  'tenure_months': {'start': 12, 'stop': 360, 'step': 12}})
+    assert grid['annual_rate'][72] == 7.2 and len(grid['annual_rate']) == 121
+    assert grid['cells'] == 2 * 121 * 30
+    for i, principal in enumerate(grid['principal']):
+        for j, rate in enumerate(grid['annual_rate']):
+            for k, months in enumerate(grid['tenure_months']):
+                expected = calculate_emi(principal, rate, months)
+                assert grid['emi'][i][j][k] == expected['emi'], (principal, rate, months)
+                assert grid['total_interest'][i][j][k] == expected['total_interest'], (principal, rate, months)
+
+
+def test_grid_pure_python_and_errors():
+    saved = amortization.np
+    try:
+        amortization.np = None
+        grid = route('/api/emi/grid', {'principal': 100000, 'annual_rate': [0, 9], 'tenure_months': 24})
+    finally:
+        amortization.np = saved
+    assert grid['emi'] == [[[calculate_emi(100000, 0, 24)['emi']], [calculate_emi(100000, 9, 24)['emi']]]]
+
+    cases = [
+        ({'principal': 1}, "principal, annual_rate, tenure_months fields required"),
+        ({'principal': [1, -1], 'annual_rate': 7, 'tenure_months': 12}, "Principal must be greater than 0"),
+        ({'principal': 1, 'annual_rate': 7, 'tenure_months': [12.5]}, "Tenure must be greater than 0 months"),
+        ({'principal': 1, 'annual_rate': {'start': 1, 'stop': 2}, 'tenure_months': 12},
+         "annual_rate range needs numbers start <= stop and step > 0"),
+        ({'principal': {'start': 1, 'stop': 1e9, 'step': 1}, 'annual_rate': 7, 'tenure_months': 12},
+         "principal axis can have 1 to 1000 values"),
+        ({'principal': list(range(1, 1001)), 'annual_rate': list(range(200)), 'tenure_months': 12},
+         "Grid can have at most 100000 cells"),
+    ]
+    for body, message in cases:
+        try:
+            route('/api/emi/grid', body)
+        except ValueError as e:
+            assert str(e) == message, (body, str(e))
+        else:
+            raise AssertionError(body)
+
+
+def test_prepayment_matches_month_by_month():
+    loan = {'principal': 1000000, 'annual_rate': 7, 'tenure_months': 240}
+    for mode in ('reduce_tenure', 'reduce_emi'):
+        first = route('/api/emi/prepay', dict(loan, month=12, amount=200000, mode=mode))
+        second = route('/api/emi/prepay', {'state': first['state'], 'month': 30, 'amount': 50000, 'mode': mode})
+        for result, plan in ((first, {12: 200000}), (second, {12: 200000, 30: 50000})):
+            months, interest, prepaid = _simulate(1000000, 7, 240, plan, mode)
+            assert result['tenure_months'] == months, (mode, result)
+            assert math.isclose(result['total_interest'], interest, abs_tol=0.02), (mode, result, interest)
+            assert result['prepaid'] == prepaid
+        baseline = calculate_emi(**loan)['total_interest']
+        assert math.isclose(first['interest_saved'], baseline - first['total_interest'], abs_tol=0.02)
+    assert first['tenure_months'] == 240 and first['emi'] < calculate_emi(**loan)['emi']  # reduce_emi
+
+
+def test_prepayment_state_tokens():
+    loan = {'principal': 500000, 'annual_rate': 9, 'tenure_months': 60}
+    result = route('/api/emi/prepay', dict(loan, month=6, amount=10000))
+    token = result['state']
+    prepayment.SESSIONS.clear()  # e.g. another worker: the token alone is enough
+    again = route('/api/emi/prepay', {'state': token, 'month': 10, 'amount': 5000})
+    assert again['month'] == 10 and again['prepaid'] == 15000
+
+    closed = route('/api/emi/prepay', {'state': token, 'month': 6, 'amount': 10**9})
+    assert closed['outstanding'] == 0 and closed['tenure_months'] == 6
+    version, body, mac = token.split('.')
+    cases = [
+        ({'state': f'{version}.{body[:-2]}xx.{mac}', 'month': 7, 'amount': 1}, "state must be a token returned by /api/emi/prepay"),
+        ({'state': 42, 'month': 7, 'amount': 1}, "state must be a token returned by /api/emi/prepay"),
+        ({'state': token, 'month': 5, 'amount': 1}, "month must be a whole number from 6 to 58"),
+        ({'state': token, 'month': 7, 'amount': 0}, "Prepayment amount must be greater than 0"),
+        ({'state': token, 'month': 7, 'amount': 1, 'mode': 'x'}, "mode must be one of reduce_tenure, reduce_emi"),
+        ({'state': closed['state'], 'month': 7, 'amount': 1}, "The loan is already repaid"),
+        (dict(loan, principal=-1, month=1, amount=1), "Principal must be greater than 0"),
+        (dict(loan, principal='abc', month=1, amount=1), "Principal must be greater than 0"),
+        (dict(loan, annual_rate=1e308, month=1, amount=1), "Loan values are too large to compute"),
+    ]
+    # correctly MAC'd states outside what a request could ask for
+    start = prepayment.start(500000, 9, 60)
+    for state in (start._replace(annual_rate=1e308), start._replace(balance=1e300),
+                  start._replace(tenure_months=-1), start._replace(month=0.5), start._replace(remaining=1e9)):
+        payload = codec.dumps(list(state))
+        forged = f'v1.{prepayment._b64(payload)}.{prepayment._b64(prepayment._mac(payload))}'
+        cases.append(({'state': forged, 'month': 1, 'amount': 1}, "state must be a token returned by /api/emi/prepay"))
+    for body, message in cases:
+        try:
+            route('/api/emi/prepay', body)
+        except ValueError as e:
+            assert str(e) == message, (body, str(e))
+        else:
+            raise AssertionError(body)
+
+
+if __name__ == '__main__':
+    test_grid_cells_match_calculator()
+    test_grid_pure_python_and_errors()
+    test_prepayment_matches_month_by_month()
+    test_prepayment_state_tokens()
+    print("✅ what-if tests passed")
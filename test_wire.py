@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Binary protocol: same answers as route(), errors, pipelining, limits"""
+
+import os
+import socket
+import struct
+import tempfile
+import time
+
+from api.index import route
+from india_tools import codec, limits, wire
+
+
+def _expected(path, body):
+    # What an HTTP client gets: the body goes through JSON on the way in
+    try:
+        return route(path, codec.loads(codec.dumps(body)))
+    except LookupError:
+        return wire.RemoteError(404, "Endpoint not found")
+    except ValueError as e:
+        return wire.RemoteError(400, str(e))
+
+
+def _same(got, expected):
+    if isinstance(expected, wire.RemoteError):
+        return isinstance(got, wire.RemoteError) and (got.status, str(got)) == (expected.status, str(expected))
+    # == alone would take 1180 for 1180.0: compare the JSON types too
+    return got == expected and [type(v) for v in got.values()] == [type(v) for v in expected.values()]
+
+
+REQUESTS = [
+    ('/api/gst', {'amount': 1000, 'rate': 18}),
+    ('/api/gst', {'amount': 999.99, 'rate': 12.5}),
+    ('/api/gst', {'amount': 10 ** 20, 'rate': 5}),          # beyond f64: sent as JSON
+    ('/api/gst', {'amount': -1, 'rate': 18}),
+    ('/api/gst', {'amount': 100}),
+    ('/api/gst', {'amount': True, 'rate': 18}),
+    ('/api/emi', {'principal': 1000000, 'annual_rate': 7, 'tenure_months': 240}),
+    ('/api/emi', {'principal': 5e5, 'annual_rate': 0, 'tenure_months': 12}),
+    ('/api/emi', {'principal': 1, 'annual_rate': 7, 'tenure_months': 1.5}),
+    ('/api/emi', {'principal': 1e6, 'annual_rate': 8, 'emi': 9000, 'solve': 'tenure'}),
+    ('/api/age', {'dob': '2000-01-15', 'as_of': '2024-06-30'}),
+    ('/api/age', {'dob': '2000-01-15'}),
+    ('/api/age', {'dob': 'yesterday'}),
+    ('/api/age', {'dob': '2000-01-15', 'as_of': None}),
+    ('/api/cgpa', {'cgpa': 8.5, 'university': 'VTU'}),
+    ('/api/gst/batch', [{'amount': 100, 'rate': 5}, {'amount': -1, 'rate': 5}]),
+    ('/api/nope', {}),
+]
+
+
+def test_fixed_layouts_round_trip():
+    fields = wire.FIXED[wire.OP_EMI][1]
+    body = {'principal': 1e6, 'annual_rate': 7.25, 'tenure_months': 240}
+    packed = wire.pack_fixed(fields, body)
+    assert len(packed) == 2 + 3 * 8 and wire.unpack_fixed(fields, packed) == body
+    assert type(wire.unpack_fixed(fields, packed)['tenure_months']) is int
+    assert wire.pack_fixed(fields, {**body, 'extra': 1}) is None
+    assert wire.pack_fixed(fields, {**body, 'principal': float('nan')}) is None
+    assert wire.pack_fixed(wire.FIXED[wire.OP_AGE][1], {'dob': 'x' * 300}) is None
+    try:
+        wire.unpack_fixed(fields, packed[:-1])
+    except ValueError as e:
+        assert str(e) == "Malformed request payload"
+    else:
+        raise AssertionError("expected a malformed payload error")
+
+
+def test_same_answers_as_route():
+    server = wire.Background(route, port=0)
+    try:
+        with wire.Client(port=server.addresses[0][1]) as client:
+            for path, body in REQUESTS:
+                try:
+                    got = client.call(path, body)
+                except wire.RemoteError as e:
+                    got = e
+                expected = _expected(path, body)
+                if isinstance(expected, list):
+                    assert got == expected, (path, body)
+                else:
+                    assert _same(got, expected), (path, body, got, expected)
+            assert client.gst(1000, 18) == route('/api/gst', {'amount': 1000, 'rate': 18})
+            assert client.age('2000-01-15', '2024-06-30')['years'] == 24
+    finally:
+        server.stop()
+
+
+def test_pipelining_over_unix_socket():
+    path = os.path.join(tempfile.mkdtemp(), 'wire.sock')
+    server = wire.Background(route, unix=path)
+    try:
+        with wire.Client(unix=path) as client:
+            requests = [('/api/gst', {'amount': i, 'rate': 18}) for i in range(1000)] + REQUESTS
+            results = client.pipeline(requests, window=64)
+            assert len(results) == len(requests)
+            for (path_, body), got in zip(requests, results):
+                expected = _expected(path_, body)
+                assert got == expected if isinstance(expected, list) else _same(got, expected), (body, got)
+            assert client.gst(1, 18)['total'] == 1.18  # the connection is still in sync
+    finally:
+        server.stop()
+        os.unlink(path)
+
+
+def test_limits_and_bad_frames():
+    server = wire.Background(route, port=0)
+    port = server.addresses[0][1]
+    saved = (limits.LIMITS.max_body, limits.LIMITS.ip_rate, limits.LIMITS.burst)
+    try:
+        limits.LIMITS.configure(max_body=1000, ip_rate=100, burst=0.05)  # 5 requests at once
+        with wire.Client(port=port) as client:
+            results = client.pipeline([('/api/gst', {'amount': 1, 'rate': 1})] * 8)
+            refused = [r for r in results if isinstance(r, wire.RemoteError)]
+            assert refused and all(r.status == 429 for r in refused)
+        limits.LIMITS.configure(ip_rate=0)
+
+        with wire.Client(port=port) as client:
+            try:
+                client.call('/api/gst/batch', [{'amount': 1, 'rate': 1}] * 100)
+            except wire.RemoteError as e:
+                assert e.status == 413 and 'max 1000 bytes' in str(e)
+            else:
+                raise AssertionError("expected a 413")
+
+        with socket.create_connection(('127.0.0.1', port)) as sock:
+            head = struct.pack('>II', 5000, 0x01020304)
+            sock.sendall(head[:6])  # too large, and the id not all there yet
+            time.sleep(0.1)
+            sock.sendall(head[6:])
+            length, ident, status = struct.unpack('>IIB', sock.recv(9))
+            assert (ident, status) == (0x01020304, wire.ERROR) and sock.recv(length - 5)[:2] == b'\x01\x9d'
+
+        with socket.create_connection(('127.0.0.1', port)) as sock:
+            sock.sendall(struct.pack('>IIB', 5, 7, 99))  # unknown op
+            length, ident, status = struct.unpack('>IIB', sock.recv(9))
+            message = sock.recv(length - 5)
+            assert (ident, status) == (7, wire.ERROR) and message[2:] == b"Unknown op 99"
+    finally:
+        limits.LIMITS.configure(max_body=saved[0], ip_rate=saved[1], burst=saved[2])
+        server.stop()
+
+
+if __name__ == '__main__':
+    test_fixed_layouts_round_trip()
+    test_same_answers_as_route()
+    test_pipelining_over_unix_socket()
+    test_limits_and_bad_frames()
+    print("✅ wire protocol tests passed")